@@ -0,0 +1,4 @@
+"""Benchmark suite that times extraction and storage on generated documents.
+
+Run it from the repository root with ``python -m benchmarks``.
+"""
@@ -0,0 +1,190 @@
+import io
+import os
+import random
+import fitz  # PyMuPDF for PDF
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE
+from docx.oxml.shared import OxmlElement, qn
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from PIL import Image
+
+# Filler words for generated paragraphs
+WORDS = ("extraction benchmark document synthetic content page table image link "
+         "quarterly revenue growth contract clause section appendix summary").split()
+
+
+def _sentence(rng, words=12):
+    """Return a random sentence of filler words."""
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _image_bytes(rng, size=(160, 120)):
+    """Return a PNG of random noise, so every generated image is distinct."""
+    image = Image.frombytes("RGB", size, bytes(rng.getrandbits(8) for _ in range(size[0] * size[1] * 3)))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _table_cells(rng, rows, columns):
+    """Return the cell texts of a generated table, with a header row."""
+    header = [f"Column {column + 1}" for column in range(columns)]
+    body = [[str(rng.randint(0, 10000)) for _ in range(columns)] for _ in range(rows - 1)]
+    return [header] + body
+
+
+def generate_pdf(path, pages=10, images=1, tables=1, links=2, lines=30, seed=0):
+    """Write a PDF with the given number of pages and, per page, images, ruled tables and links."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    
+    for page_idx in range(pages):
+        page = doc.new_page()
+        y = 50
+        for _ in range(lines):
+            page.insert_text((50, y), _sentence(rng, 10), fontsize=9)
+            y += 12
+        
+        for link_idx in range(links):
+            rect = fitz.Rect(50, y, 250, y + 12)
+            page.insert_text((50, y + 10), f"Link {page_idx + 1}.{link_idx + 1}", fontsize=9, color=(0, 0, 1))
+            page.insert_link({"kind": fitz.LINK_URI, "from": rect,
+                              "uri": f"https://example.com/{page_idx + 1}/{link_idx + 1}"})
+            y += 14
+        
+        for image_idx in range(images):
+            x = 50 + image_idx * 90
+            page.insert_image(fitz.Rect(x, y, x + 80, y + 60), stream=_image_bytes(rng))
+        if images:
+            y += 70
+        
+        for _ in range(tables):
+            y = _draw_pdf_table(page, rng, y) + 10
+    
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def _draw_pdf_table(page, rng, top, rows=5, columns=4, cell_width=100, cell_height=16):
+    """Draw a ruled table with text cells and return its bottom coordinate."""
+    cells = _table_cells(rng, rows, columns)
+    left = 50
+    bottom = top + rows * cell_height
+    right = left + columns * cell_width
+    
+    for row in range(rows + 1):
+        page.draw_line((left, top + row * cell_height), (right, top + row * cell_height))
+    for column in range(columns + 1):
+        page.draw_line((left + column * cell_width, top), (left + column * cell_width, bottom))
+    
+    for row, values in enumerate(cells):
+        for column, value in enumerate(values):
+            page.insert_text((left + column * cell_width + 3, top + row * cell_height + 12), value, fontsize=8)
+    return bottom
+
+
+def generate_docx(path, pages=10, images=1, tables=1, links=2, lines=30, seed=0):
+    """Write a DOCX with the given number of page-broken sections of paragraphs, images, tables and links."""
+    rng = random.Random(seed)
+    doc = Document()
+    
+    for page_idx in range(pages):
+        doc.add_heading(f"Section {page_idx + 1}", level=1)
+        for _ in range(lines // 3):
+            doc.add_paragraph(_sentence(rng, 30))
+        
+        for link_idx in range(links):
+            paragraph = doc.add_paragraph("See ")
+            _add_docx_hyperlink(paragraph, f"https://example.com/{page_idx + 1}/{link_idx + 1}",
+                                f"link {page_idx + 1}.{link_idx + 1}")
+        
+        for _ in range(images):
+            doc.add_picture(io.BytesIO(_image_bytes(rng)), width=Inches(1.5))
+        
+        for _ in range(tables):
+            cells = _table_cells(rng, 5, 4)
+            table = doc.add_table(rows=len(cells), cols=len(cells[0]))
+            for row, values in enumerate(cells):
+                for column, value in enumerate(values):
+                    table.cell(row, column).text = value
+        
+        if page_idx < pages - 1:
+            doc.add_page_break()
+    
+    doc.save(path)
+    return path
+
+
+def _add_docx_hyperlink(paragraph, url, text):
+    """Append an external hyperlink run to a DOCX paragraph."""
+    rel_id = paragraph.part.relate_to(url, RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+    hyperlink = OxmlElement("w:hyperlink")
+    hyperlink.set(qn("r:id"), rel_id)
+    run = OxmlElement("w:r")
+    text_element = OxmlElement("w:t")
+    text_element.text = text
+    run.append(text_element)
+    hyperlink.append(run)
+    paragraph._p.append(hyperlink)
+
+
+def generate_pptx(path, pages=10, images=1, tables=1, links=2, lines=6, seed=0):
+    """Write a PPTX with the given number of slides, each with text, images, tables and links."""
+    rng = random.Random(seed)
+    presentation = Presentation()
+    layout = presentation.slide_layouts[5]  # Title only
+    
+    for slide_idx in range(pages):
+        slide = presentation.slides.add_slide(layout)
+        slide.shapes.title.text = f"Slide {slide_idx + 1}"
+        
+        body = slide.shapes.add_textbox(Inches(0.5), Inches(1.3), Inches(4.5), Inches(2.5)).text_frame
+        body.text = _sentence(rng)
+        for _ in range(lines - 1):
+            body.add_paragraph().text = _sentence(rng)
+        
+        for link_idx in range(links):
+            run = body.add_paragraph().add_run()
+            run.text = f"Link {slide_idx + 1}.{link_idx + 1}"
+            run.hyperlink.address = f"https://example.com/{slide_idx + 1}/{link_idx + 1}"
+        
+        for image_idx in range(images):
+            slide.shapes.add_picture(io.BytesIO(_image_bytes(rng)), Inches(5.2), Inches(1.3 + image_idx * 1.2),
+                                     width=Inches(1.5))
+        
+        for table_idx in range(tables):
+            cells = _table_cells(rng, 4, 3)
+            shape = slide.shapes.add_table(len(cells), len(cells[0]), Inches(0.5), Inches(4.2 + table_idx * 1.5),
+                                           Inches(4.5), Inches(1.2))
+            for row, values in enumerate(cells):
+                for column, value in enumerate(values):
+                    cell = shape.table.cell(row, column)
+                    cell.text = value
+                    cell.text_frame.paragraphs[0].runs[0].font.size = Pt(10)
+    
+    presentation.save(path)
+    return path
+
+
+# Generator for each benchmarked file type
+GENERATORS = {
+    "pdf": generate_pdf,
+    "docx": generate_docx,
+    "pptx": generate_pptx
+}
+
+
+def generate_documents(output_dir, file_types=("pdf", "docx", "pptx"), **scale):
+    """Generate one synthetic document per file type and return their paths.
+    
+    scale holds the pages, images, tables and links per page passed to the
+    generators, plus an optional seed.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for file_type in file_types:
+        path = os.path.join(output_dir, f"synthetic.{file_type}")
+        paths[file_type] = GENERATORS[file_type](path, **scale)
+    return paths
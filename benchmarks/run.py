@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.generate import GENERATORS, generate_documents
+from metrics import peak_rss_mb
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Stages timed for each document, in run order
+EXTRACT_STAGES = ("extract_text", "extract_links", "extract_images", "extract_tables", "extract_all")
+STORE_STAGES = ("store_text", "store_links", "store_images", "store_tables", "store_all")
+STAGES = EXTRACT_STAGES + STORE_STAGES
+
+# Version of the results file layout
+RESULTS_VERSION = 1
+
+
+def _run_stage(file_path, stage, work_dir):
+    """Run one stage on file_path and return (seconds, record count, peak RSS in MB).
+    
+    Runs inside a fresh worker process, so the peak RSS covers this stage
+    alone. Loading the file is part of the timed work, as it is in main.py.
+    """
+    from main import create_file_loader
+    from data_extractor import DataExtractor
+    from storage import FileStorage
+    
+    images_dir = os.path.join(work_dir, "images")
+    os.makedirs(images_dir, exist_ok=True)
+    
+    start = time.perf_counter()
+    with DataExtractor(create_file_loader(file_path)) as data_extractor:
+        if stage in EXTRACT_STAGES:
+            if stage in ("extract_images", "extract_all"):
+                result = getattr(data_extractor, stage)(images_dir)
+            else:
+                result = getattr(data_extractor, stage)()
+            if isinstance(result, dict):
+                records = sum(len(values) for values in result.values())
+            else:
+                records = len(result)
+        else:
+            storage = FileStorage(data_extractor, work_dir)
+            try:
+                getattr(storage, stage)()
+            finally:
+                storage.close()
+            records = None
+    seconds = time.perf_counter() - start
+    
+    return seconds, records, peak_rss_mb()
+
+
+def _time_stage(file_path, stage, work_dir, repeat):
+    """Run a stage repeat times, each in a new process, and return its result entry."""
+    context = multiprocessing.get_context("spawn")
+    timings = []
+    records = None
+    peak_rss = None
+    
+    for _ in range(repeat):
+        shutil.rmtree(work_dir, ignore_errors=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            seconds, records, run_peak = executor.submit(_run_stage, file_path, stage, work_dir).result()
+        timings.append(seconds)
+        if run_peak is not None:
+            peak_rss = max(peak_rss or 0, run_peak)
+    
+    return {
+        "seconds": round(min(timings), 4),
+        "mean_seconds": round(sum(timings) / len(timings), 4),
+        "runs": len(timings),
+        "records": records,
+        "peak_rss_mb": peak_rss
+    }
+
+
+def run_benchmarks(file_types=("pdf", "docx", "pptx"), stages=STAGES, pages=20, images=1, tables=1,
+                   links=2, repeat=3, seed=0, work_dir=None):
+    """Generate synthetic documents and time every stage on each of them.
+    
+    Returns a results dict holding the environment, the document scale, the
+    generated file sizes and one entry per (file type, stage) pair. Each run
+    happens in a new process; seconds is the fastest of repeat runs and
+    peak_rss_mb the highest peak seen.
+    """
+    scale = {"pages": pages, "images": images, "tables": tables, "links": links, "seed": seed}
+    own_work_dir = work_dir is None
+    if own_work_dir:
+        work_dir = tempfile.mkdtemp(prefix="extractor-bench-")
+    
+    try:
+        documents = generate_documents(os.path.join(work_dir, "documents"), file_types, **scale)
+        
+        results = []
+        for file_type, file_path in documents.items():
+            for stage in stages:
+                logger.info(f"Benchmarking {stage} on {os.path.basename(file_path)}")
+                entry = _time_stage(file_path, stage, os.path.join(work_dir, "output"), repeat)
+                results.append({"file_type": file_type, "stage": stage, **entry})
+        
+        return {
+            "version": RESULTS_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count()
+            },
+            "scale": scale,
+            "documents": {file_type: os.path.getsize(path) for file_type, path in documents.items()},
+            "results": results
+        }
+    finally:
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def compare_results(baseline, current, threshold=1.25):
+    """Compare two results dicts and return a list of comparison rows.
+    
+    Each row holds file_type, stage, the baseline and current seconds, their
+    ratio and whether the stage regressed, i.e. got slower than threshold
+    times the baseline. Stages missing from either side are left out.
+    """
+    baseline_seconds = {(entry["file_type"], entry["stage"]): entry["seconds"] for entry in baseline["results"]}
+    
+    rows = []
+    for entry in current["results"]:
+        key = (entry["file_type"], entry["stage"])
+        if key not in baseline_seconds:
+            continue
+        before = baseline_seconds[key]
+        ratio = entry["seconds"] / before if before else None
+        rows.append({
+            "file_type": entry["file_type"],
+            "stage": entry["stage"],
+            "baseline_seconds": before,
+            "seconds": entry["seconds"],
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "regressed": ratio is not None and ratio > threshold
+        })
+    return rows
+
+
+def _print_results(results):
+    """Print a results table."""
+    print(f"{'file':<6}{'stage':<16}{'seconds':>10}{'mean':>10}{'records':>10}{'peak MB':>10}")
+    for entry in results["results"]:
+        records = "" if entry["records"] is None else entry["records"]
+        peak = "" if entry["peak_rss_mb"] is None else entry["peak_rss_mb"]
+        print(f"{entry['file_type']:<6}{entry['stage']:<16}{entry['seconds']:>10.4f}"
+              f"{entry['mean_seconds']:>10.4f}{records:>10}{peak:>10}")
+
+
+def _print_comparison(rows):
+    """Print a comparison table against a baseline."""
+    print(f"{'file':<6}{'stage':<16}{'baseline':>10}{'seconds':>10}{'ratio':>8}")
+    for row in rows:
+        ratio = "" if row["ratio"] is None else f"{row['ratio']:.2f}"
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(f"{row['file_type']:<6}{row['stage']:<16}{row['baseline_seconds']:>10.4f}"
+              f"{row['seconds']:>10.4f}{ratio:>8}{flag}")
+
+
+def main(argv=None):
+    """Parse arguments, run the benchmarks and write the results file."""
+    parser = argparse.ArgumentParser(description="Benchmark extraction and storage on generated documents.")
+    
+    parser.add_argument(
+        "--file-types",
+        nargs="+",
+        choices=sorted(GENERATORS),
+        default=["pdf", "docx", "pptx"],
+        help="Document types to generate and benchmark (default: pdf docx pptx)"
+    )
+    
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=STAGES,
+        default=list(STAGES),
+        help="Stages to time (default: all extract_* and store_* stages)"
+    )
+    
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=20,
+        help="Pages (PDF), page-broken sections (DOCX) or slides (PPTX) per document (default: 20)"
+    )
+    
+    parser.add_argument(
+        "--images",
+        type=int,
+        default=1,
+        help="Images per page (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--tables",
+        type=int,
+        default=1,
+        help="Tables per page (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--links",
+        type=int,
+        default=2,
+        help="Hyperlinks per page (default: 2)"
+    )
+    
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per stage; the fastest is reported (default: 3)"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for the generated content (default: 0)"
+    )
+    
+    parser.add_argument(
+        "--output",
+        default="benchmark_results.json",
+        help="File to write the results to (default: benchmark_results.json)"
+    )
+    
+    parser.add_argument(
+        "--compare",
+        help="Earlier results file to compare against"
+    )
+    
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown ratio over the baseline reported as a regression (default: 1.25)"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    results = run_benchmarks(
+        file_types=args.file_types,
+        stages=args.stages,
+        pages=args.pages,
+        images=args.images,
+        tables=args.tables,
+        links=args.links,
+        repeat=max(1, args.repeat),
+        seed=args.seed
+    )
+    
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=4)
+    logger.info(f"Benchmark results written to {args.output}")
+    _print_results(results)
+    
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        rows = compare_results(baseline, results, args.threshold)
+        _print_comparison(rows)
+        if any(row["regressed"] for row in rows):
+            return 1
+    
+    return 0
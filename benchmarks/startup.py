@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+# Libraries that should only be imported once a file of their format is processed
+HEAVY_MODULES = ("fitz", "pdfplumber", "docx", "pptx", "PIL", "lxml", "mysql", "pyarrow")
+
+# Commands timed by default, relative to the repository root
+COMMANDS = {
+    "python": ["-c", "pass"],
+    "import_main": ["-c", "import main"],
+    "main_help": ["main.py", "--help"]
+}
+
+# Repository root, where main.py lives
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def heavy_modules_imported(statement="import main"):
+    """Return the heavy parsing libraries loaded by running statement in a fresh interpreter."""
+    code = (f"import sys; {statement}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True).stdout.strip()
+    return output.split(",") if output else []
+
+
+def time_command(arguments, repeat=10):
+    """Run the Python interpreter with arguments repeat times and return its wall times in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], cwd=REPO_ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_startup_benchmark(repeat=10):
+    """Time interpreter startup, importing main and main.py --help.
+    
+    Returns a results dict with the environment, the best and median time of
+    each command and the heavy libraries imported by main.
+    """
+    results = []
+    for name, arguments in COMMANDS.items():
+        timings = time_command(arguments, repeat)
+        results.append({
+            "command": name,
+            "seconds": round(min(timings), 4),
+            "median_seconds": round(statistics.median(timings), 4),
+            "runs": len(timings)
+        })
+    
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "heavy_modules_imported": heavy_modules_imported(),
+        "results": results
+    }
+
+
+def main(argv=None):
+    """Parse arguments, run the startup benchmark and write the results file."""
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of the command-line tool.")
+    
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=10,
+        help="Runs per command; the fastest and median are reported (default: 10)"
+    )
+    
+    parser.add_argument(
+        "--output",
+        default="startup_results.json",
+        help="File to write the results to (default: startup_results.json)"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    results = run_startup_benchmark(max(1, args.repeat))
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=4)
+    
+    print(f"{'command':<14}{'seconds':>10}{'median':>10}")
+    for entry in results["results"]:
+        print(f"{entry['command']:<14}{entry['seconds']:>10.4f}{entry['median_seconds']:>10.4f}")
+    print(f"Heavy libraries imported by main: {', '.join(results['heavy_modules_imported']) or 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,19 @@
 import io
 import os
+import math
 import csv
 import base64
-from PIL import Image
+import hashlib
+import functools
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import re
-from bs4 import BeautifulSoup
+from image_probe import probe_image_size
+from image_writer import ImageWriter
+from file_loader import PDFLoader
+from records import PDFTextRecord, DOCXTextRecord, PPTXTextRecord
+from metrics import NULL_METRICS, MetricsRecorder
 import logging
 
 # Configure logging
@@ -14,291 +23,893 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Version of the extraction output. Bump it whenever the records produced for
+# a given file change, so cached extraction results are not reused.
+EXTRACTOR_VERSION = "2"
+
+# Levels at which adjacent PDF text spans with the same style are merged into
+# one text record. "span" keeps every PyMuPDF span as its own record.
+TEXT_GRANULARITIES = ("span", "line", "block", "page")
+
+# Smallest number of pages handed to one worker process when the pages of a
+# PDF are extracted in parallel
+MIN_SHARD_PAGES = 8
+
+# Largest number of pages in one shard, which bounds the records held by the
+# parent process while shards are merged in page order
+MAX_SHARD_PAGES = 64
+
+# Largest coordinate difference for a drawn segment to count as a horizontal
+# or vertical ruling line in the table prefilter
+RULING_TOLERANCE = 1.0
+
+# Record types produced by DataExtractor, in the order they are stored
+DATA_TYPES = ("text", "links", "images", "tables")
+
+# Fields of the records produced for each file type and data type. Storage
+# backends that stream records use these to write headers before the first
+# record is seen.
+RECORD_FIELDS = {
+    "pdf": {
+        "text": ["page_number", "text", "font", "size", "color", "is_bold", "is_italic",
+                 "file_type", "file_name"],
+        "links": ["page_number", "url", "linked_text", "rect", "file_type", "file_name"],
+        "images": ["page_number", "image_index", "width", "height", "format", "file_path",
+                   "file_type", "file_name"],
+        "tables": ["page_number", "table_index", "rows", "columns", "content",
+                   "file_type", "file_name"]
+    },
+    "docx": {
+        "text": ["paragraph_index", "run_index", "text", "style", "is_bold", "is_italic",
+                 "is_heading", "heading_level", "file_type", "file_name"],
+        "links": ["paragraph_index", "link_index", "url", "linked_text", "file_type", "file_name"],
+        "images": ["rel_id", "width", "height", "format", "file_path", "file_type", "file_name"],
+        "tables": ["table_index", "rows", "columns", "content", "file_type", "file_name"]
+    },
+    "pptx": {
+        "text": ["slide_number", "shape_index", "text", "is_title", "shape_type",
+                 "file_type", "file_name"],
+        "links": ["slide_number", "shape_index", "paragraph_index", "run_index", "url",
+                  "linked_text", "file_type", "file_name"],
+        "images": ["slide_number", "shape_index", "width", "height", "format", "file_path",
+                   "file_type", "file_name"],
+        "tables": ["slide_number", "table_index", "rows", "columns", "content",
+                   "file_type", "file_name"]
+    }
+}
+
+
+# WordprocessingML namespaces used to find hyperlinks in the already parsed
+# DOCX paragraph elements
+DOCX_NAMESPACES = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+}
+DOCX_REL_ID = "{%s}id" % DOCX_NAMESPACES["r"]
+
+
+@functools.lru_cache(maxsize=None)
+def _docx_xpath(path):
+    """Return a compiled XPath query over DOCX elements, importing lxml on first use."""
+    from lxml import etree
+    return etree.XPath(path, namespaces=DOCX_NAMESPACES)
+
+
+def extracted_data_types(skip_tables=False):
+    """Return the DATA_TYPES an extraction produces; tables are left out with skip_tables."""
+    return tuple(data_type for data_type in DATA_TYPES if not (skip_tables and data_type == "tables"))
+
+
+def record_fields(file_type, data_type):
+    """Return the sorted field names of records of data_type for file_type.
+    
+    Returns an empty list if the combination is not known.
+    """
+    return sorted(RECORD_FIELDS.get(file_type, {}).get(data_type, []))
+
+
+class PageRanges:
+    """Selection of 1-based page or slide numbers parsed from a spec like "1-3,7,10-".
+    
+    Ranges are inclusive; a range without an end ("10-") runs to the last
+    page. Supports the in operator and str() returns the normalized spec.
+    """
+    
+    def __init__(self, spec):
+        """Parse a comma separated list of page numbers and ranges."""
+        self.ranges = []
+        for part in str(spec).split(","):
+            part = part.strip()
+            if not part:
+                continue
+            start, dash, end = part.partition("-")
+            try:
+                start = int(start)
+                end = (int(end) if end.strip() else None) if dash else start
+            except ValueError:
+                raise ValueError(f"Invalid page range: {part}")
+            if start < 1 or (end is not None and end < start):
+                raise ValueError(f"Invalid page range: {part}")
+            self.ranges.append((start, end))
+        
+        if not self.ranges:
+            raise ValueError(f"No pages selected: {spec}")
+        self.ranges.sort(key=lambda page_range: page_range[0])
+    
+    def __contains__(self, page_number):
+        """Return True if the 1-based page_number is selected."""
+        return any(start <= page_number and (end is None or page_number <= end)
+                   for start, end in self.ranges)
+    
+    def __str__(self):
+        """Return the normalized range spec."""
+        return ",".join(
+            str(start) if start == end else f"{start}-{'' if end is None else end}"
+            for start, end in self.ranges
+        )
+    
+    def indices(self, page_count):
+        """Return the sorted 0-based indices of selected pages out of page_count pages."""
+        selected = set()
+        for start, end in self.ranges:
+            last = page_count if end is None else min(end, page_count)
+            selected.update(range(start - 1, last))
+        return sorted(selected)
+
+
+def _timed(stage, count=None):
+    """Decorate a streaming extraction method so its records are timed as stage."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return self.metrics.timed_iter(stage, method(self, *args, **kwargs), count)
+        return wrapper
+    return decorator
+
+
+def _page_record_count(page_records):
+    """Return the number of records of all data types in one iter_pages item."""
+    return sum(len(records) for records in page_records.values())
+
 
 class DataExtractor:
     """Class to extract data from various file types."""
     
-    def __init__(self, file_loader):
-        """Initialize with a FileLoader instance."""
+    def __init__(self, file_loader, skip_tables=False, image_writer_workers=0, text_granularity="span",
+                 pages=None, page_workers=1, table_prefilter=True, metrics=None):
+        """Initialize with a FileLoader instance.
+        
+        When skip_tables is True, extract_tables returns no tables without
+        opening the table parser (pdfplumber for PDF files). When
+        image_writer_workers is above zero, image files are written by that
+        many background threads while extraction continues; image records are
+        still only yielded once their file has been written. text_granularity
+        is one of TEXT_GRANULARITIES and sets how far adjacent PDF text spans
+        with the same font, size and color are merged. pages restricts
+        extraction to some PDF pages or PPTX slides; it is a PageRanges or a
+        spec such as "1-3,7". DOCX files have no pages and are always
+        extracted in full. With page_workers above one, iter_pages splits the
+        pages of a PDF into shards extracted by that many worker processes.
+        With table_prefilter, PDF pages without ruling lines are not passed to
+        pdfplumber's table finder, which could not find tables on them.
+        metrics is a MetricsRecorder that times loading the file and each
+        extract_* stage.
+        """
+        if text_granularity not in TEXT_GRANULARITIES:
+            raise ValueError(f"Unknown text granularity: {text_granularity}")
+        
         self.file_loader = file_loader
-        self.file_data = file_loader.load_file()
+        self.skip_tables = skip_tables
+        self.data_types = extracted_data_types(skip_tables)
+        self.text_granularity = text_granularity
+        self.image_writer_workers = image_writer_workers
+        self.page_workers = page_workers
+        self.table_prefilter = table_prefilter
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        
+        # Pages checked and skipped by the table prefilter
+        self.table_prefilter_stats = {"pages": 0, "skipped": 0}
+        self.pages = PageRanges(pages) if isinstance(pages, str) else pages
+        self.image_writer = ImageWriter(image_writer_workers) if image_writer_workers > 0 else None
+        with self.metrics.stage("load_file"):
+            self.file_data = file_loader.load_file()
         self.file_name = self.file_data.get("file_name", "unknown")
         self.file_type = os.path.splitext(self.file_name)[1].lower()[1:]  # Get file type without dot
+        
+        if self.pages is not None and self.file_type == "docx":
+            logger.warning(f"Page selection is not supported for DOCX files, extracting all of {self.file_name}")
+        
+        # Images already saved to disk, keyed by output directory and PDF xref or
+        # content hash, so repeated occurrences reference the first saved copy
+        self._saved_images = {}
+        
+        # Pending or failed background image writes, keyed by file path
+        self._image_writes = {}
+        
+        # Relationship targets of each DOCX part, keyed by part
+        self._part_rel_targets = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def close(self):
+        """Finish pending image writes and close the documents opened by the file loader.
+        
+        Closing twice is harmless; DataExtractor can also be used as a context
+        manager.
+        """
+        if self.image_writer is not None:
+            self.image_writer.close()
+            self.image_writer = None
+        
+        close_loader = getattr(self.file_loader, "close", None)
+        if close_loader is not None:
+            close_loader()
     
     def extract_text(self):
         """Extract text with metadata from the loaded file."""
-        if hasattr(self.file_loader, 'get_expected_extension'):
-            extension = self.file_loader.get_expected_extension()
-            
-            if extension == ".pdf":
-                return self._extract_pdf_text()
-            elif extension == ".docx":
-                return self._extract_docx_text()
-            elif extension == ".pptx":
-                return self._extract_pptx_text()
-        
-        return []  # Return empty list if file type not supported
+        return list(self.iter_text())
     
     def extract_links(self):
         """Extract hyperlinks with metadata from the loaded file."""
-        if hasattr(self.file_loader, 'get_expected_extension'):
-            extension = self.file_loader.get_expected_extension()
-            
-            if extension == ".pdf":
-                return self._extract_pdf_links()
-            elif extension == ".docx":
-                return self._extract_docx_links()
-            elif extension == ".pptx":
-                return self._extract_pptx_links()
-        
-        return []  # Return empty list if file type not supported
+        return list(self.iter_links())
     
     def extract_images(self, output_dir="output/images"):
         """Extract images with metadata from the loaded file."""
+        return list(self.iter_images(output_dir))
+    
+    def extract_tables(self):
+        """Extract tables with metadata from the loaded file."""
+        return list(self.iter_tables())
+    
+    def extract_all(self, output_dir="output/images"):
+        """Extract text, links, images and tables in a single pass over the file.
+        
+        Each page, slide or paragraph is visited once and all record types are
+        collected from it, instead of walking the document once per extract_*
+        call. Returns a dict with "text", "links", "images" and "tables" lists
+        holding the same records the individual extract_* methods return.
+        """
+        results = {data_type: [] for data_type in DATA_TYPES}
+        
+        for page_records in self.iter_pages(output_dir):
+            for data_type, records in page_records.items():
+                results[data_type].extend(records)
+        
+        return results
+    
+    # Streaming extraction methods
+    #
+    # The iter_* methods yield records one page, paragraph or slide at a time
+    # so callers can store them without holding the whole document in memory.
+    @_timed("extract_text")
+    def iter_text(self):
+        """Yield text records with metadata from the loaded file."""
+        extension = self._get_extension()
+        
+        if extension == ".pdf":
+            yield from self._iter_pdf_text()
+        elif extension == ".docx":
+            yield from self._iter_docx_text()
+        elif extension == ".pptx":
+            yield from self._iter_pptx_text()
+    
+    @_timed("extract_links")
+    def iter_links(self):
+        """Yield hyperlink records with metadata from the loaded file."""
+        extension = self._get_extension()
+        
+        if extension == ".pdf":
+            yield from self._iter_pdf_links()
+        elif extension == ".docx":
+            yield from self._iter_docx_links()
+        elif extension == ".pptx":
+            yield from self._iter_pptx_links()
+    
+    @_timed("extract_images")
+    def iter_images(self, output_dir="output/images"):
+        """Yield image records with metadata, saving images to output_dir."""
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
-        if hasattr(self.file_loader, 'get_expected_extension'):
-            extension = self.file_loader.get_expected_extension()
-            
-            if extension == ".pdf":
-                return self._extract_pdf_images(output_dir)
-            elif extension == ".docx":
-                return self._extract_docx_images(output_dir)
-            elif extension == ".pptx":
-                return self._extract_pptx_images(output_dir)
+        extension = self._get_extension()
+        
+        if extension == ".pdf":
+            images = self._iter_pdf_images(output_dir)
+        elif extension == ".docx":
+            images = self._iter_docx_images(output_dir)
+        elif extension == ".pptx":
+            images = self._iter_pptx_images(output_dir)
+        else:
+            return
         
-        return []  # Return empty list if file type not supported
+        yield from self._release_written(images, lambda image: [image])
     
-    def extract_tables(self):
-        """Extract tables with metadata from the loaded file."""
+    @_timed("extract_tables")
+    def iter_tables(self):
+        """Yield table records with metadata from the loaded file."""
+        if self.skip_tables:
+            return
+        
+        extension = self._get_extension()
+        
+        if extension == ".pdf":
+            yield from self._iter_pdf_tables()
+        elif extension == ".docx":
+            yield from self._iter_docx_tables()
+        elif extension == ".pptx":
+            yield from self._iter_pptx_tables()
+    
+    @_timed("extract_pages", _page_record_count)
+    def iter_pages(self, output_dir="output/images"):
+        """Yield the records of each page, slide or paragraph in a single pass.
+        
+        Every yielded item is a dict mapping data types ("text", "links",
+        "images", "tables") to the records found in one unit of the document.
+        This is the streaming form of extract_all.
+        """
+        # Create output directory if it doesn't exist
+        os.makedirs(output_dir, exist_ok=True)
+        
+        extension = self._get_extension()
+        
+        if extension == ".pdf" and self.page_workers > 1:
+            pages = self._iter_pdf_pages_sharded(output_dir)
+        elif extension == ".pdf":
+            pages = self._iter_pdf_pages(output_dir)
+        elif extension == ".docx":
+            pages = self._iter_docx_pages(output_dir)
+        elif extension == ".pptx":
+            pages = self._iter_pptx_pages(output_dir)
+        else:
+            return
+        
+        yield from self._release_written(pages, lambda page: page.get("images", []))
+    
+    def _selected(self, pages):
+        """Yield (index, page) for the selected pages or slides of a document sequence."""
+        if self.pages is None:
+            yield from enumerate(pages)
+            return
+        
+        for index in self.pages.indices(len(pages)):
+            yield index, pages[index]
+    
+    def _write_image(self, filepath, image_bytes):
+        """Save image bytes to filepath, in the background if an image writer is set."""
+        if self.image_writer is None:
+            with open(filepath, "wb") as img_file:
+                img_file.write(image_bytes)
+        else:
+            self._image_writes[filepath] = self.image_writer.submit(filepath, image_bytes)
+    
+    def _release_written(self, items, get_images):
+        """Yield items in order once the image files they reference are written.
+        
+        get_images returns the image records of an item. Items whose images are
+        still being written are held back while later items are extracted, so
+        parsing overlaps with disk I/O without reordering the output.
+        """
+        held = deque()
+        for item in items:
+            held.append(item)
+            while held and all(self._image_written(image) for image in get_images(held[0])):
+                yield self._finish_image_writes(held.popleft(), get_images)
+        
+        while held:
+            yield self._finish_image_writes(held.popleft(), get_images)
+    
+    def _image_written(self, image):
+        """Return True if the file behind an image record is no longer being written."""
+        future = self._image_writes.get(image["file_path"])
+        return future is None or future.done()
+    
+    def _finish_image_writes(self, item, get_images):
+        """Wait for the image writes of an item and record failed writes.
+        
+        The file_path of an image whose file could not be written is set to
+        None so stored metadata never points at a missing file.
+        """
+        for image in get_images(item):
+            future = self._image_writes.get(image["file_path"])
+            if future is None:
+                continue
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error writing image {image['file_path']}: {e}")
+                image["file_path"] = None
+                continue
+            del self._image_writes[image["file_path"]]
+        return item
+    
+    def _image_size(self, image_bytes, width=None, height=None):
+        """Return (width, height) of an image without decoding it where possible.
+        
+        Dimensions reported by the parsing backend are used as is; otherwise
+        they are read from the image header, and PIL is only used for formats
+        the header parser does not understand.
+        """
+        if width and height:
+            return width, height
+        
+        size = probe_image_size(image_bytes)
+        if size:
+            return size
+        
+        from PIL import Image
+        
+        try:
+            img = Image.open(io.BytesIO(image_bytes))
+            return img.size
+        except Exception:
+            return 0, 0
+    
+    def _get_extension(self):
+        """Return the extension handled by the file loader, or None if unknown."""
         if hasattr(self.file_loader, 'get_expected_extension'):
-            extension = self.file_loader.get_expected_extension()
+            return self.file_loader.get_expected_extension()
+        return None
+    
+    # PDF extraction methods
+    def _iter_pdf_pages(self, output_dir):
+        """Yield all record types from PDF files page by page."""
+        fitz_doc = self.file_data.get("fitz_doc")
+        
+        if not fitz_doc:
+            logger.warning("Fitz document not available for extraction")
+            return
+        
+        # pdfplumber is only opened once a page may hold a table
+        plumber_pages = None
+        
+        for page_num, page in self._selected(fitz_doc):
+            page_records = {
+                "text": self._pdf_page_text(page_num, page),
+                "links": self._pdf_page_links(page_num, page),
+                "images": self._pdf_page_images(fitz_doc, page_num, page, output_dir),
+                "tables": []
+            }
+            if not self.skip_tables and self._pdf_page_may_have_tables(page):
+                if plumber_pages is None:
+                    plumber_pages = self._plumber_pages()
+                if page_num < len(plumber_pages):
+                    page_records["tables"] = self._pdf_page_tables(page_num, plumber_pages[page_num])
+            yield page_records
+        
+        self._log_table_prefilter()
+    
+    def _iter_pdf_pages_sharded(self, output_dir):
+        """Yield all record types from PDF files, extracting page shards in worker processes.
+        
+        Each worker opens its own PyMuPDF and pdfplumber handles for a
+        contiguous run of at most MAX_SHARD_PAGES pages. At most page_workers
+        shards are in flight, and each is yielded in page order as soon as it
+        and every earlier shard are done, so the parent never holds more than
+        a few shards of records. Stages timed in the workers are added to the
+        metrics recorder with a "shard_" prefix, and their table prefilter
+        counts to table_prefilter_stats. Images are only deduplicated within
+        a shard.
+        """
+        fitz_doc = self.file_data.get("fitz_doc")
+        
+        if not fitz_doc:
+            logger.warning("Fitz document not available for extraction")
+            return
+        
+        page_count = len(fitz_doc)
+        indices = self.pages.indices(page_count) if self.pages is not None else list(range(page_count))
+        
+        # A few shards per worker keep the workers busy when pages differ in cost
+        shard_size = min(MAX_SHARD_PAGES, max(MIN_SHARD_PAGES, math.ceil(len(indices) / (self.page_workers * 4))))
+        if len(indices) <= shard_size:
+            yield from self._iter_pdf_pages(output_dir)
+            return
+        
+        options = {
+            "skip_tables": self.skip_tables,
+            "image_writer_workers": self.image_writer_workers,
+            "text_granularity": self.text_granularity,
+            "table_prefilter": self.table_prefilter
+        }
+        collect_metrics = isinstance(self.metrics, MetricsRecorder)
+        shard_count = math.ceil(len(indices) / shard_size)
+        shards = (indices[start:start + shard_size] for start in range(0, len(indices), shard_size))
+        logger.info(f"Extracting {len(indices)} pages of {self.file_name} in {shard_count} shards "
+                    f"with {self.page_workers} processes")
+        
+        with ProcessPoolExecutor(max_workers=self.page_workers) as executor:
+            def submit(shard):
+                """Start extracting a shard in a worker process."""
+                return executor.submit(
+                    _extract_pdf_shard,
+                    self.file_loader.file_path,
+                    self.file_name,
+                    ",".join(str(index + 1) for index in shard),
+                    output_dir,
+                    options,
+                    collect_metrics
+                )
             
-            if extension == ".pdf":
-                return self._extract_pdf_tables()
-            elif extension == ".docx":
-                return self._extract_docx_tables()
-            elif extension == ".pptx":
-                return self._extract_pptx_tables()
+            in_flight = deque(submit(shard) for shard in itertools.islice(shards, self.page_workers))
+            while in_flight:
+                result = in_flight.popleft().result()
+                
+                # Keep every worker busy while this shard's pages are consumed
+                next_shard = next(shards, None)
+                if next_shard is not None:
+                    in_flight.append(submit(next_shard))
+                
+                if result["metrics"]:
+                    self.metrics.merge(result["metrics"], prefix="shard_")
+                for key, count in result["table_prefilter_stats"].items():
+                    self.table_prefilter_stats[key] += count
+                yield from result["pages"]
         
-        return []  # Return empty list if file type not supported
+        self._log_table_prefilter()
     
-    # PDF extraction methods
-    def _extract_pdf_text(self):
-        """Extract text from PDF files."""
-        text_data = []
+    def _iter_pdf_text(self):
+        """Yield text from PDF files page by page."""
         fitz_doc = self.file_data.get("fitz_doc")
         
-        for page_num, page in enumerate(fitz_doc):
-            blocks = page.get_text("dict").get("blocks", [])
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line.get("spans", []):
-                            text_data.append({
-                                "page_number": page_num + 1,
-                                "text": span.get("text", ""),
-                                "font": span.get("font", ""),
-                                "size": span.get("size", 0),
-                                "color": span.get("color", ""),
-                                "is_bold": "bold" in span.get("font", "").lower(),
-                                "is_italic": "italic" in span.get("font", "").lower(),
-                                "file_type": "pdf",
-                                "file_name": self.file_name
-                            })
+        for page_num, page in self._selected(fitz_doc):
+            yield from self._pdf_page_text(page_num, page)
+    
+    def _pdf_page_text(self, page_num, page):
+        """Extract text spans from a single PDF page, merged to the text granularity."""
+        text_data = []
+        blocks = page.get_text("dict").get("blocks", [])
+        
+        # Text of the record being merged and the line its last span came from
+        parts = []
+        last_group = last_line = None
+        
+        for block_idx, block in enumerate(blocks):
+            if "lines" in block:
+                for line_idx, line in enumerate(block["lines"]):
+                    for span in line.get("spans", []):
+                        record = PDFTextRecord(
+                            page_number=page_num + 1,
+                            text=span.get("text", ""),
+                            font=span.get("font", ""),
+                            size=span.get("size", 0),
+                            color=span.get("color", ""),
+                            is_bold="bold" in span.get("font", "").lower(),
+                            is_italic="italic" in span.get("font", "").lower(),
+                            file_type="pdf",
+                            file_name=self.file_name
+                        )
+                        if self.text_granularity == "span":
+                            text_data.append(record)
+                            continue
+                        
+                        group = self._pdf_text_group(block_idx, line_idx)
+                        if (text_data and group == last_group
+                                and self._pdf_text_style(record) == self._pdf_text_style(text_data[-1])):
+                            # Same style as the previous span: extend its record
+                            if (block_idx, line_idx) != last_line:
+                                parts.append("\n")
+                            parts.append(record["text"])
+                        else:
+                            if text_data:
+                                text_data[-1]["text"] = "".join(parts)
+                            text_data.append(record)
+                            parts = [record["text"]]
+                        last_group, last_line = group, (block_idx, line_idx)
+        
+        if parts:
+            text_data[-1]["text"] = "".join(parts)
         
         return text_data
     
-    def _extract_pdf_links(self):
-        """Extract hyperlinks from PDF files."""
-        links_data = []
+    def _pdf_text_group(self, block_idx, line_idx):
+        """Return the key of the unit spans may be merged within at the text granularity."""
+        if self.text_granularity == "line":
+            return (block_idx, line_idx)
+        if self.text_granularity == "block":
+            return block_idx
+        return None
+    
+    def _pdf_text_style(self, record):
+        """Return the style that adjacent spans must share to be merged."""
+        return (record["font"], record["size"], record["color"])
+    
+    def _iter_pdf_links(self):
+        """Yield hyperlinks from PDF files page by page."""
         fitz_doc = self.file_data.get("fitz_doc")
         
         if not fitz_doc:
             logger.warning("Fitz document not available for link extraction")
-            return links_data
-            
-        for page_num, page in enumerate(fitz_doc):
-            try:
-                links = page.get_links() or []
-                for link in links:
-                    if "uri" in link:
-                        # Extract text near the link using rect coordinates
-                        rect = link.get("rect")
-                        try:
-                            linked_text = page.get_textbox(rect) if rect else "Unknown"
-                        except Exception:
-                            linked_text = "Unknown"
-                        
-                        links_data.append({
-                            "page_number": page_num + 1,
-                            "url": link["uri"],
-                            "linked_text": linked_text.strip() if linked_text else "Unknown",
-                            "rect": [round(coord, 2) for coord in rect] if rect else [],
-                            "file_type": "pdf",
-                            "file_name": self.file_name
-                        })
-            except Exception as e:
-                logger.error(f"Error extracting links from page {page_num}: {e}")
+            return
+        
+        for page_num, page in self._selected(fitz_doc):
+            yield from self._pdf_page_links(page_num, page)
+    
+    def _pdf_page_links(self, page_num, page):
+        """Extract hyperlinks from a single PDF page."""
+        links_data = []
+        try:
+            links = page.get_links() or []
+            for link in links:
+                if "uri" in link:
+                    # Extract text near the link using rect coordinates
+                    rect = link.get("rect")
+                    try:
+                        linked_text = page.get_textbox(rect) if rect else "Unknown"
+                    except Exception:
+                        linked_text = "Unknown"
+                    
+                    links_data.append({
+                        "page_number": page_num + 1,
+                        "url": link["uri"],
+                        "linked_text": linked_text.strip() if linked_text else "Unknown",
+                        "rect": [round(coord, 2) for coord in rect] if rect else [],
+                        "file_type": "pdf",
+                        "file_name": self.file_name
+                    })
+        except Exception as e:
+            logger.error(f"Error extracting links from page {page_num}: {e}")
         
         return links_data
     
-    def _extract_pdf_images(self, output_dir):
-        """Extract images from PDF files."""
-        images_data = []
+    def _iter_pdf_images(self, output_dir):
+        """Yield images from PDF files page by page."""
         fitz_doc = self.file_data.get("fitz_doc")
         
         if not fitz_doc:
             logger.warning("Fitz document not available for image extraction")
-            return images_data
+            return
+        
+        for page_num, page in self._selected(fitz_doc):
+            yield from self._pdf_page_images(fitz_doc, page_num, page, output_dir)
+    
+    def _pdf_page_images(self, fitz_doc, page_num, page, output_dir):
+        """Extract images from a single PDF page."""
+        images_data = []
+        try:
+            image_list = page.get_images(full=True) or []
             
-        for page_num, page in enumerate(fitz_doc):
-            try:
-                image_list = page.get_images(full=True) or []
-                
-                for img_idx, img_info in enumerate(image_list):
-                    try:
-                        xref = img_info[0]
+            for img_idx, img_info in enumerate(image_list):
+                try:
+                    xref = img_info[0]
+                    
+                    # Each image object is decoded and saved once, however many pages show it
+                    saved_image = self._saved_images.get((output_dir, "xref", xref))
+                    if saved_image is None:
                         base_image = fitz_doc.extract_image(xref)
                         if not base_image:
                             continue
-                            
+                        
                         image_bytes = base_image.get("image")
                         if not image_bytes:
                             continue
-                            
+                        
                         image_ext = base_image.get("ext", "png")
                         
                         # Save image to file
                         filename = f"pdf_{self.file_name.replace('.pdf', '')}_{page_num+1}_{img_idx+1}.{image_ext}"
                         filepath = os.path.join(output_dir, filename)
                         
-                        with open(filepath, "wb") as img_file:
-                            img_file.write(image_bytes)
+                        self._write_image(filepath, image_bytes)
                         
-                        # Get image dimensions
-                        try:
-                            img = Image.open(io.BytesIO(image_bytes))
-                            width, height = img.size
-                        except Exception:
-                            width, height = 0, 0
+                        # PyMuPDF already reports the dimensions, no need to decode the image
+                        width, height = self._image_size(image_bytes, base_image.get("width"), base_image.get("height"))
                         
-                        images_data.append({
-                            "page_number": page_num + 1,
-                            "image_index": img_idx + 1,
-                            "width": width,
-                            "height": height,
-                            "format": image_ext,
-                            "file_path": filepath,
-                            "file_type": "pdf",
-                            "file_name": self.file_name
-                        })
-                    except Exception as e:
-                        logger.error(f"Error extracting image {img_idx} from page {page_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error getting images from page {page_num}: {e}")
+                        saved_image = {"width": width, "height": height, "format": image_ext, "file_path": filepath}
+                        self._saved_images[(output_dir, "xref", xref)] = saved_image
+                    
+                    images_data.append({
+                        "page_number": page_num + 1,
+                        "image_index": img_idx + 1,
+                        "width": saved_image["width"],
+                        "height": saved_image["height"],
+                        "format": saved_image["format"],
+                        "file_path": saved_image["file_path"],
+                        "file_type": "pdf",
+                        "file_name": self.file_name
+                    })
+                except Exception as e:
+                    logger.error(f"Error extracting image {img_idx} from page {page_num}: {e}")
+        except Exception as e:
+            logger.error(f"Error getting images from page {page_num}: {e}")
         
         return images_data
     
-    def _extract_pdf_tables(self):
-        """Extract tables from PDF files using pdfplumber."""
-        tables_data = []
+    def _iter_pdf_tables(self):
+        """Yield tables from PDF files page by page using pdfplumber."""
+        fitz_doc = self.file_data.get("fitz_doc") if self.table_prefilter else None
+        plumber_pages = self._plumber_pages()
+        
+        for page_num, page in self._selected(plumber_pages):
+            if fitz_doc and not self._pdf_page_may_have_tables(fitz_doc[page_num]):
+                continue
+            yield from self._pdf_page_tables(page_num, page)
+        
+        self._log_table_prefilter()
+    
+    def _plumber_pages(self):
+        """Return the pdfplumber pages of the PDF, or an empty list if it cannot be opened."""
         plumber_doc = self.file_data.get("plumber_doc")
         
         if not plumber_doc:
             logger.warning("PDFPlumber document not available for table extraction")
-            return tables_data
-            
-        for page_num, page in enumerate(plumber_doc.pages):
-            tables = page.extract_tables() or []
+            return []
+        return plumber_doc.pages
+    
+    def _pdf_page_may_have_tables(self, page):
+        """Return False if a PyMuPDF page has too few ruling lines to hold a table.
+        
+        pdfplumber's default table finder builds cells only from horizontal
+        and vertical edges of drawn lines, rectangles and curves, so a page
+        needs at least two of each for extract_tables to find anything.
+        Reading the drawings with PyMuPDF is much cheaper than the pdfplumber
+        layout pass it avoids.
+        """
+        if not self.table_prefilter:
+            return True
+        
+        self.table_prefilter_stats["pages"] += 1
+        horizontal = vertical = 0
+        
+        for drawing in page.get_drawings():
+            for item in drawing["items"]:
+                if item[0] == "re":
+                    horizontal += 2
+                    vertical += 2
+                    continue
+                if item[0] == "qu":
+                    quad = item[1]
+                    points = [quad.ul, quad.ur, quad.lr, quad.ll, quad.ul]
+                else:
+                    # Lines ("l") and the points of Bezier curves ("c")
+                    points = item[1:]
+                
+                for start, end in zip(points, points[1:]):
+                    if abs(start.y - end.y) <= RULING_TOLERANCE:
+                        horizontal += 1
+                    elif abs(start.x - end.x) <= RULING_TOLERANCE:
+                        vertical += 1
             
-            for table_idx, table in enumerate(tables):
-                if table:  # Ensure table is not empty
-                    tables_data.append({
-                        "page_number": page_num + 1,
-                        "table_index": table_idx + 1,
-                        "rows": len(table),
-                        "columns": len(table[0]) if table and table[0] else 0,
-                        "content": table,
-                        "file_type": "pdf",
-                        "file_name": self.file_name
-                    })
+            if horizontal >= 2 and vertical >= 2:
+                return True
+        
+        self.table_prefilter_stats["skipped"] += 1
+        return False
+    
+    def _log_table_prefilter(self):
+        """Report how many pages the table prefilter kept away from pdfplumber."""
+        stats = self.table_prefilter_stats
+        if stats["pages"]:
+            logger.info(f"Table prefilter skipped {stats['skipped']} of {stats['pages']} pages "
+                        f"without ruling lines in {self.file_name}")
+    
+    def _pdf_page_tables(self, page_num, page):
+        """Extract tables from a single pdfplumber page."""
+        tables_data = []
+        tables = page.extract_tables() or []
+        
+        # Drop the page's parsed objects, which pdfplumber keeps cached on the document
+        release_page = getattr(page, "close", None) or page.flush_cache
+        release_page()
+        
+        for table_idx, table in enumerate(tables):
+            if table:  # Ensure table is not empty
+                tables_data.append({
+                    "page_number": page_num + 1,
+                    "table_index": table_idx + 1,
+                    "rows": len(table),
+                    "columns": len(table[0]) if table and table[0] else 0,
+                    "content": table,
+                    "file_type": "pdf",
+                    "file_name": self.file_name
+                })
         
         return tables_data
     
     # DOCX extraction methods
-    def _extract_docx_text(self):
-        """Extract text from DOCX files."""
-        text_data = []
+    def _iter_docx_pages(self, output_dir):
+        """Yield all record types from DOCX files, visiting each paragraph once."""
+        doc = self.file_data.get("doc")
+        
+        for para_idx, paragraph in enumerate(doc.paragraphs):
+            yield {
+                "text": self._docx_paragraph_text(para_idx, paragraph),
+                "links": self._docx_paragraph_links(para_idx, paragraph)
+            }
+        
+        # Images and tables are not tied to paragraphs
+        for image_record in self._iter_docx_images(output_dir):
+            yield {"images": [image_record]}
+        
+        if not self.skip_tables:
+            for table_record in self._iter_docx_tables():
+                yield {"tables": [table_record]}
+    
+    def _iter_docx_text(self):
+        """Yield text from DOCX files paragraph by paragraph."""
         doc = self.file_data.get("doc")
         
         # We don't have direct page numbers in docx, so we'll use paragraph index
         for para_idx, paragraph in enumerate(doc.paragraphs):
-            if paragraph.text.strip():
-                # Extract style information
-                style_name = paragraph.style.name if paragraph.style else "Normal"
-                is_heading = style_name.startswith("Heading")
-                
-                # Check for formatting in runs
-                for run_idx, run in enumerate(paragraph.runs):
-                    text_data.append({
-                        "paragraph_index": para_idx + 1,
-                        "run_index": run_idx + 1,
-                        "text": run.text,
-                        "style": style_name,
-                        "is_bold": run.bold,
-                        "is_italic": run.italic,
-                        "is_heading": is_heading,
-                        "heading_level": int(style_name[7:]) if is_heading and len(style_name) > 7 else None,
-                        "file_type": "docx",
-                        "file_name": self.file_name
-                    })
+            yield from self._docx_paragraph_text(para_idx, paragraph)
+    
+    def _docx_paragraph_text(self, para_idx, paragraph):
+        """Extract text runs from a single DOCX paragraph."""
+        text_data = []
+        if paragraph.text.strip():
+            # Extract style information
+            style_name = paragraph.style.name if paragraph.style else "Normal"
+            is_heading = style_name.startswith("Heading")
+            
+            # Check for formatting in runs
+            for run_idx, run in enumerate(paragraph.runs):
+                text_data.append(DOCXTextRecord(
+                    paragraph_index=para_idx + 1,
+                    run_index=run_idx + 1,
+                    text=run.text,
+                    style=style_name,
+                    is_bold=run.bold,
+                    is_italic=run.italic,
+                    is_heading=is_heading,
+                    heading_level=int(style_name[7:]) if is_heading and len(style_name) > 7 else None,
+                    file_type="docx",
+                    file_name=self.file_name
+                ))
         
         return text_data
     
-    def _extract_docx_links(self):
-        """Extract hyperlinks from DOCX files."""
-        links_data = []
+    def _iter_docx_links(self):
+        """Yield hyperlinks from DOCX files paragraph by paragraph."""
         doc = self.file_data.get("doc")
         
         for para_idx, paragraph in enumerate(doc.paragraphs):
-            # Parse the paragraph's XML to extract hyperlinks
-            if "_element" in dir(paragraph):
-                xml = paragraph._element.xml
-                soup = BeautifulSoup(xml, "xml")
-                hyperlinks = soup.find_all("hyperlink")
-                
-                for link_idx, hyperlink in enumerate(hyperlinks):
-                    # Get the relationship ID
-                    rel_id = hyperlink.get("r:id")
-                    if rel_id:
-                        # Get the URL from relationships
-                        target_url = ""
-                        for rel in paragraph.part.rels:
-                            if rel == rel_id:
-                                target_url = paragraph.part.rels[rel].target_ref
-                        
-                        # Get the text of the hyperlink
-                        link_text = ""
-                        text_elements = hyperlink.find_all("t")
-                        if text_elements:
-                            link_text = " ".join([t.get_text() for t in text_elements])
-                        
-                        links_data.append({
-                            "paragraph_index": para_idx + 1,
-                            "link_index": link_idx + 1,
-                            "url": target_url,
-                            "linked_text": link_text,
-                            "file_type": "docx",
-                            "file_name": self.file_name
-                        })
+            yield from self._docx_paragraph_links(para_idx, paragraph)
+    
+    def _docx_paragraph_links(self, para_idx, paragraph):
+        """Extract hyperlinks from a single DOCX paragraph."""
+        links_data = []
+        
+        # Query the paragraph's parsed XML tree for hyperlinks
+        if hasattr(paragraph, "_element"):
+            rel_targets = None
+            
+            for link_idx, hyperlink in enumerate(_docx_xpath(".//w:hyperlink")(paragraph._element)):
+                # Get the relationship ID
+                rel_id = hyperlink.get(DOCX_REL_ID)
+                if rel_id:
+                    # Get the URL from relationships
+                    if rel_targets is None:
+                        rel_targets = self._rel_targets(paragraph.part)
+                    target_url = rel_targets.get(rel_id, "")
+                    
+                    # Get the text of the hyperlink
+                    link_text = " ".join(t.text or "" for t in _docx_xpath(".//w:t")(hyperlink))
+                    
+                    links_data.append({
+                        "paragraph_index": para_idx + 1,
+                        "link_index": link_idx + 1,
+                        "url": target_url,
+                        "linked_text": link_text,
+                        "file_type": "docx",
+                        "file_name": self.file_name
+                    })
         
         return links_data
     
-    def _extract_docx_images(self, output_dir):
-        """Extract images from DOCX files."""
-        images_data = []
+    def _rel_targets(self, part):
+        """Return a relationship ID to target mapping for a DOCX part, built once per part."""
+        rel_targets = self._part_rel_targets.get(part)
+        if rel_targets is None:
+            rel_targets = {rel_id: rel.target_ref for rel_id, rel in part.rels.items()}
+            self._part_rel_targets[part] = rel_targets
+        return rel_targets
+    
+    def _iter_docx_images(self, output_dir):
+        """Yield images from DOCX files."""
         doc = self.file_data.get("doc")
         
         for rel_id, rel in doc.part.rels.items():
@@ -307,37 +918,39 @@ class DataExtractor:
                 image_part = rel.target_part
                 image_bytes = image_part.blob
                 
-                # Determine image type from content_type
-                img_format = image_part.content_type.split("/")[-1]
-                if img_format == "jpeg":
-                    img_format = "jpg"
-                
-                # Save image to file
-                filename = f"docx_{self.file_name.replace('.docx', '')}_{rel_id}.{img_format}"
-                filepath = os.path.join(output_dir, filename)
-                
-                with open(filepath, "wb") as img_file:
-                    img_file.write(image_bytes)
-                
-                # Get image dimensions
-                img = Image.open(io.BytesIO(image_bytes))
-                width, height = img.size
+                # Identical images referenced by several relationships are saved once
+                content_key = (output_dir, "sha1", hashlib.sha1(image_bytes).hexdigest())
+                saved_image = self._saved_images.get(content_key)
+                if saved_image is None:
+                    # Determine image type from content_type
+                    img_format = image_part.content_type.split("/")[-1]
+                    if img_format == "jpeg":
+                        img_format = "jpg"
+                    
+                    # Save image to file
+                    filename = f"docx_{self.file_name.replace('.docx', '')}_{rel_id}.{img_format}"
+                    filepath = os.path.join(output_dir, filename)
+                    
+                    self._write_image(filepath, image_bytes)
+                    
+                    # Get image dimensions
+                    width, height = self._image_size(image_bytes)
+                    
+                    saved_image = {"width": width, "height": height, "format": img_format, "file_path": filepath}
+                    self._saved_images[content_key] = saved_image
                 
-                images_data.append({
+                yield {
                     "rel_id": rel_id,
-                    "width": width,
-                    "height": height,
-                    "format": img_format,
-                    "file_path": filepath,
+                    "width": saved_image["width"],
+                    "height": saved_image["height"],
+                    "format": saved_image["format"],
+                    "file_path": saved_image["file_path"],
                     "file_type": "docx",
                     "file_name": self.file_name
-                })
-        
-        return images_data
+                }
     
-    def _extract_docx_tables(self):
-        """Extract tables from DOCX files."""
-        tables_data = []
+    def _iter_docx_tables(self):
+        """Yield tables from DOCX files."""
         doc = self.file_data.get("doc")
         
         for table_idx, table in enumerate(doc.tables):
@@ -346,90 +959,121 @@ class DataExtractor:
                 row_data = [cell.text for cell in row.cells]
                 rows_data.append(row_data)
             
-            tables_data.append({
+            yield {
                 "table_index": table_idx + 1,
                 "rows": len(table.rows),
                 "columns": len(table.rows[0].cells) if table.rows else 0,
                 "content": rows_data,
                 "file_type": "docx",
                 "file_name": self.file_name
-            })
-        
-        return tables_data
+            }
     
     # PPTX extraction methods
-    def _extract_pptx_text(self):
-        """Extract text from PPTX files."""
-        text_data = []
+    def _iter_pptx_pages(self, output_dir):
+        """Yield all record types from PPTX files, visiting each slide once."""
         presentation = self.file_data.get("presentation")
         
-        for slide_idx, slide in enumerate(presentation.slides):
-            # Extract text from shapes
-            for shape_idx, shape in enumerate(slide.shapes):
-                if hasattr(shape, "text") and shape.text.strip():
-                    # Check if it's a title or regular text
-                    is_title = shape.name.startswith("Title") if hasattr(shape, "name") else False
-                    
-                    text_data.append({
-                        "slide_number": slide_idx + 1,
-                        "shape_index": shape_idx + 1,
-                        "text": shape.text,
-                        "is_title": is_title,
-                        "shape_type": shape.name if hasattr(shape, "name") else "Unknown",
-                        "file_type": "pptx",
-                        "file_name": self.file_name
-                    })
+        for slide_idx, slide in self._selected(presentation.slides):
+            # Build the shape proxies once and share them between extractors
+            shapes = list(slide.shapes)
+            yield {
+                "text": self._pptx_slide_text(slide_idx, shapes),
+                "links": self._pptx_slide_links(slide_idx, shapes),
+                "images": self._pptx_slide_images(slide_idx, shapes, output_dir),
+                "tables": [] if self.skip_tables else self._pptx_slide_tables(slide_idx, shapes)
+            }
+    
+    def _iter_pptx_text(self):
+        """Yield text from PPTX files slide by slide."""
+        presentation = self.file_data.get("presentation")
+        
+        for slide_idx, slide in self._selected(presentation.slides):
+            yield from self._pptx_slide_text(slide_idx, slide.shapes)
+    
+    def _pptx_slide_text(self, slide_idx, shapes):
+        """Extract text from the shapes of a single slide."""
+        text_data = []
+        
+        # Extract text from shapes
+        for shape_idx, shape in enumerate(shapes):
+            if hasattr(shape, "text") and shape.text.strip():
+                # Check if it's a title or regular text
+                is_title = shape.name.startswith("Title") if hasattr(shape, "name") else False
+                
+                text_data.append(PPTXTextRecord(
+                    slide_number=slide_idx + 1,
+                    shape_index=shape_idx + 1,
+                    text=shape.text,
+                    is_title=is_title,
+                    shape_type=shape.name if hasattr(shape, "name") else "Unknown",
+                    file_type="pptx",
+                    file_name=self.file_name
+                ))
         
         return text_data
     
-    def _extract_pptx_links(self):
-        """Extract hyperlinks from PPTX files."""
-        links_data = []
+    def _iter_pptx_links(self):
+        """Yield hyperlinks from PPTX files slide by slide."""
         presentation = self.file_data.get("presentation")
         
-        for slide_idx, slide in enumerate(presentation.slides):
-            for shape_idx, shape in enumerate(slide.shapes):
-                # Check if shape has hyperlink
-                if hasattr(shape, "click_action") and shape.click_action.hyperlink.address:
-                    links_data.append({
-                        "slide_number": slide_idx + 1,
-                        "shape_index": shape_idx + 1,
-                        "url": shape.click_action.hyperlink.address,
-                        "linked_text": shape.text if hasattr(shape, "text") else "Unknown",
-                        "file_type": "pptx",
-                        "file_name": self.file_name
-                    })
-                
-                # Check text runs for hyperlinks (for text with partial hyperlinks)
-                if hasattr(shape, "text_frame") and hasattr(shape.text_frame, "paragraphs"):
-                    for para_idx, paragraph in enumerate(shape.text_frame.paragraphs):
-                        for run_idx, run in enumerate(paragraph.runs):
-                            if hasattr(run, "hyperlink") and run.hyperlink.address:
-                                links_data.append({
-                                    "slide_number": slide_idx + 1,
-                                    "shape_index": shape_idx + 1,
-                                    "paragraph_index": para_idx + 1,
-                                    "run_index": run_idx + 1,
-                                    "url": run.hyperlink.address,
-                                    "linked_text": run.text,
-                                    "file_type": "pptx",
-                                    "file_name": self.file_name
-                                })
+        for slide_idx, slide in self._selected(presentation.slides):
+            yield from self._pptx_slide_links(slide_idx, slide.shapes)
+    
+    def _pptx_slide_links(self, slide_idx, shapes):
+        """Extract hyperlinks from the shapes of a single slide."""
+        links_data = []
+        
+        for shape_idx, shape in enumerate(shapes):
+            # Check if shape has hyperlink
+            if hasattr(shape, "click_action") and shape.click_action.hyperlink.address:
+                links_data.append({
+                    "slide_number": slide_idx + 1,
+                    "shape_index": shape_idx + 1,
+                    "url": shape.click_action.hyperlink.address,
+                    "linked_text": shape.text if hasattr(shape, "text") else "Unknown",
+                    "file_type": "pptx",
+                    "file_name": self.file_name
+                })
+            
+            # Check text runs for hyperlinks (for text with partial hyperlinks)
+            if hasattr(shape, "text_frame") and hasattr(shape.text_frame, "paragraphs"):
+                for para_idx, paragraph in enumerate(shape.text_frame.paragraphs):
+                    for run_idx, run in enumerate(paragraph.runs):
+                        if hasattr(run, "hyperlink") and run.hyperlink.address:
+                            links_data.append({
+                                "slide_number": slide_idx + 1,
+                                "shape_index": shape_idx + 1,
+                                "paragraph_index": para_idx + 1,
+                                "run_index": run_idx + 1,
+                                "url": run.hyperlink.address,
+                                "linked_text": run.text,
+                                "file_type": "pptx",
+                                "file_name": self.file_name
+                            })
         
         return links_data
     
-    def _extract_pptx_images(self, output_dir):
-        """Extract images from PPTX files."""
-        images_data = []
+    def _iter_pptx_images(self, output_dir):
+        """Yield images from PPTX files slide by slide."""
         presentation = self.file_data.get("presentation")
         
-        for slide_idx, slide in enumerate(presentation.slides):
-            for shape_idx, shape in enumerate(slide.shapes):
-                # Check if shape is a picture
-                if hasattr(shape, "image"):
-                    # Get image data
-                    image_bytes = shape.image.blob
-                    
+        for slide_idx, slide in self._selected(presentation.slides):
+            yield from self._pptx_slide_images(slide_idx, slide.shapes, output_dir)
+    
+    def _pptx_slide_images(self, slide_idx, shapes, output_dir):
+        """Extract images from the shapes of a single slide."""
+        images_data = []
+        
+        for shape_idx, shape in enumerate(shapes):
+            # Check if shape is a picture
+            if hasattr(shape, "image"):
+                # Get image data
+                image_bytes = shape.image.blob
+                
+                # Images repeated across slides (logos, master artwork) are saved once
+                content_key = (output_dir, "sha1", hashlib.sha1(image_bytes).hexdigest())
+                saved_image = self._saved_images.get(content_key)
+                if saved_image is None:
                     # Determine image type from content_type
                     img_format = "png"  # Default to png if can't determine
                     if shape.image.content_type:
@@ -441,56 +1085,81 @@ class DataExtractor:
                     filename = f"pptx_{self.file_name.replace('.pptx', '')}_{slide_idx+1}_{shape_idx+1}.{img_format}"
                     filepath = os.path.join(output_dir, filename)
                     
-                    with open(filepath, "wb") as img_file:
-                        img_file.write(image_bytes)
+                    self._write_image(filepath, image_bytes)
                     
                     # Get image dimensions
-                    img = Image.open(io.BytesIO(image_bytes))
-                    width, height = img.size
+                    width, height = self._image_size(image_bytes)
                     
-                    images_data.append({
-                        "slide_number": slide_idx + 1,
-                        "shape_index": shape_idx + 1,
-                        "width": width,
-                        "height": height,
-                        "format": img_format,
-                        "file_path": filepath,
-                        "file_type": "pptx",
-                        "file_name": self.file_name
-                    })
+                    saved_image = {"width": width, "height": height, "format": img_format, "file_path": filepath}
+                    self._saved_images[content_key] = saved_image
+                
+                images_data.append({
+                    "slide_number": slide_idx + 1,
+                    "shape_index": shape_idx + 1,
+                    "width": saved_image["width"],
+                    "height": saved_image["height"],
+                    "format": saved_image["format"],
+                    "file_path": saved_image["file_path"],
+                    "file_type": "pptx",
+                    "file_name": self.file_name
+                })
         
         return images_data
     
-    def _extract_pptx_tables(self):
-        """Extract tables from PPTX files."""
-        tables_data = []
+    def _iter_pptx_tables(self):
+        """Yield tables from PPTX files slide by slide."""
         presentation = self.file_data.get("presentation")
         
-        for slide_idx, slide in enumerate(presentation.slides):
-            table_idx = 0
-            for shape in slide.shapes:
-                if hasattr(shape, "table"):
-                    table = shape.table
-                    rows_data = []
-                    for row in table.rows:
-                        row_data = []
-                        for cell in row.cells:
-                            if cell.text_frame:
-                                row_data.append(cell.text_frame.text)
-                            else:
-                                row_data.append("")
-                        rows_data.append(row_data)
-                    
-                    tables_data.append({
-                        "slide_number": slide_idx + 1,
-                        "table_index": table_idx + 1,
-                        "rows": len(table.rows),
-                        "columns": len(table.columns),
-                        "content": rows_data,
-                        "file_type": "pptx",
-                        "file_name": self.file_name
-                    })
-                    
-                    table_idx += 1
+        for slide_idx, slide in self._selected(presentation.slides):
+            yield from self._pptx_slide_tables(slide_idx, slide.shapes)
+    
+    def _pptx_slide_tables(self, slide_idx, shapes):
+        """Extract tables from the shapes of a single slide."""
+        tables_data = []
+        table_idx = 0
         
-        return tables_data
\ No newline at end of file
+        for shape in shapes:
+            if hasattr(shape, "table"):
+                table = shape.table
+                rows_data = []
+                for row in table.rows:
+                    row_data = []
+                    for cell in row.cells:
+                        if cell.text_frame:
+                            row_data.append(cell.text_frame.text)
+                        else:
+                            row_data.append("")
+                    rows_data.append(row_data)
+                
+                tables_data.append({
+                    "slide_number": slide_idx + 1,
+                    "table_index": table_idx + 1,
+                    "rows": len(table.rows),
+                    "columns": len(table.columns),
+                    "content": rows_data,
+                    "file_type": "pptx",
+                    "file_name": self.file_name
+                })
+                
+                table_idx += 1
+        
+        return tables_data
+
+
+def _extract_pdf_shard(file_path, file_name, page_spec, output_dir, options, collect_metrics=False):
+    """Extract the page records of some pages of a PDF in a worker process.
+    
+    file_name is the name the records carry. Returns a dict with "pages", the
+    records of every page in page_spec in page order, "table_prefilter_stats",
+    the shard's table prefilter counts, and "metrics", the stages recorded in
+    the worker when collect_metrics is set.
+    """
+    metrics = MetricsRecorder(file_name) if collect_metrics else None
+    loader = PDFLoader(file_path, metrics, file_name)
+    with DataExtractor(loader, pages=page_spec, metrics=metrics, **options) as data_extractor:
+        pages = list(data_extractor.iter_pages(output_dir))
+    return {
+        "pages": pages,
+        "table_prefilter_stats": data_extractor.table_prefilter_stats,
+        "metrics": metrics.stages if metrics is not None else None
+    }
@@ -0,0 +1,124 @@
+import os
+import sys
+import glob
+import heapq
+import itertools
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Extensions picked up when scanning directories and glob patterns
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".pptx")
+
+# Discovered files looked at before the largest one is handed out
+DEFAULT_SIZE_ORDER_WINDOW = 1000
+
+
+def is_supported(path):
+    """Return True if path has an extension a file loader exists for."""
+    return os.path.splitext(path)[1].lower() in SUPPORTED_EXTENSIONS
+
+
+def iter_directory(directory, recursive=True):
+    """Yield the supported files in directory, descending into subdirectories if recursive.
+    
+    Directories are scanned with os.scandir one at a time, so files are
+    yielded while the rest of the tree is still unexplored. Entries are
+    visited in name order for a repeatable run.
+    """
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as scan:
+                entries = sorted(scan, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.error(f"Error reading directory {current}: {str(e)}")
+            continue
+        
+        subdirectories = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif entry.is_file() and is_supported(entry.name):
+                yield entry.path
+        
+        if recursive:
+            # Reversed so subdirectories are popped in name order
+            pending.extend(reversed(subdirectories))
+
+
+def iter_glob(pattern):
+    """Yield the supported files matching a glob pattern; ** matches nested directories."""
+    for path in glob.iglob(pattern, recursive=True):
+        if is_supported(path) and os.path.isfile(path):
+            yield path
+
+
+def iter_manifest(manifest):
+    """Yield the paths listed one per line in a manifest file, or on stdin for "-".
+    
+    Blank lines and lines starting with # are skipped. Listed paths are
+    yielded as given, like --files, so unsupported files are reported as
+    failures instead of being dropped silently.
+    """
+    if manifest == "-":
+        yield from _manifest_paths(sys.stdin)
+        return
+    
+    with open(manifest, encoding="utf-8") as manifest_file:
+        yield from _manifest_paths(manifest_file)
+
+
+def _manifest_paths(lines):
+    """Yield the paths of manifest lines."""
+    for line in lines:
+        path = line.strip()
+        if path and not path.startswith("#"):
+            yield path
+
+
+def discover_files(files=(), directories=(), globs=(), manifests=(), recursive=True):
+    """Lazily yield input files from explicit paths, directories, glob patterns and manifests.
+    
+    Sources are read in that order and only as far as the caller consumes
+    them. Duplicates are not removed here; process_files skips them.
+    """
+    sources = [iter(files)]
+    sources.extend(iter_directory(directory, recursive) for directory in directories)
+    sources.extend(iter_glob(pattern) for pattern in globs)
+    sources.extend(iter_manifest(manifest) for manifest in manifests)
+    return itertools.chain.from_iterable(sources)
+
+
+def largest_first(paths, window=DEFAULT_SIZE_ORDER_WINDOW):
+    """Yield paths roughly ordered by file size, largest first, reading at most window paths ahead.
+    
+    Discovered paths are kept in a heap of up to window entries and the
+    largest is handed out whenever another path arrives, so big files start
+    early and a worker pool is not left waiting on one large file at the end,
+    without reading the whole input before the first file is processed. A
+    window of 0 or less keeps the discovery order. Files that cannot be
+    stat'ed sort last and fail when they are processed.
+    """
+    if window <= 0:
+        yield from paths
+        return
+    
+    heap = []
+    for sequence, path in enumerate(paths):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = -1
+        heapq.heappush(heap, (-size, sequence, path))
+        if len(heap) > window:
+            yield heapq.heappop(heap)[2]
+    
+    while heap:
+        yield heapq.heappop(heap)[2]
@@ -0,0 +1,294 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+from data_extractor import DATA_TYPES, EXTRACTOR_VERSION, extracted_data_types
+from metrics import NULL_METRICS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def content_hash(file_path):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """On-disk cache of extraction results keyed by file content.
+    
+    Each entry is a directory holding the records of every page as JSON lines
+    plus copies of the extracted images. Keys combine the SHA-256 of the file
+    content, the file name, EXTRACTOR_VERSION and the extraction options, so
+    an entry is only reused when re-extracting would produce the same records.
+    The least recently used entries are evicted once the cache grows beyond
+    max_bytes. The total size of the entries is kept in SIZE_FILE and updated
+    as entries are added, so the cache directory is only walked when the
+    total passes max_bytes or the file is missing.
+    """
+    
+    PAGES_FILE = "pages.jsonl"
+    IMAGES_DIR = "images"
+    SIZE_FILE = "size"
+    
+    def __init__(self, cache_dir=".extraction_cache", max_bytes=1024 * 1024 * 1024):
+        """Initialize with the cache directory and its maximum size in bytes."""
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def make_key(self, file_path, options=None, file_name=None, digest=None):
+        """Return the cache key for a file and the options used to extract it.
+        
+        file_name is the name the extracted records carry, by default the
+        base name of file_path. digest is the file's content_hash if the
+        caller already computed it, so the file is not read again.
+        """
+        key_data = {
+            "content": digest or content_hash(file_path),
+            "file_name": file_name or os.path.basename(file_path),
+            "version": EXTRACTOR_VERSION,
+            "options": options or {}
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def get(self, key, file_name, pages=None, metrics=None, skip_tables=False):
+        """Return a CachedExtractor replaying the entry for key, or None on a miss.
+        
+        pages is the page selection and skip_tables the table option the entry
+        was extracted with. metrics is a MetricsRecorder that times reading the
+        entry.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        if not os.path.exists(os.path.join(entry_dir, self.PAGES_FILE)):
+            return None
+        
+        # Mark the entry as recently used for eviction
+        os.utime(entry_dir)
+        logger.info(f"Using cached extraction results for {file_name}")
+        return CachedExtractor(entry_dir, file_name, pages, metrics, skip_tables)
+    
+    def record(self, key, data_extractor):
+        """Wrap data_extractor so that a full iter_pages pass is saved under key."""
+        return RecordingExtractor(self, key, data_extractor)
+    
+    def _commit(self, key, temp_dir):
+        """Move a completed entry into place, evicting old entries once the cache is too large."""
+        entry_dir = os.path.join(self.cache_dir, key)
+        entry_size = _directory_size(temp_dir)
+        try:
+            os.replace(temp_dir, entry_dir)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return
+        
+        total_size = self._read_total_size()
+        if total_size is None or total_size + entry_size > self.max_bytes:
+            self.evict()
+        else:
+            self._write_total_size(total_size + entry_size)
+    
+    def _read_total_size(self):
+        """Return the recorded total size of the cache entries, or None if it is unknown."""
+        try:
+            with open(os.path.join(self.cache_dir, self.SIZE_FILE), encoding="utf-8") as size_file:
+                return int(size_file.read())
+        except (OSError, ValueError):
+            return None
+    
+    def _write_total_size(self, total_size):
+        """Record the total size of the cache entries.
+        
+        Processes committing at the same time may overwrite each other's
+        update; the total is only an estimate that the next eviction corrects.
+        """
+        size_path = os.path.join(self.cache_dir, self.SIZE_FILE)
+        temp_path = f"{size_path}.tmp-{os.getpid()}"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as size_file:
+                size_file.write(str(total_size))
+            os.replace(temp_path, size_path)
+        except OSError as e:
+            logger.warning(f"Could not record the extraction cache size: {e}")
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes.
+        
+        Walks every entry and records the remaining total size.
+        """
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(entry_dir) or ".tmp-" in name:
+                continue
+            size = _directory_size(entry_dir)
+            entries.append((os.path.getmtime(entry_dir), size, entry_dir))
+            total_size += size
+        
+        for _, size, entry_dir in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
+            logger.info(f"Evicted cache entry {os.path.basename(entry_dir)}")
+        
+        self._write_total_size(total_size)
+
+
+class CachedExtractor:
+    """Replays cached extraction results through the DataExtractor interface."""
+    
+    def __init__(self, entry_dir, file_name, pages=None, metrics=None, skip_tables=False):
+        """Initialize with a cache entry directory, the original file name, page selection, metrics recorder and table option."""
+        self.entry_dir = entry_dir
+        self.file_name = file_name
+        self.pages = pages
+        self.data_types = extracted_data_types(skip_tables)
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.file_type = os.path.splitext(file_name)[1].lower()[1:]
+    
+    def close(self):
+        """Release resources; cached results hold none."""
+    
+    def iter_pages(self, output_dir="output/images"):
+        """Yield the cached records of each page, restoring images into output_dir."""
+        return self.metrics.timed_iter(
+            "read_cache",
+            self._read_pages(output_dir),
+            lambda page_records: sum(len(records) for records in page_records.values())
+        )
+    
+    def _read_pages(self, output_dir):
+        """Yield the page records stored in the cache entry."""
+        os.makedirs(output_dir, exist_ok=True)
+        
+        with open(os.path.join(self.entry_dir, ExtractionCache.PAGES_FILE), encoding="utf-8") as pages_file:
+            for line in pages_file:
+                page_records = json.loads(line)
+                for image in page_records.get("images", []):
+                    self._restore_image(image, output_dir)
+                yield page_records
+    
+    def _restore_image(self, image, output_dir):
+        """Point an image record at output_dir, copying the cached image if missing."""
+        file_name = os.path.basename(image["file_path"])
+        target_path = os.path.join(output_dir, file_name)
+        if not os.path.exists(target_path):
+            shutil.copyfile(os.path.join(self.entry_dir, ExtractionCache.IMAGES_DIR, file_name), target_path)
+        image["file_path"] = target_path
+    
+    def _iter_data_type(self, data_type, output_dir="output/images"):
+        """Yield the cached records of one data type."""
+        for page_records in self.iter_pages(output_dir):
+            yield from page_records.get(data_type, [])
+    
+    def iter_text(self):
+        """Yield cached text records."""
+        return self._iter_data_type("text")
+    
+    def iter_links(self):
+        """Yield cached hyperlink records."""
+        return self._iter_data_type("links")
+    
+    def iter_images(self, output_dir="output/images"):
+        """Yield cached image records, restoring images into output_dir."""
+        return self._iter_data_type("images", output_dir)
+    
+    def iter_tables(self):
+        """Yield cached table records."""
+        return self._iter_data_type("tables")
+    
+    def extract_text(self):
+        """Return cached text records."""
+        return list(self.iter_text())
+    
+    def extract_links(self):
+        """Return cached hyperlink records."""
+        return list(self.iter_links())
+    
+    def extract_images(self, output_dir="output/images"):
+        """Return cached image records, restoring images into output_dir."""
+        return list(self.iter_images(output_dir))
+    
+    def extract_tables(self):
+        """Return cached table records."""
+        return list(self.iter_tables())
+    
+    def extract_all(self, output_dir="output/images"):
+        """Return all cached records grouped by data type."""
+        results = {data_type: [] for data_type in DATA_TYPES}
+        for page_records in self.iter_pages(output_dir):
+            for data_type, records in page_records.items():
+                results[data_type].extend(records)
+        return results
+
+
+class RecordingExtractor:
+    """Wraps a DataExtractor and saves the results of a full iter_pages pass.
+    
+    Every other attribute is delegated to the wrapped extractor unchanged. The
+    cache entry is only committed once the pass finished without errors.
+    """
+    
+    def __init__(self, cache, key, data_extractor):
+        """Initialize with the cache, the entry key and the extractor to record."""
+        self.cache = cache
+        self.key = key
+        self.data_extractor = data_extractor
+    
+    def __getattr__(self, name):
+        """Delegate everything else to the wrapped extractor."""
+        return getattr(self.data_extractor, name)
+    
+    def iter_pages(self, output_dir="output/images"):
+        """Yield the wrapped extractor's pages while writing them to a new cache entry."""
+        temp_dir = os.path.join(self.cache.cache_dir, f"{self.key}.tmp-{os.getpid()}")
+        images_dir = os.path.join(temp_dir, ExtractionCache.IMAGES_DIR)
+        os.makedirs(images_dir, exist_ok=True)
+        
+        complete = True
+        try:
+            with open(os.path.join(temp_dir, ExtractionCache.PAGES_FILE), "w", encoding="utf-8") as pages_file:
+                for page_records in self.data_extractor.iter_pages(output_dir):
+                    for image in page_records.get("images", []):
+                        if image["file_path"] is None:
+                            # The image could not be written, so the entry would be incomplete
+                            complete = False
+                            continue
+                        shutil.copyfile(image["file_path"],
+                                        os.path.join(images_dir, os.path.basename(image["file_path"])))
+                    
+                    serializable = {
+                        data_type: [dict(record) for record in records]
+                        for data_type, records in page_records.items()
+                    }
+                    pages_file.write(json.dumps(serializable) + "\n")
+                    yield page_records
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        
+        if complete:
+            self.cache._commit(self.key, temp_dir)
+        else:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _directory_size(path):
+    """Return the total size in bytes of the files below path."""
+    total_size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total_size += os.path.getsize(os.path.join(root, name))
+    return total_size
@@ -1,21 +1,79 @@
 from abc import ABC, abstractmethod
-import fitz  # PyMuPDF for PDF
-from docx import Document
-from pptx import Presentation
 import os
-import pdfplumber
 import io
+from metrics import NULL_METRICS
+
+# The parsing libraries (PyMuPDF, pdfplumber, python-docx, python-pptx) are
+# imported by the loaders that use them, so a run only pays the import time of
+# the formats it actually opens.
+
+
+class LazyFileData(dict):
+    """Dictionary of loaded file handles where some values are opened on first access.
+    
+    Values listed in ``factories`` are created by calling the factory the first
+    time the key is read, so parsers that an extraction never touches are never
+    opened. Already opened values behave like ordinary dictionary entries.
+    """
+    
+    def __init__(self, factories, **values):
+        super().__init__(**values)
+        self._factories = dict(factories)
+    
+    def __missing__(self, key):
+        factory = self._factories.pop(key, None)
+        if factory is None:
+            raise KeyError(key)
+        value = factory()
+        self[key] = value
+        return value
+    
+    def __contains__(self, key):
+        return super().__contains__(key) or key in self._factories
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def is_loaded(self, key):
+        """Return True if the value for key has already been opened."""
+        return super().__contains__(key)
 
 
 class FileLoader(ABC):
-    """Abstract base class for loading different file types."""
+    """Abstract base class for loading different file types.
+    
+    Loaders can be used as context managers; leaving the block closes every
+    document handle the loader opened. Time spent opening documents is
+    recorded by the optional metrics recorder. file_name replaces the base
+    name of file_path as the name records and output files carry, so inputs
+    from different directories that share a base name can be told apart.
+    """
     
-    def __init__(self, file_path):
+    def __init__(self, file_path, metrics=None, file_name=None):
         self.file_path = file_path
+        self.metrics = metrics if metrics is not None else NULL_METRICS
         self.validate_file()
-        self.file_name = os.path.basename(file_path)
+        self.file_name = file_name or os.path.basename(file_path)
         self.file_extension = os.path.splitext(file_path)[1].lower()
         
+        # Document handles opened by this loader that need closing
+        self._open_handles = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def close(self):
+        """Close every document handle opened by this loader."""
+        while self._open_handles:
+            self._open_handles.pop().close()
+    
     def validate_file(self):
         """Validate if file exists and has correct extension."""
         if not os.path.exists(self.file_path):
@@ -45,19 +103,43 @@ class PDFLoader(FileLoader):
         return ".pdf"
     
     def load_file(self):
-        """Load PDF file using PyMuPDF (fitz)."""
+        """Prepare the PDF for extraction.
+        
+        PyMuPDF (fitz) and pdfplumber handles are opened lazily, the first time
+        an extraction method reads "fitz_doc" or "plumber_doc", so a run that
+        never extracts tables never pays for opening the file with pdfplumber.
+        """
+        return LazyFileData(
+            {
+                "fitz_doc": self.open_fitz,
+                "plumber_doc": self.open_plumber
+            },
+            file_name=self.file_name
+        )
+    
+    def open_fitz(self):
+        """Open the PDF with PyMuPDF (fitz)."""
+        import fitz  # PyMuPDF for PDF
+        
         try:
-            # Use both libraries for complete extraction
-            fitz_doc = fitz.open(self.file_path)
-            plumber_doc = pdfplumber.open(self.file_path)
-            
-            return {
-                "fitz_doc": fitz_doc,
-                "plumber_doc": plumber_doc,
-                "file_name": self.file_name
-            }
+            with self.metrics.stage("open_fitz"):
+                fitz_doc = fitz.open(self.file_path)
         except Exception as e:
             raise RuntimeError(f"Error loading PDF file: {str(e)}")
+        self._open_handles.append(fitz_doc)
+        return fitz_doc
+    
+    def open_plumber(self):
+        """Open the PDF with pdfplumber (used for table extraction)."""
+        import pdfplumber
+        
+        try:
+            with self.metrics.stage("open_plumber"):
+                plumber_doc = pdfplumber.open(self.file_path)
+        except Exception as e:
+            raise RuntimeError(f"Error loading PDF file: {str(e)}")
+        self._open_handles.append(plumber_doc)
+        return plumber_doc
 
 
 class DOCXLoader(FileLoader):
@@ -68,6 +150,8 @@ class DOCXLoader(FileLoader):
     
     def load_file(self):
         """Load DOCX file using python-docx."""
+        from docx import Document
+        
         try:
             doc = Document(self.file_path)
             return {
@@ -86,6 +170,8 @@ class PPTLoader(FileLoader):
     
     def load_file(self):
         """Load PPTX file using python-pptx."""
+        from pptx import Presentation
+        
         try:
             presentation = Presentation(self.file_path)
             return {
@@ -0,0 +1,120 @@
+import struct
+
+# JPEG start-of-frame markers that carry the image dimensions
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# TIFF tags holding the image width and height
+TIFF_IMAGE_WIDTH = 256
+TIFF_IMAGE_LENGTH = 257
+
+
+def probe_image_size(image_bytes):
+    """Return (width, height) read from an image's header, or None if unknown.
+    
+    Only the few header bytes needed to find the dimensions are read, so this
+    is much cheaper than opening the image with PIL. PNG, GIF, BMP, JPEG, TIFF
+    and WebP are supported; callers should fall back to a full decoder when
+    None is returned.
+    """
+    try:
+        if image_bytes[:8] == b"\x89PNG\r\n\x1a\n":
+            return struct.unpack(">II", image_bytes[16:24])
+        if image_bytes[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", image_bytes[6:10])
+        if image_bytes[:2] == b"BM":
+            return _probe_bmp(image_bytes)
+        if image_bytes[:2] == b"\xff\xd8":
+            return _probe_jpeg(image_bytes)
+        if image_bytes[:4] in (b"II*\x00", b"MM\x00*"):
+            return _probe_tiff(image_bytes)
+        if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+            return _probe_webp(image_bytes)
+    except (struct.error, IndexError):
+        # Truncated or malformed header
+        return None
+    
+    return None
+
+
+def _probe_bmp(image_bytes):
+    """Read dimensions from a BMP info header."""
+    header_size = struct.unpack("<I", image_bytes[14:18])[0]
+    if header_size == 12:
+        return struct.unpack("<HH", image_bytes[18:22])
+    width, height = struct.unpack("<ii", image_bytes[18:26])
+    # A negative height marks a top-down bitmap
+    return width, abs(height)
+
+
+def _probe_jpeg(image_bytes):
+    """Walk JPEG marker segments until the start-of-frame segment."""
+    offset = 2
+    length = len(image_bytes)
+    
+    while offset + 4 <= length:
+        if image_bytes[offset] != 0xFF:
+            return None
+        marker = image_bytes[offset + 1]
+        
+        # Skip fill bytes and standalone markers without a length field
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            offset += 2
+            continue
+        
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", image_bytes[offset + 5:offset + 9])
+            return width, height
+        
+        segment_length = struct.unpack(">H", image_bytes[offset + 2:offset + 4])[0]
+        offset += 2 + segment_length
+    
+    return None
+
+
+def _probe_tiff(image_bytes):
+    """Read the width and length tags from the first TIFF image directory."""
+    endian = "<" if image_bytes[:2] == b"II" else ">"
+    ifd_offset = struct.unpack(f"{endian}I", image_bytes[4:8])[0]
+    entry_count = struct.unpack(f"{endian}H", image_bytes[ifd_offset:ifd_offset + 2])[0]
+    
+    dimensions = {}
+    for index in range(entry_count):
+        entry = ifd_offset + 2 + index * 12
+        tag, field_type = struct.unpack(f"{endian}HH", image_bytes[entry:entry + 4])
+        if tag not in (TIFF_IMAGE_WIDTH, TIFF_IMAGE_LENGTH):
+            continue
+        
+        # Values are stored as SHORT (type 3) or LONG (type 4)
+        if field_type == 3:
+            value = struct.unpack(f"{endian}H", image_bytes[entry + 8:entry + 10])[0]
+        elif field_type == 4:
+            value = struct.unpack(f"{endian}I", image_bytes[entry + 8:entry + 12])[0]
+        else:
+            return None
+        dimensions[tag] = value
+        
+        if len(dimensions) == 2:
+            return dimensions[TIFF_IMAGE_WIDTH], dimensions[TIFF_IMAGE_LENGTH]
+    
+    return None
+
+
+def _probe_webp(image_bytes):
+    """Read dimensions from the first chunk of a WebP file."""
+    chunk = image_bytes[12:16]
+    
+    if chunk == b"VP8X":
+        width = int.from_bytes(image_bytes[24:27], "little") + 1
+        height = int.from_bytes(image_bytes[27:30], "little") + 1
+        return width, height
+    if chunk == b"VP8L":
+        bits = int.from_bytes(image_bytes[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", image_bytes[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    
+    return None
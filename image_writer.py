@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ImageWriter:
+    """Writes image files from a pool of background threads.
+    
+    Extraction submits (path, bytes) jobs and carries on parsing while the
+    files are written. At most max_pending jobs are queued or running at a
+    time; submit blocks once that limit is reached so image bytes cannot pile
+    up in memory faster than the disk absorbs them.
+    """
+    
+    def __init__(self, max_workers=4, max_pending=64):
+        """Initialize with the number of writer threads and the queue bound."""
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+    
+    def submit(self, path, image_bytes):
+        """Queue image_bytes to be written to path and return a Future for the write."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(_write_file, path, image_bytes)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+    
+    def close(self):
+        """Wait for all queued writes to finish and stop the writer threads."""
+        self._executor.shutdown(wait=True)
+
+
+def _write_file(path, data):
+    """Write data to path, returning the number of bytes written."""
+    with open(path, "wb") as file:
+        return file.write(data)
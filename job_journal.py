@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+from extraction_cache import content_hash
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Default location of the journal database
+DEFAULT_JOURNAL_PATH = ".extraction_journal.db"
+
+
+class JobJournal:
+    """SQLite journal of the files processed by batch runs.
+    
+    Every file is marked "running" when processing starts and "done" or
+    "failed" when it ends. A done entry keeps the file's size, modification
+    time, SHA-256 content hash, output locations and the fingerprint of the
+    options it was processed with. A file is complete when its entry is done,
+    the file is unchanged, it was processed with the same options and its
+    output files still exist; after a crash, resumed runs skip complete files
+    and process everything else, including failed files and files left
+    "running" by a dead worker.
+    
+    Worker processes open their own JobJournal on the same path; SQLite's
+    write-ahead log and busy timeout serialize their short transactions.
+    """
+    
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        """Open or create the journal database at path."""
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    file_path TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    size INTEGER,
+                    mtime REAL,
+                    content_hash TEXT,
+                    outputs TEXT,
+                    fingerprint TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Journals written before fingerprints were recorded lack the column
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(jobs)")]
+            if "fingerprint" not in columns:
+                self.connection.execute("ALTER TABLE jobs ADD COLUMN fingerprint TEXT")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+    
+    def start(self, file_path):
+        """Mark a file as being processed."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO jobs (file_path, status, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(file_path) DO UPDATE SET status = excluded.status, error = NULL, "
+                "updated_at = excluded.updated_at",
+                (_journal_key(file_path), self.STATUS_RUNNING, time.time())
+            )
+    
+    def finish(self, file_path, success, outputs=None, error=None, fingerprint=None, digest=None):
+        """Record the outcome of processing a file.
+        
+        For a successful file the size, modification time and content hash are
+        recorded along with outputs, the JSON-serializable locations of the
+        stored data, and fingerprint, the options_fingerprint of the options
+        that decide what was stored and where. digest is the file's
+        content_hash if the caller already computed it, for example for the
+        extraction cache key; otherwise the file is hashed here.
+        """
+        size = mtime = None
+        if success:
+            stat = os.stat(file_path)
+            size, mtime = stat.st_size, stat.st_mtime
+            digest = digest or content_hash(file_path)
+        else:
+            digest = None
+        
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO jobs (file_path, status, size, mtime, content_hash, outputs, fingerprint, error, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (_journal_key(file_path), self.STATUS_DONE if success else self.STATUS_FAILED,
+                 size, mtime, digest, json.dumps(outputs) if outputs is not None else None, fingerprint, error,
+                 time.time())
+            )
+    
+    def entry(self, file_path):
+        """Return the journal entry of a file as a dict, or None if it was never processed."""
+        cursor = self.connection.execute(
+            "SELECT file_path, status, size, mtime, content_hash, outputs, fingerprint, error, updated_at "
+            "FROM jobs WHERE file_path = ?",
+            (_journal_key(file_path),)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        
+        entry = dict(zip(("file_path", "status", "size", "mtime", "content_hash", "outputs", "fingerprint",
+                          "error", "updated_at"), row))
+        entry["outputs"] = json.loads(entry["outputs"]) if entry["outputs"] else None
+        return entry
+    
+    def is_complete(self, file_path, fingerprint=None):
+        """Return True if file_path was processed successfully and has not changed since.
+        
+        With fingerprint, the file must also have been processed with options
+        of that fingerprint, so output written elsewhere or with other options
+        does not count. Recorded output files that no longer exist make the
+        file incomplete. Files whose size and modification time match the
+        journal are trusted without reading them; otherwise the content hash
+        decides, so a file that was only touched is still skipped.
+        """
+        entry = self.entry(file_path)
+        if entry is None or entry["status"] != self.STATUS_DONE:
+            return False
+        if fingerprint is not None and entry["fingerprint"] != fingerprint:
+            return False
+        if not all(os.path.exists(location) for location in _output_files(entry["outputs"])):
+            return False
+        
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime == entry["mtime"]:
+            return True
+        return content_hash(file_path) == entry["content_hash"]
+    
+    def pending(self, file_paths, fingerprint=None):
+        """Yield the files of file_paths that are not complete, logging how many were skipped.
+        
+        fingerprint, if given, is called with each file path and returns the
+        fingerprint its entry must match.
+        """
+        skipped = 0
+        for file_path in file_paths:
+            if self.is_complete(file_path, fingerprint(file_path) if fingerprint else None):
+                skipped += 1
+                continue
+            yield file_path
+        
+        if skipped:
+            logger.info(f"Resuming: skipped {skipped} files already completed in {self.path}")
+    
+    def summary(self):
+        """Return the number of journal entries per status."""
+        cursor = self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return dict(cursor.fetchall())
+
+
+def options_fingerprint(options):
+    """Return a fingerprint of a dict of JSON-serializable processing options."""
+    encoded = json.dumps(options, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _output_files(outputs):
+    """Yield the file paths among the output locations of a journal entry.
+    
+    Locations without a directory part, such as SQL table names, are skipped.
+    """
+    if isinstance(outputs, dict):
+        outputs = outputs.values()
+    elif not isinstance(outputs, list):
+        outputs = [outputs]
+    
+    for location in outputs:
+        if isinstance(location, (dict, list)):
+            yield from _output_files(location)
+        elif isinstance(location, str) and os.path.dirname(location):
+            yield location
+
+
+def _journal_key(file_path):
+    """Return the key of a file in the journal, independent of the working directory."""
+    return os.path.abspath(file_path)
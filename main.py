@@ -1,11 +1,23 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
+import hashlib
+import inspect
+import sqlite3
 import argparse
 import logging
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
 from file_loader import PDFLoader, DOCXLoader, PPTLoader
-from data_extractor import DataExtractor
-from storage import FileStorage, SQLStorage
+from data_extractor import DataExtractor, PageRanges, TEXT_GRANULARITIES
+from storage import FILE_FORMATS, FileStorage, ParquetStorage, SQLStorage, get_connection_pool
+from extraction_cache import ExtractionCache, content_hash
+from metrics import NULL_METRICS, MetricsRecorder
+from discovery import DEFAULT_SIZE_ORDER_WINDOW, discover_files, largest_first
+from job_journal import DEFAULT_JOURNAL_PATH, JobJournal, options_fingerprint
 
 # Configure logging
 logging.basicConfig(
@@ -14,55 +26,465 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Number of times a file may take down a shared worker pool before it is
+# retried on its own and, if it crashes again, reported as failed.
+MAX_POOLED_CRASHES = 2
 
-def create_file_loader(file_path):
-    """Create the appropriate file loader based on file extension."""
+# Files submitted to a worker pool per worker before waiting for one to finish
+POOL_QUEUE_FACTOR = 2
+
+# process_file options that decide what is stored for a file and where; a
+# resumed run only skips files the journal recorded with the same values
+JOURNAL_OPTIONS = (
+    "use_sql", "sql_host", "sql_db", "sql_table_mode", "use_parquet", "output_formats", "output_dir",
+    "skip_tables", "pages", "text_granularity", "output_name"
+)
+
+
+def create_file_loader(file_path, metrics=None, file_name=None):
+    """Create the appropriate file loader based on file extension.
+    
+    file_name replaces the base name of file_path in records and output files.
+    """
     extension = os.path.splitext(file_path)[1].lower()
     
     if extension == ".pdf":
-        return PDFLoader(file_path)
+        return PDFLoader(file_path, metrics, file_name)
     elif extension == ".docx":
-        return DOCXLoader(file_path)
+        return DOCXLoader(file_path, metrics, file_name)
     elif extension == ".pptx":
-        return PPTLoader(file_path)
+        return PPTLoader(file_path, metrics, file_name)
     else:
         raise ValueError(f"Unsupported file type: {extension}")
 
 
-def process_file(file_path, use_sql=False, sql_host="localhost", sql_user="root", sql_password="", sql_db="document_extractor"):
-    """Process a single file and extract its content."""
+def process_file(
+    file_path,
+    use_sql=False,
+    sql_host="localhost",
+    sql_user="root",
+    sql_password="",
+    sql_db="document_extractor",
+    output_dir="output",
+    skip_tables=False,
+    sql_batch_size=1000,
+    sql_pool_size=1,
+    use_cache=False,
+    cache_dir=".extraction_cache",
+    cache_size_mb=1024,
+    image_writers=4,
+    text_granularity="span",
+    use_parquet=False,
+    output_formats=("csv", "json"),
+    pages=None,
+    page_workers=1,
+    table_prefilter=True,
+    metrics=None,
+    journal=None,
+    sql_table_mode="cells",
+    output_name=None
+):
+    """Process a single file and extract its content.
+    
+    With use_cache, extraction results are looked up by file content in
+    cache_dir before the file is parsed, and stored there after a fresh
+    extraction. image_writers background threads save extracted images while
+    parsing continues; 0 writes them synchronously. text_granularity sets
+    whether PDF text is stored per span or merged per line, block or page.
+    With use_parquet, file output is written as Parquet instead of CSV and
+    JSON; otherwise output_formats selects the record files written. pages
+    (a spec such as "1-3,7") re-extracts only those PDF pages or PPTX slides
+    and replaces their previously stored records. page_workers processes
+    extract the pages of a PDF in parallel. table_prefilter skips the table
+    finder on PDF pages without ruling lines. metrics is a MetricsRecorder
+    timing each stage of the run. journal is the path of a JobJournal database
+    in which the file's status, content hash, output locations and options
+    fingerprint are recorded. sql_table_mode sets whether SQL storage writes table content
+    per cell or as one compressed blob per table. output_name replaces the
+    file's base name in records and output file names.
+    """
+    metrics = metrics if metrics is not None else NULL_METRICS
+    job_journal = _open_journal(journal, file_path)
+    outputs = None
+    error = None
+    
+    # The content hash is computed once and shared by the cache key and the journal
+    digest = None
+    
     try:
-        # Create file loader
-        file_loader = create_file_loader(file_path)
-        
-        # Create data extractor
-        data_extractor = DataExtractor(file_loader)
-        
-        # Create storage and store all extracted data
-        if use_sql:
-            try:
-                storage = SQLStorage(
-                    data_extractor,
-                    host=sql_host,
-                    user=sql_user,
-                    password=sql_password,
-                    database=sql_db
+        # Create file loader; leaving the block closes every document it opened
+        with create_file_loader(file_path, metrics, output_name) as file_loader, metrics.stage("process_file"):
+            page_ranges = PageRanges(pages) if pages else None
+            
+            # Reuse cached results for unchanged files before parsing anything
+            data_extractor = None
+            if use_cache:
+                cache = ExtractionCache(cache_dir, max_bytes=cache_size_mb * 1024 * 1024)
+                digest = content_hash(file_path)
+                cache_key = cache.make_key(file_path, {
+                    "skip_tables": skip_tables,
+                    "text_granularity": text_granularity,
+                    "pages": str(page_ranges) if page_ranges else None
+                }, file_loader.file_name, digest)
+                data_extractor = cache.get(cache_key, file_loader.file_name, pages=page_ranges, metrics=metrics,
+                                           skip_tables=skip_tables)
+            
+            # Create data extractor
+            if data_extractor is None:
+                data_extractor = DataExtractor(
+                    file_loader,
+                    skip_tables=skip_tables,
+                    image_writer_workers=image_writers,
+                    text_granularity=text_granularity,
+                    pages=page_ranges,
+                    page_workers=page_workers,
+                    table_prefilter=table_prefilter,
+                    metrics=metrics
                 )
-            except Exception as sql_error:
-                logger.error(f"Error connecting to SQL database, falling back to file storage: {str(sql_error)}")
-                logger.info("Using file storage as fallback")
-                storage = FileStorage(data_extractor)
-        else:
-            storage = FileStorage(data_extractor)
-        
-        # Store all data
-        storage.store_all()
+                if use_cache:
+                    data_extractor = cache.record(cache_key, data_extractor)
+            
+            # Create storage and store all extracted data
+            if use_sql:
+                try:
+                    # The pool is created once per process and reused for every file
+                    pool = get_connection_pool(
+                        host=sql_host,
+                        user=sql_user,
+                        password=sql_password,
+                        database=sql_db,
+                        pool_size=sql_pool_size
+                    )
+                    storage = SQLStorage(
+                        data_extractor,
+                        host=sql_host,
+                        user=sql_user,
+                        password=sql_password,
+                        database=sql_db,
+                        batch_size=sql_batch_size,
+                        pool=pool,
+                        table_mode=sql_table_mode
+                    )
+                except Exception as sql_error:
+                    logger.error(f"Error connecting to SQL database, falling back to file storage: {str(sql_error)}")
+                    logger.info("Using file storage as fallback")
+                    storage = FileStorage(data_extractor, output_dir=output_dir, formats=output_formats)
+            elif use_parquet:
+                storage = ParquetStorage(data_extractor, output_dir=output_dir)
+            else:
+                storage = FileStorage(data_extractor, output_dir=output_dir, formats=output_formats)
+            
+            # Store all data
+            try:
+                outputs = storage.store_all()
+            finally:
+                storage.close()
+                data_extractor.close()
         
         logger.info(f"Successfully processed file: {file_path}")
-        return True
+        success = True
     except Exception as e:
         logger.error(f"Error processing file {file_path}: {str(e)}")
-        return False
+        error = str(e)
+        success = False
+    
+    if job_journal is not None:
+        try:
+            fingerprint = _journal_fingerprint(file_path, {
+                "use_sql": use_sql,
+                "sql_host": sql_host,
+                "sql_db": sql_db,
+                "sql_table_mode": sql_table_mode,
+                "use_parquet": use_parquet,
+                "output_formats": output_formats,
+                "output_dir": output_dir,
+                "skip_tables": skip_tables,
+                "pages": pages,
+                "text_granularity": text_granularity,
+                "output_name": output_name
+            })
+            job_journal.finish(file_path, success, outputs, error, fingerprint, digest)
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Error recording {file_path} in job journal: {str(e)}")
+        finally:
+            job_journal.close()
+    return success
+
+
+# Signature used to fill in the defaults of partial process_file options
+_PROCESS_FILE_SIGNATURE = inspect.signature(process_file)
+
+
+def _journal_fingerprint(file_path, options):
+    """Return the fingerprint of the JOURNAL_OPTIONS of a process_file call with options.
+    
+    Options left out take their process_file defaults, and output_dir is made
+    absolute, so the same output location always gives the same fingerprint.
+    """
+    arguments = _PROCESS_FILE_SIGNATURE.bind(file_path, **options)
+    arguments.apply_defaults()
+    values = {name: arguments.arguments[name] for name in JOURNAL_OPTIONS}
+    
+    values["output_dir"] = os.path.abspath(values["output_dir"])
+    if not isinstance(values["output_formats"], str):
+        values["output_formats"] = sorted(values["output_formats"])
+    values["pages"] = str(values["pages"]) if values["pages"] else None
+    return options_fingerprint(values)
+
+
+def _open_journal(journal, file_path):
+    """Open the job journal at path journal and mark file_path as running, or return None.
+    
+    A journal that cannot be written is logged and ignored so it never stops
+    a file from being processed.
+    """
+    if not journal:
+        return None
+    
+    job_journal = None
+    try:
+        job_journal = JobJournal(journal)
+        job_journal.start(file_path)
+        return job_journal
+    except sqlite3.Error as e:
+        logger.error(f"Error opening job journal {journal}: {str(e)}")
+        if job_journal is not None:
+            job_journal.close()
+        return None
+
+
+def process_file_with_metrics(file_path, metrics_hooks=(), **options):
+    """Process a single file while recording metrics.
+    
+    Returns a tuple ``(success, report)`` where ``report`` is the
+    MetricsRecorder report of the file. metrics_hooks are called for every
+    finished stage and must be picklable when files run in worker processes.
+    """
+    metrics = MetricsRecorder(os.path.basename(file_path), hooks=metrics_hooks)
+    success = process_file(file_path, metrics=metrics, **options)
+    return success, metrics.report()
+
+
+def write_metrics_report(path, reports):
+    """Write the metrics reports of processed files to a JSON file."""
+    with open(path, "w", encoding="utf-8") as metrics_file:
+        json.dump({
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "files": reports
+        }, metrics_file, indent=2)
+    logger.info(f"Metrics written to {path}")
+
+
+def _file_task(options):
+    """Return the function processing one file: with metrics when options carry metrics hooks."""
+    return process_file_with_metrics if "metrics_hooks" in options else process_file
+
+
+def _file_options(file_path, options, output_names):
+    """Return the process_file options of one file, adding its output name if it was given one."""
+    if file_path in output_names:
+        return dict(options, output_name=output_names[file_path])
+    return options
+
+
+def _run_pool(file_paths, workers, options, output_names=None):
+    """Run files through a fresh process pool.
+    
+    file_paths may be any iterable; files are taken from it as worker slots
+    free up, with at most workers * POOL_QUEUE_FACTOR files submitted ahead,
+    so a lazily discovered input is never read far ahead of processing.
+    output_names maps files to the output name they are processed under.
+    
+    Returns a tuple ``(results, crashed, not_started)`` where ``results`` maps
+    finished files to their success flag, ``crashed`` lists files that were
+    in flight when a worker process died, and ``not_started`` lists files that
+    could not be submitted because the pool was already broken.
+    """
+    results = {}
+    crashed = []
+    not_started = []
+    output_names = output_names if output_names is not None else {}
+    
+    if hasattr(file_paths, "__len__"):
+        workers = min(workers, len(file_paths))
+    max_pending = max(1, workers * POOL_QUEUE_FACTOR)
+    file_paths = iter(file_paths)
+    
+    def collect(done):
+        """Record the outcome of finished futures."""
+        for future in done:
+            file_path = futures.pop(future)
+            try:
+                results[file_path] = future.result()
+            except BrokenProcessPool:
+                crashed.append(file_path)
+            except Exception as e:
+                logger.error(f"Error processing file {file_path}: {str(e)}")
+                results[file_path] = False
+    
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {}
+        for file_path in file_paths:
+            try:
+                task_options = _file_options(file_path, options, output_names)
+                futures[executor.submit(_file_task(options), file_path, **task_options)] = file_path
+            except BrokenProcessPool:
+                not_started = [file_path, *file_paths]
+                break
+            
+            if len(futures) >= max_pending:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                collect(done)
+        
+        collect(list(as_completed(futures)))
+    
+    return results, crashed, not_started
+
+
+def _output_name(file_path):
+    """Return a distinct output name for a file whose base name another input already uses.
+    
+    A short hash of the absolute path is added before the extension, so the
+    name depends on the path alone and a renamed file always gets the same
+    one. Whether a file is renamed depends on the other inputs; see
+    _name_outputs.
+    """
+    stem, extension = os.path.splitext(os.path.basename(file_path))
+    digest = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:8]
+    return f"{stem}_{digest}{extension}"
+
+
+def _name_outputs(file_paths, output_names):
+    """Yield file_paths, giving files that share a base name with an earlier input a distinct output name.
+    
+    The first file with a base name keeps it; later files are added to
+    output_names with the name from _output_name, so files processed side by
+    side never write to the same output files. Files already in output_names
+    keep their name, so naming the inputs again after reordering them does
+    not change which file keeps the plain name.
+    """
+    first_paths = {}
+    for file_path in file_paths:
+        if file_path in output_names:
+            yield file_path
+            continue
+        first_path = first_paths.setdefault(os.path.basename(file_path), file_path)
+        if first_path != file_path:
+            output_names[file_path] = _output_name(file_path)
+            logger.warning(f"{file_path} shares its file name with {first_path}, "
+                           f"writing its output as {output_names[file_path]}")
+        yield file_path
+
+
+def _unique_files(file_paths, results):
+    """Yield each file path once, adding it to results as not yet processed."""
+    for file_path in file_paths:
+        if file_path in results:
+            continue
+        results[file_path] = False
+        yield file_path
+
+
+def process_files(file_paths, workers=1, metrics_out=None, metrics_hooks=(), journal=None, resume=False,
+                  output_names=None, **options):
+    """Process several files, optionally spreading them over worker processes.
+    
+    file_paths is a list or any iterable, such as the lazy output of
+    discovery.discover_files; files are then processed as they are found.
+    Duplicate paths are processed once, and files sharing a base name with an
+    earlier input are written under a distinct output name. output_names maps
+    files to output names assigned before the inputs were reordered, such as
+    by discovery.largest_first; those files keep them, and the dict is
+    completed with the names given here. The returned dict maps each file
+    path to whether it was processed successfully, in input order, so the
+    outcome does not depend on which worker finished first. A worker process
+    that dies only fails the file that crashed it; other files in flight at
+    the time are retried in a new pool. With metrics_out, per-stage metrics of
+    every finished file are written to that JSON file; metrics_hooks are
+    called for every finished stage of every file. With journal, the outcome
+    of every file is recorded in that JobJournal database, and with resume,
+    files the journal lists as completed and unchanged, with the same output
+    options and with their outputs still in place, are skipped and left out
+    of the results.
+    """
+    # Output names are assigned before resume filtering so they do not change between runs
+    output_names = output_names if output_names is not None else {}
+    named_files = _name_outputs(file_paths, output_names)
+    file_paths = list(named_files) if hasattr(file_paths, "__len__") else named_files
+    
+    resume_journal = None
+    if journal:
+        options = dict(options, journal=journal)
+        if resume:
+            resume_journal = JobJournal(journal)
+            file_paths = resume_journal.pending(
+                file_paths,
+                lambda file_path: _journal_fingerprint(file_path, _file_options(file_path, options, output_names))
+            )
+    
+    try:
+        return _process_unique_files(file_paths, workers, metrics_out, metrics_hooks, options, output_names)
+    finally:
+        if resume_journal is not None:
+            resume_journal.close()
+
+
+def _process_unique_files(file_paths, workers, metrics_out, metrics_hooks, options, output_names):
+    """Process each distinct file once and return the results of process_files."""
+    results = {}
+    unique_files = _unique_files(file_paths, results)
+    
+    # Lists are deduplicated up front; iterators are consumed as files are processed
+    file_paths = list(unique_files) if hasattr(file_paths, "__len__") else unique_files
+    
+    # With metrics, each file's result is a (success, report) tuple
+    collect_metrics = metrics_out is not None or bool(metrics_hooks)
+    if collect_metrics:
+        options = dict(options, metrics_hooks=tuple(metrics_hooks))
+    
+    if workers <= 1:
+        for file_path in file_paths:
+            results[file_path] = _file_task(options)(file_path, **_file_options(file_path, options, output_names))
+    else:
+        _process_pooled(file_paths, workers, options, results, output_names)
+    
+    if not collect_metrics:
+        return results
+    
+    reports = [result[1] for result in results.values() if isinstance(result, tuple)]
+    if metrics_out is not None:
+        write_metrics_report(metrics_out, reports)
+    return {file_path: result[0] if isinstance(result, tuple) else result
+            for file_path, result in results.items()}
+
+
+def _process_pooled(file_paths, workers, options, results, output_names):
+    """Run files through worker pools, retrying files in flight when a worker crashes.
+    
+    The result of each file is stored in results.
+    """
+    crash_counts = Counter()
+    pending = file_paths
+    while pending:
+        finished, crashed, not_started = _run_pool(pending, workers, options, output_names)
+        results.update(finished)
+        
+        pending = list(not_started)
+        for file_path in crashed:
+            crash_counts[file_path] += 1
+            if crash_counts[file_path] < MAX_POOLED_CRASHES:
+                pending.append(file_path)
+                continue
+            
+            # Run repeat suspects alone so a bad file cannot take others down with it
+            finished, crashed_again, _ = _run_pool([file_path], 1, options, output_names)
+            results.update(finished)
+            if crashed_again:
+                logger.error(f"Worker process crashed while processing file: {file_path}")
+                results[file_path] = False
+        
+        if pending:
+            logger.warning(f"Worker pool crashed, retrying {len(pending)} unfinished files")
 
 
 def main():
@@ -72,8 +494,42 @@ def main():
     parser.add_argument(
         "--files",
         nargs="+",
-        default=["sample.pdf", "sample.docx", "sample.pptx"],
-        help="List of files to process (default: sample.pdf, sample.docx, sample.pptx)"
+        default=[],
+        help="List of files to process (default: sample.pdf, sample.docx, sample.pptx when no other input is given)"
+    )
+    
+    parser.add_argument(
+        "--input-dir",
+        nargs="+",
+        default=[],
+        help="Directories to scan for PDF, DOCX and PPTX files, including subdirectories"
+    )
+    
+    parser.add_argument(
+        "--no-recursive",
+        action="store_true",
+        help="Only scan the top level of --input-dir directories"
+    )
+    
+    parser.add_argument(
+        "--glob",
+        nargs="+",
+        default=[],
+        help="Glob patterns of files to process, e.g. 'reports/**/*.pdf' (quote them so the shell does not expand them)"
+    )
+    
+    parser.add_argument(
+        "--manifest",
+        nargs="+",
+        default=[],
+        help="Files listing one input path per line, or - to read the paths from stdin"
+    )
+    
+    parser.add_argument(
+        "--size-order-window",
+        type=int,
+        default=DEFAULT_SIZE_ORDER_WINDOW,
+        help=f"Number of discovered files looked at to start the largest first, 0 to keep input order (default: {DEFAULT_SIZE_ORDER_WINDOW})"
     )
     
     parser.add_argument(
@@ -106,33 +562,194 @@ def main():
         help="MySQL database name (default: document_extractor)"
     )
     
+    parser.add_argument(
+        "--sql-batch-size",
+        type=int,
+        default=1000,
+        help="Number of rows sent to MySQL per batched insert (default: 1000)"
+    )
+    
+    parser.add_argument(
+        "--sql-pool-size",
+        type=int,
+        default=1,
+        help="Number of pooled MySQL connections per process (default: 1, as each process stores one file at a time)"
+    )
+    
+    parser.add_argument(
+        "--sql-table-mode",
+        choices=SQLStorage.TABLE_MODES,
+        default="cells",
+        help="Store table content as one MySQL row per cell or as one compressed JSON blob per table (default: cells)"
+    )
+    
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Store extracted data as Parquet files instead of CSV and JSON (requires pyarrow)"
+    )
+    
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=FILE_FORMATS + ("both",),
+        help="Record file formats to write: csv, json, jsonl or both (CSV and JSON); not with --parquet (default: both)"
+    )
+    
     parser.add_argument(
         "--output-dir",
         default="output",
         help="Output directory for extracted data (default: output)"
     )
     
+    parser.add_argument(
+        "--skip-tables",
+        action="store_true",
+        help="Do not extract tables (avoids opening PDFs with pdfplumber)"
+    )
+    
+    parser.add_argument(
+        "--no-table-prefilter",
+        action="store_true",
+        help="Run table detection on every PDF page, even pages without ruling lines"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-extract files instead of reusing cached results"
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        default=".extraction_cache",
+        help="Directory of the extraction result cache (default: .extraction_cache)"
+    )
+    
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=1024,
+        help="Maximum size of the extraction cache in MB before old entries are evicted (default: 1024)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to process files in parallel (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=1,
+        help="Number of processes that extract the pages of each PDF in parallel (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--image-writers",
+        type=int,
+        default=4,
+        help="Number of background threads writing extracted images, 0 to write them inline (default: 4)"
+    )
+    
+    parser.add_argument(
+        "--pages",
+        help="Only extract these PDF pages or PPTX slides, e.g. 1-3,7,10- and replace their stored records"
+    )
+    
+    parser.add_argument(
+        "--text-granularity",
+        choices=TEXT_GRANULARITIES,
+        default="span",
+        help="Merge adjacent PDF text spans with the same style per line, block or page (default: span)"
+    )
+    
+    parser.add_argument(
+        "--journal",
+        default=DEFAULT_JOURNAL_PATH,
+        help=f"SQLite job journal recording the status, content hash and outputs of every file (default: {DEFAULT_JOURNAL_PATH})"
+    )
+    
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="Do not record processed files in the job journal"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip files the job journal lists as completed and unchanged; failed and unfinished files are processed again"
+    )
+    
+    parser.add_argument(
+        "--metrics-out",
+        help="Write per-stage timings, record counts, bytes written and peak memory of each file to this JSON file"
+    )
+    
     args = parser.parse_args()
+    if args.resume and args.no_journal:
+        parser.error("--resume needs the job journal, remove --no-journal")
+    if args.parquet and args.formats is not None:
+        parser.error("--parquet writes Parquet files only and cannot be combined with --formats")
+    output_formats = args.formats or ["both"]
     
     # Create output directory if it doesn't exist
     os.makedirs(args.output_dir, exist_ok=True)
     os.makedirs(os.path.join(args.output_dir, "images"), exist_ok=True)
     
-    # Process each file
-    success_count = 0
-    for file_path in args.files:
-        success = process_file(
-            file_path,
-            use_sql=args.sql,
-            sql_host=args.sql_host,
-            sql_user=args.sql_user,
-            sql_password=args.sql_password,
-            sql_db=args.sql_db
-        )
-        if success:
-            success_count += 1
-    
-    logger.info(f"Processing complete. Successfully processed {success_count}/{len(args.files)} files.")
+    # Discover input files lazily so processing starts before discovery finishes
+    files = args.files
+    if not (files or args.input_dir or args.glob or args.manifest):
+        files = ["sample.pdf", "sample.docx", "sample.pptx"]
+    # Files are named in discovery order, so the size order never decides which file is renamed
+    output_names = {}
+    file_paths = largest_first(
+        _name_outputs(
+            discover_files(files, args.input_dir, args.glob, args.manifest, recursive=not args.no_recursive),
+            output_names
+        ),
+        args.size_order_window
+    )
+    
+    # Process all files, in parallel when more than one worker is requested
+    results = process_files(
+        file_paths,
+        workers=args.workers,
+        use_sql=args.sql,
+        sql_host=args.sql_host,
+        sql_user=args.sql_user,
+        sql_password=args.sql_password,
+        sql_db=args.sql_db,
+        sql_batch_size=args.sql_batch_size,
+        sql_pool_size=args.sql_pool_size,
+        sql_table_mode=args.sql_table_mode,
+        output_dir=args.output_dir,
+        skip_tables=args.skip_tables,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        cache_size_mb=args.cache_size_mb,
+        image_writers=args.image_writers,
+        text_granularity=args.text_granularity,
+        use_parquet=args.parquet,
+        output_formats=output_formats,
+        pages=args.pages,
+        page_workers=args.page_workers,
+        table_prefilter=not args.no_table_prefilter,
+        metrics_out=args.metrics_out,
+        journal=None if args.no_journal else args.journal,
+        resume=args.resume,
+        output_names=output_names
+    )
+    
+    failed_files = [file_path for file_path, success in results.items() if not success]
+    for file_path in failed_files:
+        logger.error(f"Failed to process file: {file_path}")
+    
+    success_count = len(results) - len(failed_files)
+    logger.info(f"Processing complete. Successfully processed {success_count}/{len(results)} files.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+import sys
+import time
+import logging
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process so far in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+class MetricsRecorder:
+    """Records per-stage timings and counters while one document is processed.
+    
+    Every stage (e.g. "load_file", "extract_text", "store_all") accumulates
+    wall and CPU time, the number of times it ran, records produced, bytes
+    written and the process's peak RSS when it last finished. Stages nest:
+    "process_file" covers a whole document and store_* stages include the
+    extraction they drive. Each finished stage measurement is also passed to
+    every hook, a callable taking one event dict with the file name, the
+    stage and the measured values.
+    
+    CPU time is process CPU time, so it includes background image writer
+    threads. Streaming extract_* stages are timed only while their generator
+    runs, so the time a consumer spends between records is not counted.
+    """
+    
+    def __init__(self, file_name=None, hooks=()):
+        """Initialize with the name of the processed document and optional hooks."""
+        self.file_name = file_name
+        self.hooks = list(hooks)
+        self.stages = {}
+    
+    def add_hook(self, hook):
+        """Register a callable that receives an event dict for every finished stage."""
+        self.hooks.append(hook)
+    
+    @contextmanager
+    def stage(self, name):
+        """Time the body of a with block as one run of stage name.
+        
+        The block receives a dict in which it may set "records" and
+        "bytes_written" for this run.
+        """
+        counts = {"records": 0, "bytes_written": 0}
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield counts
+        finally:
+            self._finish(name, time.perf_counter() - wall_start, time.process_time() - cpu_start,
+                         counts["records"], counts["bytes_written"])
+    
+    def timed_iter(self, name, items, count=None):
+        """Yield from items, timing only the work done inside the iterator as stage name.
+        
+        count returns the number of records in a yielded item; by default
+        every item is one record.
+        """
+        wall = 0.0
+        cpu = 0.0
+        records = 0
+        iterator = iter(items)
+        try:
+            while True:
+                wall_start = time.perf_counter()
+                cpu_start = time.process_time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    wall += time.perf_counter() - wall_start
+                    cpu += time.process_time() - cpu_start
+                records += count(item) if count is not None else 1
+                yield item
+        finally:
+            self._finish(name, wall, cpu, records)
+    
+    def report(self):
+        """Return the recorded stages, in the order they first ran, as a JSON-serializable dict."""
+        stages = []
+        for name, entry in self.stages.items():
+            stage = {"stage": name, **entry}
+            stage["wall_seconds"] = round(stage["wall_seconds"], 6)
+            stage["cpu_seconds"] = round(stage["cpu_seconds"], 6)
+            stages.append(stage)
+        return {"file_name": self.file_name, "stages": stages, "peak_rss_mb": peak_rss_mb()}
+    
+    def merge(self, stages, prefix=""):
+        """Add the stages recorded by another MetricsRecorder, such as one in a worker process.
+        
+        stages is that recorder's stages dict. Each stage is added as prefix
+        plus its name and passed to the hooks as one event; peak_rss_mb keeps
+        the larger of the two processes' values.
+        """
+        for name, entry in stages.items():
+            self._add(prefix + name, entry["calls"], entry["wall_seconds"], entry["cpu_seconds"],
+                      entry["records"], entry["bytes_written"], entry["peak_rss_mb"])
+    
+    def _finish(self, name, wall, cpu, records=0, bytes_written=0):
+        """Add one finished run of stage name and notify the hooks."""
+        self._add(name, 1, wall, cpu, records, bytes_written, peak_rss_mb())
+    
+    def _add(self, name, calls, wall, cpu, records, bytes_written, peak_rss):
+        """Add calls runs of stage name with their totals and notify the hooks."""
+        entry = self.stages.setdefault(name, {
+            "calls": 0,
+            "wall_seconds": 0.0,
+            "cpu_seconds": 0.0,
+            "records": 0,
+            "bytes_written": 0,
+            "peak_rss_mb": None
+        })
+        entry["calls"] += calls
+        entry["wall_seconds"] += wall
+        entry["cpu_seconds"] += cpu
+        entry["records"] += records
+        entry["bytes_written"] += bytes_written
+        if peak_rss is not None:
+            entry["peak_rss_mb"] = max(entry["peak_rss_mb"] or 0, peak_rss)
+        
+        event = {
+            "file_name": self.file_name,
+            "stage": name,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "records": records,
+            "bytes_written": bytes_written,
+            "peak_rss_mb": entry["peak_rss_mb"]
+        }
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                logger.error(f"Metrics hook failed for stage {name}: {e}")
+
+
+class NullMetrics:
+    """Stand-in for MetricsRecorder when no metrics are collected."""
+    
+    def add_hook(self, hook):
+        """Ignore the hook."""
+        pass
+    
+    @contextmanager
+    def stage(self, name):
+        """Run the with block without timing it."""
+        yield {"records": 0, "bytes_written": 0}
+    
+    def timed_iter(self, name, items, count=None):
+        """Return items unchanged."""
+        return items
+    
+    def merge(self, stages, prefix=""):
+        """Ignore the stages."""
+        pass
+
+
+# Shared instance used by loaders, extractors and storage without a recorder
+NULL_METRICS = NullMetrics()
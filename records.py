@@ -0,0 +1,83 @@
+import sys
+from collections.abc import Mapping
+
+
+class Record(Mapping):
+    """Compact record with a fixed set of fields and a dict-like view.
+    
+    Subclasses list their fields in __slots__, in the order they appear when
+    the record is stored, so a record holds one pointer per field instead of
+    a full dict. String fields named in INTERNED are interned because the
+    same file names, fonts and styles repeat on thousands of records. Records
+    support the Mapping interface (record["text"], keys(), items(), dict())
+    and item assignment of existing fields.
+    """
+    
+    __slots__ = ()
+    INTERNED = ()
+    
+    def __init__(self, **values):
+        """Initialize every field from keyword arguments."""
+        for field in self.__slots__:
+            value = values[field]
+            if field in self.INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+    
+    def __getitem__(self, key):
+        """Return the value of a field."""
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        """Replace the value of an existing field."""
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __iter__(self):
+        """Iterate over the field names in storage order."""
+        return iter(self.__slots__)
+    
+    def __len__(self):
+        """Return the number of fields."""
+        return len(self.__slots__)
+    
+    def __repr__(self):
+        """Return the record in dict notation."""
+        return f"{type(self).__name__}({dict(self)!r})"
+    
+    def __reduce__(self):
+        """Pickle records by their field values, e.g. for worker processes."""
+        return (_rebuild_record, (type(self), dict(self)))
+
+
+def _rebuild_record(record_class, values):
+    """Recreate a pickled record."""
+    return record_class(**values)
+
+
+class PDFTextRecord(Record):
+    """Text span (or merged spans) of a PDF page."""
+    
+    __slots__ = ("page_number", "text", "font", "size", "color", "is_bold", "is_italic",
+                 "file_type", "file_name")
+    INTERNED = ("font", "file_type", "file_name")
+
+
+class DOCXTextRecord(Record):
+    """Text run of a DOCX paragraph."""
+    
+    __slots__ = ("paragraph_index", "run_index", "text", "style", "is_bold", "is_italic",
+                 "is_heading", "heading_level", "file_type", "file_name")
+    INTERNED = ("style", "file_type", "file_name")
+
+
+class PPTXTextRecord(Record):
+    """Text of a PPTX shape."""
+    
+    __slots__ = ("slide_number", "shape_index", "text", "is_title", "shape_type",
+                 "file_type", "file_name")
+    INTERNED = ("shape_type", "file_type", "file_name")
+
@@ -2,9 +2,10 @@ from abc import ABC, abstractmethod
 import os
 import csv
 import json
-import mysql.connector
-from mysql.connector import Error
+import zlib
 import logging
+from data_extractor import DATA_TYPES, RECORD_FIELDS, PageRanges, record_fields
+from metrics import NULL_METRICS
 
 # Configure logging
 logging.basicConfig(
@@ -13,6 +14,107 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _mysql():
+    """Return the mysql.connector module, imported on first use by SQL storage."""
+    import mysql.connector
+    return mysql.connector
+
+
+def _pyarrow():
+    """Return the pyarrow and pyarrow.parquet modules, imported on first use by Parquet storage.
+    
+    pyarrow is optional; ImportError is raised when it is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet storage (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+
+# Singular and plural labels used when logging stored records of each data type
+DATA_TYPE_LABELS = {
+    "text": ("text", "text items"),
+    "links": ("link", "links"),
+    "images": ("image", "image metadata"),
+    "tables": ("table", "tables")
+}
+
+
+# Record field holding the page or slide number of each file type. Storage
+# backends replace the records of these fields' selected pages when only part
+# of a document is re-extracted.
+PAGE_FIELDS = {
+    "pdf": "page_number",
+    "pptx": "slide_number"
+}
+
+# Record file formats written by FileStorage
+FILE_FORMATS = ("csv", "json", "jsonl")
+
+
+def _normalize_formats(formats):
+    """Return the set of FILE_FORMATS selected by formats, expanding "both" to CSV and JSON."""
+    if isinstance(formats, str):
+        formats = [formats]
+    
+    selected = set()
+    for file_format in formats:
+        if file_format == "both":
+            selected.update(("csv", "json"))
+        elif file_format in FILE_FORMATS:
+            selected.add(file_format)
+        else:
+            raise ValueError(f"Unknown output format: {file_format}")
+    
+    if not selected:
+        raise ValueError("At least one output format is required")
+    return selected
+
+
+def _file_size(path):
+    """Return the size of a written file in bytes, or 0 if it cannot be read."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class RecordWriter(ABC):
+    """Abstract base class for writing a stream of records of one data type.
+    
+    Storage backends open one writer per data type, feed it records as they
+    are extracted and close it at the end, so no backend needs the full list
+    of records in memory. File backends set bytes_written when closing.
+    """
+    
+    def __init__(self, data_type):
+        """Initialize with the data type ("text", "links", "images" or "tables")."""
+        self.data_type = data_type
+        self.count = 0
+        self.bytes_written = 0
+    
+    def write(self, record):
+        """Write a single record."""
+        self._write_record(record)
+        self.count += 1
+    
+    def write_many(self, records):
+        """Write every record from an iterable."""
+        for record in records:
+            self.write(record)
+    
+    @abstractmethod
+    def _write_record(self, record):
+        """Write a single record to the backend."""
+        pass
+    
+    @abstractmethod
+    def close(self):
+        """Finish writing and return the location of the stored data, if any."""
+        pass
+
 
 class Storage(ABC):
     """Abstract base class for storing extracted data."""
@@ -22,219 +124,781 @@ class Storage(ABC):
         self.data_extractor = data_extractor
     
     @abstractmethod
-    def store_text(self):
-        """Store extracted text data."""
+    def store_text(self, text_data=None):
+        """Store extracted text data (extracted on demand if not given)."""
         pass
     
     @abstractmethod
-    def store_links(self):
-        """Store extracted hyperlink data."""
+    def store_links(self, links_data=None):
+        """Store extracted hyperlink data (extracted on demand if not given)."""
         pass
     
     @abstractmethod
-    def store_images(self):
-        """Store extracted image data."""
+    def store_images(self, images_data=None):
+        """Store extracted image data (extracted on demand if not given)."""
         pass
     
     @abstractmethod
-    def store_tables(self):
-        """Store extracted table data."""
+    def store_tables(self, tables_data=None):
+        """Store extracted table data (extracted on demand if not given)."""
+        pass
+    
+    @abstractmethod
+    def open_writer(self, data_type):
+        """Return a RecordWriter that stores records of the given data type."""
         pass
     
     def store_all(self):
-        """Store all extracted data types."""
-        self.store_text()
-        self.store_links()
-        self.store_images()
-        self.store_tables()
+        """Store all extracted data types from a single streaming extraction pass.
+        
+        One writer per data type stays open while the document is walked, and
+        the records of each page are written as soon as they are extracted.
+        """
+        with self._metrics().stage("store_all") as counts:
+            writers = {data_type: self.open_writer(data_type) for data_type in DATA_TYPES}
+            
+            for page_records in self.data_extractor.iter_pages(self.images_dir):
+                for data_type, records in page_records.items():
+                    writers[data_type].write_many(records)
+            
+            locations = {data_type: writer.close() for data_type, writer in writers.items()}
+            counts["records"] = sum(writer.count for writer in writers.values())
+            counts["bytes_written"] = sum(writer.bytes_written for writer in writers.values())
+        return locations
+    
+    def close(self):
+        """Release any resources held by the storage backend."""
+        pass
+    
+    def _replaced_pages(self, data_type):
+        """Return the PageRanges whose stored data_type records are replaced, or None.
+        
+        When only some pages are extracted, backends keep previously stored
+        records of the other pages and replace those of the selected pages.
+        Data types the run does not extract at all, such as tables with
+        skip_tables, keep every stored record; None is also returned when the
+        whole document is stored.
+        """
+        pages = getattr(self.data_extractor, "pages", None)
+        if self.data_extractor.file_type not in PAGE_FIELDS or not isinstance(pages, PageRanges):
+            return None
+        if data_type not in getattr(self.data_extractor, "data_types", DATA_TYPES):
+            return None
+        return pages
+    
+    def _metrics(self):
+        """Return the metrics recorder of the data extractor, if it has one."""
+        return getattr(self.data_extractor, "metrics", NULL_METRICS)
+    
+    def _store_records(self, data_type, records):
+        """Stream records of one data type through a new writer."""
+        with self._metrics().stage(f"store_{data_type}") as counts:
+            writer = self.open_writer(data_type)
+            writer.write_many(records)
+            location = writer.close()
+            counts["records"] = writer.count
+            counts["bytes_written"] = writer.bytes_written
+        return location
 
 
-class FileStorage(Storage):
-    """Concrete class to store extracted data to files."""
+class _FileRecordWriter(RecordWriter):
+    """Streams records to CSV, JSON and JSON Lines files side by side.
     
-    def __init__(self, data_extractor, output_dir="output"):
-        """Initialize with a DataExtractor instance and output directory."""
-        super().__init__(data_extractor)
-        self.output_dir = output_dir
+    Only the files of the selected formats are written: csv_path, an indented
+    JSON array at json_path, and one compact JSON object per line at
+    jsonl_path.
+    """
+    
+    def __init__(self, data_type, base_path, formats, fieldnames, description):
+        super().__init__(data_type)
+        self.csv_path = f"{base_path}.csv"
+        self.json_path = f"{base_path}.json"
+        self.jsonl_path = f"{base_path}.jsonl"
+        self.formats = formats
+        self.fieldnames = fieldnames
+        self.description = description
+        self._opened = False
+        self._csv_file = None
+        self._json_file = None
+        self._jsonl_file = None
+        self._csv_writer = None
+    
+    def _open(self, record):
+        """Open the output files when the first record arrives."""
+        if "csv" in self.formats:
+            # Fall back to the record's own keys for unknown file types
+            fieldnames = self.fieldnames or sorted(record.keys())
+            
+            self._csv_file = open(self.csv_path, 'w', newline='', encoding='utf-8')
+            self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=fieldnames)
+            self._csv_writer.writeheader()
         
-        # Create output directory if it doesn't exist
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        if "json" in self.formats:
+            self._json_file = open(self.json_path, 'w', encoding='utf-8')
+            self._json_file.write("[")
         
-        # Create subdirectories for different data types
-        self.text_dir = os.path.join(output_dir, "text")
-        self.links_dir = os.path.join(output_dir, "links")
-        self.images_dir = os.path.join(output_dir, "images")
-        self.tables_dir = os.path.join(output_dir, "tables")
+        if "jsonl" in self.formats:
+            self._jsonl_file = open(self.jsonl_path, 'w', encoding='utf-8')
         
-        for directory in [self.text_dir, self.links_dir, self.images_dir, self.tables_dir]:
-            os.makedirs(directory, exist_ok=True)
+        self._opened = True
+    
+    def _write_record(self, record):
+        if not self._opened:
+            self._open(record)
         
-        # Get file type from data_extractor
-        self.file_type = data_extractor.file_type
-        self.file_name = data_extractor.file_name.replace(f".{self.file_type}", "")
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(record)
+        
+        if self._json_file is not None:
+            # Produce the same layout as json.dump(records, indent=2)
+            separator = "\n" if self.count == 0 else ",\n"
+            item = json.dumps(dict(record), indent=2).replace("\n", "\n  ")
+            self._json_file.write(f"{separator}  {item}")
+        
+        if self._jsonl_file is not None:
+            self._jsonl_file.write(json.dumps(dict(record), separators=(",", ":")) + "\n")
     
-    def store_text(self):
-        """Store extracted text data to CSV file."""
-        text_data = self.data_extractor.extract_text()
+    def close(self):
+        if not self._opened:
+            logger.info(f"No {DATA_TYPE_LABELS[self.data_type][0]} data to store.")
+            return None
         
-        if not text_data:
-            logger.info("No text data to store.")
+        paths = []
+        if self._csv_file is not None:
+            self._csv_file.close()
+            paths.append(self.csv_path)
+        if self._json_file is not None:
+            self._json_file.write("\n]")
+            self._json_file.close()
+            paths.append(self.json_path)
+        if self._jsonl_file is not None:
+            self._jsonl_file.close()
+            paths.append(self.jsonl_path)
+        self.bytes_written = sum(_file_size(path) for path in paths)
+        
+        logger.info(f"Stored {self.count} {self.description} to {paths[0]}")
+        return paths[0]
+
+
+def _iter_json_array(json_file, chunk_size=64 * 1024):
+    """Yield the objects of a JSON array file one at a time instead of loading the whole array."""
+    decoder = json.JSONDecoder()
+    buffer = json_file.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError(f"Not a JSON array: {json_file.name}")
+    position = 1
+    
+    while True:
+        # Skip whitespace and the separator before the next item
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
             return
         
-        # Create CSV file
-        filename = f"{self.file_type}_{self.file_name}_text.csv"
-        filepath = os.path.join(self.text_dir, filename)
+        try:
+            # Items are objects, so a truncated item never decodes
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = json_file.read(chunk_size)
+            if not chunk:
+                raise
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+
+
+class _StoredRecords:
+    """Records an earlier run stored for a document, while some of its pages are re-extracted.
+    
+    The stored files are moved aside with STASH_SUFFIX so the writer can
+    recreate them, and records are streamed back from the moved copy instead
+    of being loaded into memory. The copy is deleted by close() once the
+    merged output is complete; if a run stops before that, the next run
+    reads the copy again instead of the incomplete output.
+    """
+    
+    STASH_SUFFIX = ".replaced"
+    
+    def __init__(self, storage, base_path, pages):
+        """Move the files stored under base_path aside; pages are the re-extracted pages."""
+        self.storage = storage
+        self.base_path = base_path
+        self.pages = pages
+        self.page_field = PAGE_FIELDS[storage.file_type]
+        self.stashed_paths = []
         
-        # Get all possible keys from the dicts
-        all_keys = set()
-        for item in text_data:
-            all_keys.update(item.keys())
+        for path in storage._record_paths(base_path):
+            stashed_path = path + self.STASH_SUFFIX
+            if os.path.exists(stashed_path):
+                # An earlier merge did not finish, its output is incomplete
+                if os.path.exists(path):
+                    os.remove(path)
+            elif os.path.exists(path):
+                os.replace(path, stashed_path)
+            else:
+                continue
+            self.stashed_paths.append(stashed_path)
+    
+    def _records(self):
+        """Yield every stored record from the moved-aside files."""
+        if not self.stashed_paths:
+            return iter(())
+        return self.storage._iter_records(self.base_path, self.STASH_SUFFIX)
+    
+    def kept(self):
+        """Yield the stored records of pages outside the selection, in stored order."""
+        kept = replaced = 0
+        for record in self._records():
+            if int(record[self.page_field]) in self.pages:
+                replaced += 1
+                continue
+            kept += 1
+            yield record
         
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=sorted(all_keys))
-            writer.writeheader()
-            writer.writerows(text_data)
+        if kept or replaced:
+            logger.info(f"Replacing {replaced} and keeping {kept} stored records in {self.base_path}")
+    
+    def replaced(self):
+        """Yield the stored records of the selected pages."""
+        for record in self._records():
+            if int(record[self.page_field]) in self.pages:
+                yield record
+    
+    def close(self):
+        """Delete the moved-aside files."""
+        for path in self.stashed_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        self.stashed_paths = []
+
+
+class _PageMergeWriter(RecordWriter):
+    """Merges newly extracted records into the records kept from an earlier run.
+    
+    The kept records are read one at a time from stored, a _StoredRecords,
+    and written before the new records of later pages, so the output stays
+    ordered by page.
+    """
+    
+    def __init__(self, writer, stored):
+        super().__init__(writer.data_type)
+        self.writer = writer
+        self.stored = stored
+        self.page_field = stored.page_field
+        self._kept = stored.kept()
+        self._next_kept = next(self._kept, None)
+    
+    def _write_kept(self, before_page=None):
+        """Write kept records of pages before before_page, or all remaining ones."""
+        while self._next_kept is not None and (
+                before_page is None or int(self._next_kept[self.page_field]) < before_page):
+            self.writer.write(self._next_kept)
+            self._next_kept = next(self._kept, None)
+    
+    def _write_record(self, record):
+        self._write_kept(int(record[self.page_field]))
+        self.writer.write(record)
+    
+    def close(self):
+        self._write_kept()
+        location = self.writer.close()
+        self.stored.close()
+        self.bytes_written = self.writer.bytes_written
+        return location
+
+
+class _FileTableWriter(RecordWriter):
+    """Writes each table to its own CSV file plus a shared metadata file."""
+    
+    def __init__(self, storage):
+        super().__init__("tables")
+        self.storage = storage
+        self.table_filepaths = []
         
-        logger.info(f"Stored {len(text_data)} text items to {filepath}")
+        base_path = os.path.join(storage.tables_dir, f"{storage.file_type}_{storage.file_name}_tables_metadata")
+        metadata_writer = _FileRecordWriter(
+            "tables",
+            base_path,
+            storage.formats,
+            [field for field in record_fields(storage.file_type, "tables") if field != "content"],
+            "table metadata"
+        )
+        stored = storage._stored_records("tables", base_path)
         
-        # Also save as JSON for easier processing
-        json_filepath = os.path.join(self.text_dir, f"{self.file_type}_{self.file_name}_text.json")
-        with open(json_filepath, 'w', encoding='utf-8') as jsonfile:
-            json.dump(text_data, jsonfile, indent=2)
+        # Tables of re-extracted pages are rewritten, drop the content files of the old ones
+        if stored is not None:
+            for table in stored.replaced():
+                if os.path.exists(self._table_path(table)):
+                    os.remove(self._table_path(table))
         
-        return filepath
+        self.metadata_writer = storage._merge_writer(metadata_writer, stored)
     
-    def store_links(self):
-        """Store extracted hyperlink data to CSV file."""
-        links_data = self.data_extractor.extract_links()
-        
-        if not links_data:
-            logger.info("No link data to store.")
-            return
+    def _table_path(self, table):
+        """Return the CSV path holding the content of a table."""
+        file_type = self.storage.file_type
         
-        # Create CSV file
-        filename = f"{self.file_type}_{self.file_name}_links.csv"
-        filepath = os.path.join(self.links_dir, filename)
+        # Create a unique identifier for the table
+        if file_type == "pdf":
+            table_id = f"page{table['page_number']}_table{table['table_index']}"
+        elif file_type == "docx":
+            table_id = f"table{table['table_index']}"
+        else:  # pptx
+            table_id = f"slide{table['slide_number']}_table{table['table_index']}"
         
-        # Get all possible keys from the dicts
-        all_keys = set()
-        for item in links_data:
-            all_keys.update(item.keys())
+        filename = f"{file_type}_{self.storage.file_name}_{table_id}.csv"
+        return os.path.join(self.storage.tables_dir, filename)
+    
+    def _write_record(self, table):
+        filepath = self._table_path(table)
         
+        # Write table content to CSV
         with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=sorted(all_keys))
-            writer.writeheader()
-            writer.writerows(links_data)
+            writer = csv.writer(csvfile)
+            writer.writerows(table['content'])
+        self.bytes_written += _file_size(filepath)
         
-        logger.info(f"Stored {len(links_data)} links to {filepath}")
+        self.table_filepaths.append(filepath)
         
-        # Also save as JSON for easier processing
-        json_filepath = os.path.join(self.links_dir, f"{self.file_type}_{self.file_name}_links.json")
-        with open(json_filepath, 'w', encoding='utf-8') as jsonfile:
-            json.dump(links_data, jsonfile, indent=2)
+        # Clean table data by removing the actual content (saving space)
+        table_meta = dict(table)
+        table_meta.pop("content", None)
+        self.metadata_writer.write(table_meta)
+    
+    def close(self):
+        if not self.table_filepaths:
+            # Still writes back table metadata kept from an earlier run
+            self.metadata_writer.close()
+            self.bytes_written += self.metadata_writer.bytes_written
+            return None
         
-        return filepath
+        # The metadata writer logs its own count; report the tables directory as before
+        self.metadata_writer.close()
+        self.bytes_written += self.metadata_writer.bytes_written
+        logger.info(f"Stored {self.count} tables to {self.storage.tables_dir}")
+        return self.table_filepaths
+
+
+class FileStorage(Storage):
+    """Concrete class to store extracted data to files."""
     
-    def store_images(self):
-        """Store extracted image metadata to CSV file."""
-        # Images are already saved to disk during extraction
-        images_data = self.data_extractor.extract_images(self.images_dir)
+    def __init__(self, data_extractor, output_dir="output", formats=("csv", "json")):
+        """Initialize with a DataExtractor instance and output directory.
         
-        if not images_data:
-            logger.info("No image data to store.")
-            return
+        formats selects the files written for each data type from
+        FILE_FORMATS: "csv", "json" (an indented JSON array) and "jsonl" (one
+        compact JSON object per line). "both" stands for CSV and JSON. Table
+        content is always written to one CSV file per table.
+        """
+        super().__init__(data_extractor)
+        self.output_dir = output_dir
+        self.formats = _normalize_formats(formats)
         
-        # Create CSV file for image metadata
-        filename = f"{self.file_type}_{self.file_name}_images.csv"
-        filepath = os.path.join(self.images_dir, filename)
+        # Create output directory if it doesn't exist
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
         
-        # Get all possible keys from the dicts
-        all_keys = set()
-        for item in images_data:
-            all_keys.update(item.keys())
+        # Create subdirectories for different data types
+        self.text_dir = os.path.join(output_dir, "text")
+        self.links_dir = os.path.join(output_dir, "links")
+        self.images_dir = os.path.join(output_dir, "images")
+        self.tables_dir = os.path.join(output_dir, "tables")
         
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=sorted(all_keys))
-            writer.writeheader()
-            writer.writerows(images_data)
+        for directory in [self.text_dir, self.links_dir, self.images_dir, self.tables_dir]:
+            os.makedirs(directory, exist_ok=True)
         
-        logger.info(f"Stored {len(images_data)} image metadata to {filepath}")
+        # Get file type from data_extractor
+        self.file_type = data_extractor.file_type
+        self.file_name = data_extractor.file_name.replace(f".{self.file_type}", "")
+    
+    def open_writer(self, data_type):
+        """Return a writer that streams records of data_type to the selected output files."""
+        if data_type == "tables":
+            return _FileTableWriter(self)
         
-        # Also save as JSON for easier processing
-        json_filepath = os.path.join(self.images_dir, f"{self.file_type}_{self.file_name}_images.json")
-        with open(json_filepath, 'w', encoding='utf-8') as jsonfile:
-            json.dump(images_data, jsonfile, indent=2)
+        directories = {"text": self.text_dir, "links": self.links_dir, "images": self.images_dir}
+        base_path = os.path.join(directories[data_type], f"{self.file_type}_{self.file_name}_{data_type}")
+        writer = _FileRecordWriter(
+            data_type,
+            base_path,
+            self.formats,
+            record_fields(self.file_type, data_type),
+            DATA_TYPE_LABELS[data_type][1]
+        )
+        return self._merge_writer(writer, self._stored_records(data_type, base_path))
+    
+    def _record_paths(self, base_path):
+        """Return the paths records stored under base_path may have been written to."""
+        return [f"{base_path}.{file_format}" for file_format in FILE_FORMATS]
+    
+    def _iter_records(self, base_path, suffix=""):
+        """Yield previously stored records one at a time, preferring the JSON formats.
         
-        return filepath
+        suffix is appended to every file path, for files moved aside.
+        """
+        if os.path.exists(f"{base_path}.jsonl{suffix}"):
+            with open(f"{base_path}.jsonl{suffix}", encoding='utf-8') as jsonl_file:
+                for line in jsonl_file:
+                    if line.strip():
+                        yield json.loads(line)
+        elif os.path.exists(f"{base_path}.json{suffix}"):
+            with open(f"{base_path}.json{suffix}", encoding='utf-8') as json_file:
+                yield from _iter_json_array(json_file)
+        elif os.path.exists(f"{base_path}.csv{suffix}"):
+            # CSV values are read back as text and written out unchanged
+            with open(f"{base_path}.csv{suffix}", newline='', encoding='utf-8') as csv_file:
+                yield from csv.DictReader(csv_file)
     
-    def store_tables(self):
+    def _stored_records(self, data_type, base_path):
+        """Return the _StoredRecords of data_type to merge with, or None if nothing is replaced.
+        
+        Only applies when some pages of data_type are re-extracted; the files
+        stored under base_path are then moved aside and streamed back by the
+        merge writer.
+        """
+        pages = self._replaced_pages(data_type)
+        if pages is None:
+            return None
+        return _StoredRecords(self, base_path, pages)
+    
+    def _merge_writer(self, writer, stored):
+        """Wrap writer so kept stored records are merged with the new ones when re-extracting pages."""
+        if stored is None:
+            return writer
+        return _PageMergeWriter(writer, stored)
+    
+    def store_text(self, text_data=None):
+        """Store extracted text data to the selected output files."""
+        if text_data is None:
+            text_data = self.data_extractor.iter_text()
+        return self._store_records("text", text_data)
+    
+    def store_links(self, links_data=None):
+        """Store extracted hyperlink data to the selected output files."""
+        if links_data is None:
+            links_data = self.data_extractor.iter_links()
+        return self._store_records("links", links_data)
+    
+    def store_images(self, images_data=None):
+        """Store extracted image metadata to the selected output files."""
+        # Images are already saved to disk during extraction
+        if images_data is None:
+            images_data = self.data_extractor.iter_images(self.images_dir)
+        return self._store_records("images", images_data)
+    
+    def store_tables(self, tables_data=None):
         """Store extracted table data to CSV files."""
-        tables_data = self.data_extractor.extract_tables()
+        if tables_data is None:
+            tables_data = self.data_extractor.iter_tables()
+        return self._store_records("tables", tables_data)
+
+
+def _parquet_field_type(field):
+    """Return the Arrow type stored for a record field."""
+    pa, _ = _pyarrow()
+    
+    # Values repeated on most records are dictionary encoded
+    if field in ("file_type", "file_name", "font", "style", "shape_type", "format"):
+        return pa.dictionary(pa.int32(), pa.string())
+    if field in ("page_number", "slide_number", "paragraph_index", "run_index", "shape_index",
+                 "link_index", "image_index", "table_index", "heading_level",
+                 "width", "height", "rows", "columns"):
+        return pa.int32()
+    if field == "color":
+        return pa.int64()
+    if field == "size":
+        return pa.float64()
+    if field in ("is_bold", "is_italic", "is_heading", "is_title"):
+        return pa.bool_()
+    if field == "rect":
+        return pa.list_(pa.float64())
+    if field == "content":
+        return pa.list_(pa.list_(pa.string()))
+    return pa.string()
+
+
+def parquet_schema(file_type, data_type):
+    """Return the Arrow schema of data_type records for file_type, or None if unknown.
+    
+    Columns follow the field order of the extracted records.
+    """
+    fields = RECORD_FIELDS.get(file_type, {}).get(data_type)
+    if not fields:
+        return None
+    pa, _ = _pyarrow()
+    return pa.schema([(field, _parquet_field_type(field)) for field in fields])
+
+
+class _ParquetRecordWriter(RecordWriter):
+    """Streams records to a Parquet file one row group at a time.
+    
+    Records are buffered column by column and written as a row group once
+    row_group_size records are pending, so memory use is bounded by the row
+    group rather than the document.
+    """
+    
+    def __init__(self, data_type, path, schema, description, row_group_size, compression):
+        super().__init__(data_type)
+        self.path = path
+        self.schema = schema
+        self.description = description
+        self.row_group_size = max(1, row_group_size)
+        self.compression = compression
+        self._columns = None
+        self._pending = 0
+        self._writer = None
+    
+    def _write_record(self, record):
+        if self._columns is None:
+            # Fall back to the record's own keys for unknown file types
+            names = self.schema.names if self.schema is not None else sorted(record.keys())
+            self._columns = {name: [] for name in names}
         
-        if not tables_data:
-            logger.info("No table data to store.")
-            return
+        for name, values in self._columns.items():
+            values.append(record.get(name))
+        self._pending += 1
         
-        # Store each table to a separate CSV file
-        table_filepaths = []
-        
-        for table_idx, table in enumerate(tables_data):
-            # Create a unique identifier for the table
-            if self.file_type == "pdf":
-                table_id = f"page{table['page_number']}_table{table['table_index']}"
-            elif self.file_type == "docx":
-                table_id = f"table{table['table_index']}"
-            else:  # pptx
-                table_id = f"slide{table['slide_number']}_table{table['table_index']}"
-            
-            filename = f"{self.file_type}_{self.file_name}_{table_id}.csv"
-            filepath = os.path.join(self.tables_dir, filename)
-            
-            # Write table content to CSV
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerows(table['content'])
-            
-            table_filepaths.append(filepath)
+        if self._pending >= self.row_group_size:
+            self.flush()
+    
+    def flush(self):
+        """Write the buffered records as one row group."""
+        if not self._pending:
+            return
         
-        # Create a metadata CSV for all tables
-        metadata_filename = f"{self.file_type}_{self.file_name}_tables_metadata.csv"
-        metadata_filepath = os.path.join(self.tables_dir, metadata_filename)
+        pa, pq = _pyarrow()
+        table = pa.Table.from_pydict(self._columns, schema=self.schema)
+        if self._writer is None:
+            self.schema = table.schema
+            self._writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self._writer.write_table(table)
         
-        # Clean table data by removing the actual content (saving space)
-        metadata = []
-        for table in tables_data:
-            table_meta = table.copy()
-            table_meta.pop("content", None)
-            metadata.append(table_meta)
+        for values in self._columns.values():
+            values.clear()
+        self._pending = 0
+    
+    def close(self):
+        self.flush()
+        if self._writer is None:
+            logger.info(f"No {DATA_TYPE_LABELS[self.data_type][0]} data to store.")
+            return None
         
-        # Get all possible keys from the dicts
-        all_keys = set()
-        for item in metadata:
-            all_keys.update(item.keys())
+        self._writer.close()
+        self.bytes_written = _file_size(self.path)
+        logger.info(f"Stored {self.count} {self.description} to {self.path}")
+        return self.path
+
+
+class ParquetStorage(FileStorage):
+    """Stores extracted data as typed, compressed Parquet files.
+    
+    Each data type is written to one Parquet file with a fixed schema per
+    file type, streamed in row groups of row_group_size records. Tables keep
+    their cell content as a nested list column instead of one CSV per table.
+    Requires pyarrow.
+    """
+    
+    def __init__(self, data_extractor, output_dir="output", row_group_size=10000, compression="zstd"):
+        """Initialize with a DataExtractor instance, output directory and Parquet options."""
+        # Fails early when pyarrow is missing
+        _pyarrow()
         
-        with open(metadata_filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=sorted(all_keys))
-            writer.writeheader()
-            writer.writerows(metadata)
+        super().__init__(data_extractor, output_dir=output_dir)
+        self.row_group_size = row_group_size
+        self.compression = compression
+    
+    def open_writer(self, data_type):
+        """Return a writer that streams records of data_type to a Parquet file."""
+        directories = {
+            "text": self.text_dir,
+            "links": self.links_dir,
+            "images": self.images_dir,
+            "tables": self.tables_dir
+        }
+        base_path = os.path.join(directories[data_type], f"{self.file_type}_{self.file_name}_{data_type}")
+        writer = _ParquetRecordWriter(
+            data_type,
+            f"{base_path}.parquet",
+            parquet_schema(self.file_type, data_type),
+            DATA_TYPE_LABELS[data_type][1],
+            self.row_group_size,
+            self.compression
+        )
+        return self._merge_writer(writer, self._stored_records(data_type, base_path))
+    
+    def _record_paths(self, base_path):
+        """Return the Parquet file records stored under base_path were written to."""
+        return [f"{base_path}.parquet"]
+    
+    def _iter_records(self, base_path, suffix=""):
+        """Yield previously stored records from the Parquet file one row group at a time."""
+        if not os.path.exists(f"{base_path}.parquet{suffix}"):
+            return
+        _, pq = _pyarrow()
+        with pq.ParquetFile(f"{base_path}.parquet{suffix}") as parquet_file:
+            for batch in parquet_file.iter_batches(batch_size=self.row_group_size):
+                yield from batch.to_pylist()
+
+
+# Encoding of the table content stored in tables_blobs
+TABLE_BLOB_ENCODING = "json+zlib"
+
+
+def encode_table_content(content):
+    """Return table content (a list of rows of cells) as zlib-compressed JSON bytes."""
+    payload = json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str)
+    return zlib.compress(payload.encode("utf-8"))
+
+
+def decode_table_content(payload, encoding=TABLE_BLOB_ENCODING):
+    """Return the list of rows of cells encoded by encode_table_content."""
+    if encoding != TABLE_BLOB_ENCODING:
+        raise ValueError(f"Unsupported table content encoding: {encoding}")
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+class _SQLRecordWriter(RecordWriter):
+    """Inserts records into the database in batches.
+    
+    Rows are grouped by table and column set and sent with executemany once
+    batch_size rows are pending, so a document costs one round trip per batch
+    instead of one per record or table cell. The deletes of re-extracted
+    pages and the inserts are committed together when the writer closes, or
+    by SQLStorage.store_all once every writer has closed; a database error
+    rolls the transaction back, so the stored rows of those pages are kept.
+    """
+    
+    def __init__(self, storage, data_type, table_name, batch_size, replaced_pages=None):
+        super().__init__(data_type)
+        self.storage = storage
+        self.table_name = table_name
+        self.batch_size = max(1, batch_size)
+        self.replaced_pages = replaced_pages
+        self.failed = False
+        self._batches = {}
+        self._pending = 0
         
-        logger.info(f"Stored {len(tables_data)} tables to {self.tables_dir}")
+        # Rows of re-extracted pages are deleted in the transaction of the inserts
+        if replaced_pages is not None:
+            try:
+                self.storage._delete_pages(table_name, replaced_pages)
+            except _mysql().Error as e:
+                self._fail(e)
+    
+    def write(self, record):
+        # Stop writing after the first database error, which rolled the transaction back
+        if self.failed or self.storage.failed:
+            return
+        try:
+            super().write(record)
+        except _mysql().Error as e:
+            self._fail(e)
+    
+    def _write_record(self, record):
+        if self.data_type == "tables":
+            # The metadata row is inserted right away because its id is needed for the content
+            table_id, table_content = self.storage._insert_table_metadata(record)
+            if self.storage.table_mode == "blob":
+                self._add_row("tables_blobs", SQLStorage.BLOB_COLUMNS,
+                              (table_id, TABLE_BLOB_ENCODING, encode_table_content(table_content)))
+                return
+            for row_idx, row in enumerate(table_content):
+                for col_idx, cell in enumerate(row):
+                    self._add_row("tables_content", SQLStorage.CELL_COLUMNS,
+                                  (table_id, row_idx, col_idx, str(cell)))
+        else:
+            clean_item = self.storage._clean_dict_for_sql(dict(record), self.table_name)
+            self._add_row(self.table_name, tuple(clean_item.keys()), tuple(clean_item.values()))
+    
+    def _add_row(self, table_name, columns, values):
+        """Queue a row and flush once a full batch is pending."""
+        self._batches.setdefault((table_name, columns), []).append(values)
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Send all pending rows to the database."""
+        batches = self._batches
+        self._batches = {}
+        self._pending = 0
+        for (table_name, columns), rows in batches.items():
+            self.storage._insert_rows(table_name, columns, rows)
+    
+    def _fail(self, error):
+        self.failed = True
+        self.storage.failed = True
+        self._batches = {}
+        self._pending = 0
+        logger.error(f"Error storing {DATA_TYPE_LABELS[self.data_type][0]} data to database: {error}")
+        self.storage._rollback()
+    
+    def close(self):
+        singular, plural = DATA_TYPE_LABELS[self.data_type]
+        if self.failed or self.storage.failed:
+            return None
+        if self.count == 0:
+            logger.info(f"No {singular} data to store in database.")
+            # Deleted rows of re-extracted pages still need to be committed
+            if self.replaced_pages is None:
+                return None
         
-        # Also save table metadata as JSON for easier processing
-        json_filepath = os.path.join(self.tables_dir, f"{self.file_type}_{self.file_name}_tables_metadata.json")
-        with open(json_filepath, 'w', encoding='utf-8') as jsonfile:
-            json.dump(metadata, jsonfile, indent=2)
+        try:
+            self.flush()
+            if not self.storage.deferred_commit:
+                self.storage.connection.commit()
+        except _mysql().Error as e:
+            self._fail(e)
+            return None
         
-        return table_filepaths
+        if self.count == 0:
+            return None
+        logger.info(f"Stored {self.count} {plural} to database")
+        return self.table_name
 
 
 class SQLStorage(Storage):
     """Concrete class to store extracted data to a MySQL database."""
     
-    def __init__(self, data_extractor, host="localhost", user="root", password="", database="document_extractor"):
-        """Initialize with a DataExtractor instance and database connection parameters."""
+    # Database table that receives the records of each data type
+    TABLE_NAMES = {
+        "text": "text_data",
+        "links": "links_data",
+        "images": "images_data",
+        "tables": "tables_metadata"
+    }
+    
+    # Columns of the tables_content rows written for every table cell
+    CELL_COLUMNS = ("table_id", "row_index", "column_index", "cell_content")
+    
+    # Columns of the tables_blobs row written for every table in blob mode
+    BLOB_COLUMNS = ("table_id", "encoding", "content")
+    
+    # Ways of storing table content: one row per cell or one compressed blob per table
+    TABLE_MODES = ("cells", "blob")
+    
+    def __init__(self, data_extractor, host="localhost", user="root", password="", database="document_extractor",
+                 batch_size=1000, pool=None, table_mode="cells"):
+        """Initialize with a DataExtractor instance and database connection parameters.
+        
+        batch_size is the number of rows sent to the database per executemany call.
+        If a SQLConnectionPool is given, a connection is borrowed from it and the
+        database and schema setup it already performed is skipped. table_mode
+        "cells" stores table content as one tables_content row per cell; "blob"
+        stores it as one zlib-compressed JSON row per table in tables_blobs.
+        Use load_tables or load_table_content to read it back in either mode.
+        """
+        if table_mode not in self.TABLE_MODES:
+            raise ValueError(f"Unsupported table mode: {table_mode}")
+        
         super().__init__(data_extractor)
+        self.batch_size = batch_size
+        self.table_mode = table_mode
+        
+        # Set while store_all holds back the writers' commits, and once a write
+        # failed and the open transaction was rolled back
+        self.deferred_commit = False
+        self.failed = False
         self.connection_params = {
             "host": host,
             "user": user,
@@ -242,34 +906,18 @@ class SQLStorage(Storage):
             "database": database
         }
         
+        # Images are saved to disk during extraction, only metadata goes to the database
+        self.images_dir = os.path.join("output", "images")
+        
         # Connect to database
         self.connection = None
         try:
-            self.connection = mysql.connector.connect(**self.connection_params)
-            self.cursor = self.connection.cursor()
-            
-            # Connect to MySQL server first (without database)
-            temp_connection = mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password
-            )
-            temp_cursor = temp_connection.cursor()
-            
-            # Create database if it doesn't exist
-            temp_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
-            temp_cursor.close()
-            temp_connection.close()
-            
-            # Now connect to the database
-            self.connection = mysql.connector.connect(**self.connection_params)
-            self.cursor = self.connection.cursor()
-            
-            # Create tables if they don't exist
-            self._create_tables()
-            
-            logger.info("Successfully connected to MySQL database")
-        except Error as e:
+            if pool is not None:
+                self.connection = pool.get_connection()
+                self.cursor = self.connection.cursor()
+            else:
+                self._connect(host, user, password, database)
+        except _mysql().Error as e:
             logger.error(f"Error connecting to MySQL database: {e}")
             raise
         
@@ -277,10 +925,36 @@ class SQLStorage(Storage):
         self.file_type = data_extractor.file_type
         self.file_name = data_extractor.file_name
     
-    def _create_tables(self):
-        """Create necessary tables if they don't exist."""
+    def _connect(self, host, user, password, database):
+        """Open a dedicated connection, creating the database and tables if needed."""
+        # Connect to MySQL server first (without database)
+        temp_connection = _mysql().connect(
+            host=host,
+            user=user,
+            password=password
+        )
+        temp_cursor = temp_connection.cursor()
+        
+        # Create database if it doesn't exist
+        temp_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+        temp_cursor.close()
+        temp_connection.close()
+        
+        # Now connect to the database
+        self.connection = _mysql().connect(**self.connection_params)
+        self.cursor = self.connection.cursor()
+        
+        # Create tables if they don't exist
+        self._create_tables(self.cursor)
+        self.connection.commit()
+        
+        logger.info("Successfully connected to MySQL database")
+    
+    @staticmethod
+    def _create_tables(cursor):
+        """Create necessary tables if they don't exist (the caller commits)."""
         # Create text table
-        self.cursor.execute("""
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS text_data (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 file_name VARCHAR(255),
@@ -304,7 +978,7 @@ class SQLStorage(Storage):
         """)
         
         # Create links table
-        self.cursor.execute("""
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS links_data (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 file_name VARCHAR(255),
@@ -322,7 +996,7 @@ class SQLStorage(Storage):
         """)
         
         # Create images table
-        self.cursor.execute("""
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS images_data (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 file_name VARCHAR(255),
@@ -340,7 +1014,7 @@ class SQLStorage(Storage):
         """)
         
         # Create tables metadata table (using backticks around reserved words)
-        self.cursor.execute("""
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS tables_metadata (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 file_name VARCHAR(255),
@@ -354,7 +1028,7 @@ class SQLStorage(Storage):
         """)
         
         # Create tables content table
-        self.cursor.execute("""
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS tables_content (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 table_id INT,
@@ -365,7 +1039,15 @@ class SQLStorage(Storage):
             )
         """)
         
-        self.connection.commit()
+        # Create compressed table content table, used by the blob table mode
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tables_blobs (
+                table_id INT PRIMARY KEY,
+                encoding VARCHAR(20),
+                content LONGBLOB,
+                FOREIGN KEY (table_id) REFERENCES tables_metadata(id) ON DELETE CASCADE
+            )
+        """)
     
     def _clean_dict_for_sql(self, data, table_name):
         """Remove keys that don't exist in the table schema."""
@@ -391,131 +1073,259 @@ class SQLStorage(Storage):
         
         return {k: v for k, v in data.items() if k in allowed_keys}
     
-    def store_text(self):
-        """Store extracted text data to database."""
-        text_data = self.data_extractor.extract_text()
+    def open_writer(self, data_type):
+        """Return a writer that inserts records of data_type into the database."""
+        # Outside store_all every writer runs its own transaction
+        if not self.deferred_commit:
+            self.failed = False
+        return _SQLRecordWriter(self, data_type, self.TABLE_NAMES[data_type], self.batch_size,
+                                self._replaced_pages(data_type))
+    
+    def store_all(self):
+        """Store all extracted data types to the database in a single transaction.
         
-        if not text_data:
-            logger.info("No text data to store in database.")
-            return
+        The writers' deletes and inserts are committed once, after every
+        writer has closed without error. If any of them fails, nothing is
+        committed and every location is returned as None.
+        """
+        self.failed = False
+        self.deferred_commit = True
+        try:
+            locations = super().store_all()
+        except Exception:
+            self._rollback()
+            raise
+        finally:
+            self.deferred_commit = False
         
+        if not self.failed:
+            try:
+                self.connection.commit()
+                return locations
+            except _mysql().Error as e:
+                logger.error(f"Error committing {self.file_name} to database: {e}")
+                self._rollback()
+        
+        logger.error(f"Rolled back the database writes of {self.file_name}")
+        return {data_type: None for data_type in locations}
+    
+    def _rollback(self):
+        """Roll back the open transaction, logging any error."""
         try:
-            for item in text_data:
-                # Clean data
-                clean_item = self._clean_dict_for_sql(item, "text_data")
-                
-                # Generate dynamic SQL
-                fields = ", ".join(clean_item.keys())
-                placeholders = ", ".join(["%s"] * len(clean_item))
-                
-                query = f"INSERT INTO text_data ({fields}) VALUES ({placeholders})"
-                self.cursor.execute(query, list(clean_item.values()))
-            
-            self.connection.commit()
-            logger.info(f"Stored {len(text_data)} text items to database")
-        except Error as e:
-            logger.error(f"Error storing text data to database: {e}")
+            self.connection.rollback()
+        except _mysql().Error as e:
+            logger.error(f"Error rolling back database transaction: {e}")
     
-    def store_links(self):
-        """Store extracted hyperlink data to database."""
-        links_data = self.data_extractor.extract_links()
+    def _delete_pages(self, table_name, pages):
+        """Delete this file's rows of the selected pages from a table.
         
-        if not links_data:
-            logger.info("No link data to store in database.")
-            return
+        Deleting table metadata also deletes the table content, cells and
+        blobs alike, through the ON DELETE CASCADE foreign keys.
+        """
+        page_field = PAGE_FIELDS[self.file_type]
+        conditions = []
+        params = [self.file_name, self.file_type]
+        for start, end in pages.ranges:
+            if end is None:
+                conditions.append(f"{page_field} >= %s")
+                params.append(start)
+            else:
+                conditions.append(f"{page_field} BETWEEN %s AND %s")
+                params.extend([start, end])
         
-        try:
-            for item in links_data:
-                # Clean data
-                clean_item = self._clean_dict_for_sql(item, "links_data")
-                
-                # Generate dynamic SQL
-                fields = ", ".join(clean_item.keys())
-                placeholders = ", ".join(["%s"] * len(clean_item))
-                
-                query = f"INSERT INTO links_data ({fields}) VALUES ({placeholders})"
-                self.cursor.execute(query, list(clean_item.values()))
-            
-            self.connection.commit()
-            logger.info(f"Stored {len(links_data)} links to database")
-        except Error as e:
-            logger.error(f"Error storing links data to database: {e}")
+        query = (f"DELETE FROM {table_name} WHERE file_name = %s AND file_type = %s "
+                 f"AND ({' OR '.join(conditions)})")
+        self.cursor.execute(query, params)
+        logger.info(f"Deleted {self.cursor.rowcount} rows of pages {pages} from {table_name}")
     
-    def store_images(self):
-        """Store extracted image metadata to database."""
-        # Images are saved to disk during extraction, store metadata to database
-        images_dir = os.path.join("output", "images")
-        images_data = self.data_extractor.extract_images(images_dir)
+    def _insert_rows(self, table_name, columns, rows):
+        """Insert many rows sharing the same columns with a single executemany call."""
+        fields = ", ".join(columns)
+        placeholders = ", ".join(["%s"] * len(columns))
         
-        if not images_data:
-            logger.info("No image data to store in database.")
-            return
+        # mysql.connector rewrites this into one multi-row INSERT statement
+        query = f"INSERT INTO {table_name} ({fields}) VALUES ({placeholders})"
+        self.cursor.executemany(query, rows)
+    
+    def _insert_table_metadata(self, table):
+        """Insert a table's metadata row and return its id and the table content."""
+        # Store table metadata
+        table_meta = dict(table)
+        table_content = table_meta.pop("content", [])
         
-        try:
-            for item in images_data:
-                # Clean data
-                clean_item = self._clean_dict_for_sql(item, "images_data")
-                
-                # Generate dynamic SQL
-                fields = ", ".join(clean_item.keys())
-                placeholders = ", ".join(["%s"] * len(clean_item))
-                
-                query = f"INSERT INTO images_data ({fields}) VALUES ({placeholders})"
-                self.cursor.execute(query, list(clean_item.values()))
-            
-            self.connection.commit()
-            logger.info(f"Stored {len(images_data)} image metadata to database")
-        except Error as e:
-            logger.error(f"Error storing image data to database: {e}")
+        # Clean metadata
+        clean_meta = self._clean_dict_for_sql(table_meta, "tables_metadata")
+        
+        # Handle reserved words by renaming keys
+        if "rows" in clean_meta:
+            clean_meta["`rows`"] = clean_meta.pop("rows")
+        if "columns" in clean_meta:
+            clean_meta["`columns`"] = clean_meta.pop("columns")
+        
+        # Generate dynamic SQL for metadata
+        fields = ", ".join(clean_meta.keys())
+        placeholders = ", ".join(["%s"] * len(clean_meta))
+        
+        query = f"INSERT INTO tables_metadata ({fields}) VALUES ({placeholders})"
+        self.cursor.execute(query, list(clean_meta.values()))
+        
+        # Get the inserted table id
+        return self.cursor.lastrowid, table_content
     
-    def store_tables(self):
+    def store_text(self, text_data=None):
+        """Store extracted text data to database."""
+        if text_data is None:
+            text_data = self.data_extractor.iter_text()
+        return self._store_records("text", text_data)
+    
+    def store_links(self, links_data=None):
+        """Store extracted hyperlink data to database."""
+        if links_data is None:
+            links_data = self.data_extractor.iter_links()
+        return self._store_records("links", links_data)
+    
+    def store_images(self, images_data=None):
+        """Store extracted image metadata to database."""
+        # Images are saved to disk during extraction, store metadata to database
+        if images_data is None:
+            images_data = self.data_extractor.iter_images(self.images_dir)
+        return self._store_records("images", images_data)
+    
+    def store_tables(self, tables_data=None):
         """Store extracted table data to database."""
-        tables_data = self.data_extractor.extract_tables()
+        if tables_data is None:
+            tables_data = self.data_extractor.iter_tables()
+        return self._store_records("tables", tables_data)
+    
+    def load_table_content(self, table_id):
+        """Return the content of a stored table as a list of rows of cells.
         
-        if not tables_data:
-            logger.info("No table data to store in database.")
-            return
+        Tables stored in blob mode are decompressed from tables_blobs; tables
+        stored in cells mode are reassembled from their tables_content rows.
+        An unknown table_id returns an empty list.
+        """
+        self.cursor.execute("SELECT encoding, content FROM tables_blobs WHERE table_id = %s", (table_id,))
+        blob = self.cursor.fetchone()
+        if blob is not None:
+            return decode_table_content(blob[1], blob[0])
+        return self._load_table_cells(table_id)
+    
+    def _load_table_cells(self, table_id):
+        """Reassemble a table's content from its per-cell tables_content rows."""
+        self.cursor.execute(
+            "SELECT row_index, column_index, cell_content FROM tables_content "
+            "WHERE table_id = %s ORDER BY row_index, column_index",
+            (table_id,)
+        )
+        content = []
+        for row_index, _, cell in self.cursor.fetchall():
+            while len(content) <= row_index:
+                content.append([])
+            content[row_index].append(cell)
+        return content
+    
+    def load_tables(self, file_name=None, file_type=None):
+        """Return the stored tables of a file, by default this storage's file, with their content.
         
-        try:
-            for table in tables_data:
-                # Store table metadata
-                table_meta = table.copy()
-                table_content = table_meta.pop("content", [])
-                
-                # Clean metadata
-                clean_meta = self._clean_dict_for_sql(table_meta, "tables_metadata")
-                
-                # Handle reserved words by renaming keys
-                if "rows" in clean_meta:
-                    clean_meta["`rows`"] = clean_meta.pop("rows")
-                if "columns" in clean_meta:
-                    clean_meta["`columns`"] = clean_meta.pop("columns")
-                
-                # Generate dynamic SQL for metadata
-                fields = ", ".join(clean_meta.keys())
-                placeholders = ", ".join(["%s"] * len(clean_meta))
-                
-                query = f"INSERT INTO tables_metadata ({fields}) VALUES ({placeholders})"
-                self.cursor.execute(query, list(clean_meta.values()))
-                
-                # Get the inserted table id
-                table_id = self.cursor.lastrowid
-                
-                # Store table content
-                for row_idx, row in enumerate(table_content):
-                    for col_idx, cell in enumerate(row):
-                        self.cursor.execute("""
-                            INSERT INTO tables_content (table_id, row_index, column_index, cell_content)
-                            VALUES (%s, %s, %s, %s)
-                        """, (table_id, row_idx, col_idx, str(cell)))
-            
-            self.connection.commit()
-            logger.info(f"Stored {len(tables_data)} tables to database")
-        except Error as e:
-            logger.error(f"Error storing table data to database: {e}")
+        Each table is a dict of its id, the metadata fields that are set and
+        "content", rehydrated from whichever mode it was stored in.
+        """
+        self.cursor.execute(
+            "SELECT m.id, m.page_number, m.slide_number, m.table_index, m.`rows`, m.`columns`, "
+            "b.encoding, b.content FROM tables_metadata m LEFT JOIN tables_blobs b ON b.table_id = m.id "
+            "WHERE m.file_name = %s AND m.file_type = %s ORDER BY m.id",
+            (file_name or self.file_name, file_type or self.file_type)
+        )
+        tables = []
+        for table_id, page_number, slide_number, table_index, rows, columns, encoding, content in self.cursor.fetchall():
+            table = {"id": table_id}
+            for key, value in (("page_number", page_number), ("slide_number", slide_number),
+                               ("table_index", table_index), ("rows", rows), ("columns", columns)):
+                if value is not None:
+                    table[key] = value
+            table["content"] = decode_table_content(content, encoding) if content is not None else None
+            tables.append(table)
+        
+        # Tables stored in cells mode are reassembled once the listing has been read
+        for table in tables:
+            if table["content"] is None:
+                table["content"] = self._load_table_cells(table["id"])
+        return tables
+    
+    def close(self):
+        """Close the database connection, returning it to its pool if it has one."""
+        if getattr(self, 'connection', None):
+            self.cursor.close()
+            self.connection.close()
+            self.connection = None
+            logger.info("Database connection closed")
     
     def __del__(self):
         """Close database connection on object destruction."""
-        if hasattr(self, 'connection') and self.connection:
-            self.connection.close()
-            logger.info("Database connection closed")
\ No newline at end of file
+        self.close()
+
+
+class SQLConnectionPool:
+    """Pool of MySQL connections shared by SQLStorage instances.
+    
+    The database and tables are created once when the pool is built, so
+    storing a file only borrows an existing connection instead of opening
+    new ones and re-running the schema setup. All pool_size connections are
+    opened up front; a process stores one file at a time, so one connection
+    is enough unless threads share the pool.
+    """
+    
+    def __init__(self, host="localhost", user="root", password="", database="document_extractor",
+                 pool_size=1, pool_name="document_extractor"):
+        """Create the database and schema, then open the connection pool."""
+        self.database = database
+        
+        # Connect to MySQL server first (without database)
+        temp_connection = _mysql().connect(host=host, user=user, password=password)
+        temp_cursor = temp_connection.cursor()
+        temp_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+        temp_cursor.close()
+        temp_connection.close()
+        
+        self.pool = _mysql().pooling.MySQLConnectionPool(
+            pool_name=pool_name,
+            pool_size=pool_size,
+            host=host,
+            user=user,
+            password=password,
+            database=database
+        )
+        
+        # Create tables if they don't exist
+        connection = self.pool.get_connection()
+        try:
+            cursor = connection.cursor()
+            SQLStorage._create_tables(cursor)
+            connection.commit()
+            cursor.close()
+        finally:
+            connection.close()
+        
+        logger.info(f"Created MySQL connection pool for database {database}")
+    
+    def get_connection(self):
+        """Borrow a connection; closing it returns it to the pool."""
+        return self.pool.get_connection()
+
+
+# Pools created in this process, keyed by connection parameters
+_connection_pools = {}
+
+
+def get_connection_pool(host="localhost", user="root", password="", database="document_extractor", pool_size=1):
+    """Return the process-wide SQLConnectionPool for these parameters, creating it once."""
+    key = (host, user, password, database)
+    if key not in _connection_pools:
+        _connection_pools[key] = SQLConnectionPool(
+            host=host,
+            user=user,
+            password=password,
+            database=database,
+            pool_size=pool_size
+        )
+    return _connection_pools[key]
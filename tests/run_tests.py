@@ -4,7 +4,16 @@ import unittest
 # Import all test modules
 from tests.test_file_loader import TestFileLoader
 from tests.test_data_extractor import TestDataExtractor
-from tests.test_storage import TestFileStorage, TestSQLStorage
+from tests.test_storage import TestFileStorage, TestParquetStorage, TestSQLStorage
+from tests.test_main import TestProcessFiles
+from tests.test_extraction_cache import TestExtractionCache
+from tests.test_image_probe import TestImageProbe
+from tests.test_image_writer import TestImageWriter
+from tests.test_records import TestRecords
+from tests.test_benchmarks import TestBenchmarks
+from tests.test_metrics import TestMetrics
+from tests.test_discovery import TestDiscovery
+from tests.test_job_journal import TestJobJournal
 
 if __name__ == '__main__':
     # Create test suite
@@ -14,7 +23,17 @@ if __name__ == '__main__':
     test_suite.addTest(unittest.makeSuite(TestFileLoader))
     test_suite.addTest(unittest.makeSuite(TestDataExtractor))
     test_suite.addTest(unittest.makeSuite(TestFileStorage))
+    test_suite.addTest(unittest.makeSuite(TestParquetStorage))
     test_suite.addTest(unittest.makeSuite(TestSQLStorage))
+    test_suite.addTest(unittest.makeSuite(TestProcessFiles))
+    test_suite.addTest(unittest.makeSuite(TestExtractionCache))
+    test_suite.addTest(unittest.makeSuite(TestImageProbe))
+    test_suite.addTest(unittest.makeSuite(TestImageWriter))
+    test_suite.addTest(unittest.makeSuite(TestRecords))
+    test_suite.addTest(unittest.makeSuite(TestBenchmarks))
+    test_suite.addTest(unittest.makeSuite(TestMetrics))
+    test_suite.addTest(unittest.makeSuite(TestDiscovery))
+    test_suite.addTest(unittest.makeSuite(TestJobJournal))
     
     # Run the tests
     runner = unittest.TextTestRunner(verbosity=2)
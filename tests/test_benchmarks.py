@@ -0,0 +1,59 @@
+import unittest
+import os
+import tempfile
+
+# Import the modules to test
+from benchmarks.generate import generate_documents
+from benchmarks.run import compare_results
+from data_extractor import DataExtractor
+from main import create_file_loader
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Simple unit tests for the benchmark suite"""
+    
+    def setUp(self):
+        """Set up a temporary directory for generated documents"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Clean up the temporary directory"""
+        self.temp_dir.cleanup()
+    
+    def test_generated_documents_have_requested_content(self):
+        """Test that every generated document holds the requested links, images and tables"""
+        documents = generate_documents(self.temp_dir.name, pages=2, images=1, tables=1, links=2)
+        images_dir = os.path.join(self.temp_dir.name, "images")
+        os.makedirs(images_dir)
+        
+        for file_type, file_path in documents.items():
+            with self.subTest(file_type=file_type):
+                with DataExtractor(create_file_loader(file_path)) as data_extractor:
+                    results = data_extractor.extract_all(images_dir)
+                
+                self.assertTrue(results["text"])
+                self.assertEqual(len(results["links"]), 4)
+                self.assertEqual(len(results["images"]), 2)
+                self.assertEqual(len(results["tables"]), 2)
+    
+    def test_compare_results_flags_regressions(self):
+        """Test that stages slower than the threshold are marked as regressed"""
+        baseline = {"results": [
+            {"file_type": "pdf", "stage": "extract_text", "seconds": 1.0},
+            {"file_type": "pdf", "stage": "extract_tables", "seconds": 2.0}
+        ]}
+        current = {"results": [
+            {"file_type": "pdf", "stage": "extract_text", "seconds": 1.1},
+            {"file_type": "pdf", "stage": "extract_tables", "seconds": 3.0},
+            {"file_type": "docx", "stage": "extract_text", "seconds": 0.5}
+        ]}
+        
+        rows = compare_results(baseline, current, threshold=1.25)
+        
+        self.assertEqual([(row["stage"], row["regressed"]) for row in rows],
+                         [("extract_text", False), ("extract_tables", True)])
+        self.assertEqual(rows[1]["ratio"], 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
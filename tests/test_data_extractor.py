@@ -2,9 +2,14 @@ import unittest
 import os
 import tempfile
 from unittest.mock import patch, MagicMock
+from concurrent.futures import ThreadPoolExecutor
+import docx
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.shared import OxmlElement, qn
 
 # Import the module to test
-from data_extractor import DataExtractor
+from data_extractor import DataExtractor, PageRanges
+from metrics import MetricsRecorder
 
 
 class TestDataExtractor(unittest.TestCase):
@@ -114,6 +119,36 @@ class TestDataExtractor(unittest.TestCase):
         self.assertEqual(result[0]["font"], "Arial")
         self.assertEqual(result[0]["file_type"], "pdf")
     
+    def test_extract_text_pdf_granularity(self):
+        """Test that adjacent PDF spans with the same style are merged"""
+        regular = {"font": "Arial", "size": 12, "color": 0}
+        bold = {"font": "Arial-Bold", "size": 12, "color": 0}
+        mock_page = MagicMock()
+        mock_page.get_text.return_value = {
+            "blocks": [
+                {"lines": [
+                    {"spans": [dict(regular, text="Hello "), dict(regular, text="world")]},
+                    {"spans": [dict(regular, text="again"), dict(bold, text=" bold")]}
+                ]},
+                {"lines": [{"spans": [dict(bold, text="Next block")]}]}
+            ]
+        }
+        self.mock_fitz_doc.__iter__.return_value = [mock_page]
+        
+        expected = {
+            "span": ["Hello ", "world", "again", " bold", "Next block"],
+            "line": ["Hello world", "again", " bold", "Next block"],
+            "block": ["Hello world\nagain", " bold", "Next block"],
+            "page": ["Hello world\nagain", " bold\nNext block"]
+        }
+        for granularity, texts in expected.items():
+            with self.subTest(granularity=granularity):
+                extractor = DataExtractor(self.mock_pdf_loader, text_granularity=granularity)
+                self.assertEqual([record["text"] for record in extractor.extract_text()], texts)
+        
+        with self.assertRaises(ValueError):
+            DataExtractor(self.mock_pdf_loader, text_granularity="word")
+    
     def test_extract_text_docx(self):
         """Test DOCX text extraction"""
         # Setup mock paragraph and run
@@ -165,6 +200,187 @@ class TestDataExtractor(unittest.TestCase):
         self.assertEqual(result[0]["slide_number"], 1)
         self.assertEqual(result[0]["file_type"], "pptx")
     
+    def test_extract_links_docx(self):
+        """Test extracting hyperlinks from a DOCX paragraph's XML"""
+        document = docx.Document()
+        paragraph = document.add_paragraph("See ")
+        rel_id = paragraph.part.relate_to("https://example.com", RT.HYPERLINK, is_external=True)
+        hyperlink = OxmlElement("w:hyperlink")
+        hyperlink.set(qn("r:id"), rel_id)
+        for text in ["example ", "site"]:
+            run = OxmlElement("w:r")
+            text_element = OxmlElement("w:t")
+            text_element.text = text
+            run.append(text_element)
+            hyperlink.append(run)
+        paragraph._p.append(hyperlink)
+        self.mock_docx_loader.load_file.return_value = {"doc": document, "file_name": "test.docx"}
+        
+        extractor = DataExtractor(self.mock_docx_loader)
+        result = extractor.extract_links()
+        
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["url"], "https://example.com")
+        self.assertEqual(result[0]["linked_text"], "example  site")
+        self.assertEqual(result[0]["paragraph_index"], 1)
+    
+    def test_page_ranges(self):
+        """Test parsing page range specs"""
+        pages = PageRanges("7, 1-3,10-")
+        
+        self.assertEqual(str(pages), "1-3,7,10-")
+        self.assertEqual([number for number in range(1, 13) if number in pages], [1, 2, 3, 7, 10, 11, 12])
+        self.assertEqual(pages.indices(8), [0, 1, 2, 6])
+        for spec in ["", "0", "3-1", "a-b"]:
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    PageRanges(spec)
+    
+    def test_extract_selected_pages(self):
+        """Test that only the selected PDF pages are extracted"""
+        pdf_pages = []
+        for page_idx in range(4):
+            page = MagicMock()
+            page.get_text.return_value = {"blocks": [{"lines": [{"spans": [{"text": f"Page {page_idx + 1}"}]}]}]}
+            pdf_pages.append(page)
+        self.mock_pdf_loader.load_file.return_value = {"fitz_doc": pdf_pages, "file_name": "test.pdf"}
+        
+        extractor = DataExtractor(self.mock_pdf_loader, pages="2,4")
+        result = extractor.extract_text()
+        
+        self.assertEqual([(record["page_number"], record["text"]) for record in result], [(2, "Page 2"), (4, "Page 4")])
+        pdf_pages[0].get_text.assert_not_called()
+    
+    @patch('data_extractor._extract_pdf_shard')
+    @patch('data_extractor.ProcessPoolExecutor', ThreadPoolExecutor)
+    def test_iter_pages_sharded(self, mock_extract_shard):
+        """Test that PDF pages are split into shards and merged in page order"""
+        mock_extract_shard.side_effect = lambda file_path, file_name, page_spec, output_dir, options, collect_metrics: {
+            "pages": [{"text": [page_spec]}],
+            "table_prefilter_stats": {"pages": 8, "skipped": 5},
+            "metrics": None
+        }
+        self.mock_pdf_loader.load_file.return_value = {"fitz_doc": [MagicMock()] * 20, "file_name": "test.pdf"}
+        
+        extractor = DataExtractor(self.mock_pdf_loader, page_workers=2, table_prefilter=False)
+        pages = list(extractor.iter_pages(self.output_dir))
+        
+        self.assertEqual(
+            [page["text"][0] for page in pages],
+            [",".join(str(number) for number in range(start, end)) for start, end in [(1, 9), (9, 17), (17, 21)]]
+        )
+        self.assertEqual(mock_extract_shard.call_args.args[1], "test.pdf")
+        self.assertEqual(mock_extract_shard.call_args.args[4]["text_granularity"], "span")
+        self.assertFalse(mock_extract_shard.call_args.args[4]["table_prefilter"])
+        self.assertEqual(extractor.table_prefilter_stats, {"pages": 24, "skipped": 15})
+    
+    @patch('data_extractor._extract_pdf_shard')
+    @patch('data_extractor.ProcessPoolExecutor', ThreadPoolExecutor)
+    def test_iter_pages_sharded_bounds_shards_in_flight(self, mock_extract_shard):
+        """Test that only page_workers shards run ahead of the consumer and worker metrics are merged"""
+        worker_metrics = MetricsRecorder("test.pdf")
+        with worker_metrics.stage("extract_pages") as counts:
+            counts["records"] = 1
+        mock_extract_shard.side_effect = lambda file_path, file_name, page_spec, output_dir, options, collect_metrics: {
+            "pages": [{"text": [page_spec]}],
+            "table_prefilter_stats": {"pages": 0, "skipped": 0},
+            "metrics": worker_metrics.stages if collect_metrics else None
+        }
+        self.mock_pdf_loader.load_file.return_value = {"fitz_doc": [MagicMock()] * 1000, "file_name": "test.pdf"}
+        metrics = MetricsRecorder("test.pdf")
+        
+        extractor = DataExtractor(self.mock_pdf_loader, page_workers=2, metrics=metrics)
+        pages = extractor.iter_pages(self.output_dir)
+        self.assertEqual(next(pages)["text"][0], ",".join(str(number) for number in range(1, 65)))
+        
+        # Two shards were started up front and a third once the first was done
+        self.assertEqual(mock_extract_shard.call_count, 3)
+        self.assertEqual(len(list(pages)), 15)
+        self.assertEqual(metrics.stages["shard_extract_pages"]["calls"], 16)
+    
+    def test_table_prefilter_skips_pages_without_ruling_lines(self):
+        """Test that pdfplumber only looks for tables on pages with ruling lines"""
+        ruled_page = MagicMock()
+        ruled_page.get_drawings.return_value = [{"items": [("re", MagicMock(), 1)]}]
+        plain_page = MagicMock()
+        plain_page.get_drawings.return_value = []
+        self.mock_fitz_doc.__getitem__.side_effect = [ruled_page, plain_page].__getitem__
+        
+        plumber_pages = [MagicMock(), MagicMock()]
+        plumber_pages[0].extract_tables.return_value = [[["A", "B"], ["1", "2"]]]
+        self.mock_plumber_doc.pages = plumber_pages
+        
+        extractor = DataExtractor(self.mock_pdf_loader)
+        result = extractor.extract_tables()
+        
+        self.assertEqual([table["page_number"] for table in result], [1])
+        plumber_pages[1].extract_tables.assert_not_called()
+        self.assertEqual(extractor.table_prefilter_stats, {"pages": 2, "skipped": 1})
+    
+    def test_context_manager_releases_pages_and_closes_loader(self):
+        """Test that table pages are released and the loader closed on exit"""
+        mock_page = MagicMock()
+        mock_page.extract_tables.return_value = []
+        self.mock_plumber_doc.pages = [mock_page]
+        
+        with DataExtractor(self.mock_pdf_loader, table_prefilter=False) as extractor:
+            extractor.extract_tables()
+            mock_page.close.assert_called_once()
+            self.mock_pdf_loader.close.assert_not_called()
+        
+        self.mock_pdf_loader.close.assert_called_once()
+    
+    def test_skip_tables(self):
+        """Test that skipping tables never touches the table parser"""
+        file_data = MagicMock()
+        self.mock_pdf_loader.load_file.return_value = file_data
+        file_data.get.side_effect = lambda key, default=None: "test.pdf" if key == "file_name" else default
+        
+        extractor = DataExtractor(self.mock_pdf_loader, skip_tables=True)
+        
+        self.assertEqual(extractor.extract_tables(), [])
+        requested_keys = [call.args[0] for call in file_data.get.call_args_list]
+        self.assertNotIn("plumber_doc", requested_keys)
+    
+    def test_extract_all_pptx_single_pass(self):
+        """Test that extract_all walks each slide's shapes once for all record types"""
+        mock_shape = MagicMock(spec=["text", "name"])
+        mock_shape.text = "Sample PPTX text"
+        mock_shape.name = "Title 1"
+        
+        mock_shapes = MagicMock()
+        mock_shapes.__iter__.return_value = [mock_shape]
+        mock_slide = MagicMock()
+        mock_slide.shapes = mock_shapes
+        self.mock_presentation.slides = [mock_slide]
+        
+        extractor = DataExtractor(self.mock_pptx_loader)
+        result = extractor.extract_all(self.output_dir)
+        
+        self.assertEqual(set(result), {"text", "links", "images", "tables"})
+        self.assertEqual(len(result["text"]), 1)
+        self.assertEqual(result["text"][0]["slide_number"], 1)
+        self.assertEqual(result["links"], [])
+        self.assertEqual(result["images"], [])
+        self.assertEqual(result["tables"], [])
+        self.assertEqual(mock_shapes.__iter__.call_count, 1)
+    
+    def test_iter_text_is_lazy(self):
+        """Test that iter_text yields records page by page"""
+        first_page = MagicMock()
+        first_page.get_text.return_value = {"blocks": [{"lines": [{"spans": [{"text": "First"}]}]}]}
+        second_page = MagicMock()
+        second_page.get_text.return_value = {"blocks": [{"lines": [{"spans": [{"text": "Second"}]}]}]}
+        self.mock_fitz_doc.__iter__.return_value = [first_page, second_page]
+        
+        extractor = DataExtractor(self.mock_pdf_loader)
+        records = extractor.iter_text()
+        
+        # The second page is not parsed until its records are requested
+        self.assertEqual(next(records)["text"], "First")
+        second_page.get_text.assert_not_called()
+        self.assertEqual([record["text"] for record in records], ["Second"])
+    
     @patch('PIL.Image.open')
     def test_extract_images(self, mock_image_open):
         """Test image extraction functionality"""
@@ -197,7 +413,104 @@ class TestDataExtractor(unittest.TestCase):
         self.assertEqual(result[0]["height"], 50)
         self.assertEqual(result[0]["format"], "png")
         self.assertEqual(result[0]["file_type"], "pdf")
+    
+    @patch('PIL.Image.open')
+    def test_extract_images_deduplicates_xrefs(self, mock_image_open):
+        """Test that an image shown on several pages is extracted and saved once"""
+        mock_img = MagicMock()
+        mock_img.size = (100, 50)
+        mock_image_open.return_value = mock_img
+        
+        # The same image object (xref 5) appears on both pages
+        first_page = MagicMock()
+        first_page.get_images.return_value = [(5, 0, 0, 0, 0, 0, 0)]
+        second_page = MagicMock()
+        second_page.get_images.return_value = [(5, 0, 0, 0, 0, 0, 0)]
+        self.mock_fitz_doc.__iter__.return_value = [first_page, second_page]
+        self.mock_fitz_doc.extract_image.return_value = {
+            "image": b"fake_image_data",
+            "ext": "png"
+        }
+        
+        extractor = DataExtractor(self.mock_pdf_loader)
+        
+        with patch('builtins.open', unittest.mock.mock_open()) as mock_file:
+            result = extractor.extract_images(self.output_dir)
+        
+        self.assertEqual(len(result), 2)
+        self.assertEqual([image["page_number"] for image in result], [1, 2])
+        self.assertEqual(result[0]["file_path"], result[1]["file_path"])
+        self.mock_fitz_doc.extract_image.assert_called_once_with(5)
+        mock_file.assert_called_once()
+    
+    @patch('PIL.Image.open')
+    def test_extract_images_uses_backend_dimensions(self, mock_image_open):
+        """Test that PDF image dimensions come from PyMuPDF without decoding"""
+        mock_page = MagicMock()
+        mock_page.get_images.return_value = [(1, 0, 0, 0, 0, 0, 0)]
+        self.mock_fitz_doc.__iter__.return_value = [mock_page]
+        self.mock_fitz_doc.extract_image.return_value = {
+            "image": b"fake_image_data",
+            "ext": "png",
+            "width": 640,
+            "height": 480
+        }
+        
+        extractor = DataExtractor(self.mock_pdf_loader)
+        
+        with patch('builtins.open', unittest.mock.mock_open()):
+            result = extractor.extract_images(self.output_dir)
+        
+        self.assertEqual((result[0]["width"], result[0]["height"]), (640, 480))
+        mock_image_open.assert_not_called()
+    
+    def test_extract_images_background_writer(self):
+        """Test that images are written in the background before records are released"""
+        first_page = MagicMock()
+        first_page.get_images.return_value = [(1, 0, 0, 0, 0, 0, 0)]
+        second_page = MagicMock()
+        second_page.get_images.return_value = [(2, 0, 0, 0, 0, 0, 0)]
+        self.mock_fitz_doc.__iter__.return_value = [first_page, second_page]
+        self.mock_fitz_doc.extract_image.return_value = {
+            "image": b"fake_image_data",
+            "ext": "png",
+            "width": 10,
+            "height": 10
+        }
+        
+        extractor = DataExtractor(self.mock_pdf_loader, image_writer_workers=2)
+        try:
+            result = extractor.extract_images(self.output_dir)
+        finally:
+            extractor.close()
+        
+        self.assertEqual([image["page_number"] for image in result], [1, 2])
+        for image in result:
+            with open(image["file_path"], "rb") as image_file:
+                self.assertEqual(image_file.read(), b"fake_image_data")
+    
+    def test_failed_background_write_clears_file_path(self):
+        """Test that an image whose file cannot be written has no file path"""
+        mock_page = MagicMock()
+        mock_page.get_images.return_value = [(1, 0, 0, 0, 0, 0, 0)]
+        self.mock_fitz_doc.__iter__.return_value = [mock_page]
+        self.mock_fitz_doc.extract_image.return_value = {
+            "image": b"fake_image_data",
+            "ext": "png",
+            "width": 10,
+            "height": 10
+        }
+        
+        extractor = DataExtractor(self.mock_pdf_loader, image_writer_workers=1)
+        try:
+            # Writing into a directory that does not exist fails
+            with patch('os.makedirs'):
+                result = extractor.extract_images(os.path.join(self.output_dir, "missing"))
+        finally:
+            extractor.close()
+        
+        self.assertIsNone(result[0]["file_path"])
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+
+# Import the modules to test
+import main
+from discovery import discover_files, iter_directory, iter_glob, iter_manifest, largest_first
+
+
+class TestDiscovery(unittest.TestCase):
+    """Simple unit tests for input file discovery"""
+    
+    def setUp(self):
+        """Create a small directory tree of input files"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        os.makedirs(os.path.join(self.root, "nested"))
+        self.files = {
+            "small.pdf": 10,
+            "notes.txt": 10,
+            os.path.join("nested", "large.docx"): 300,
+            os.path.join("nested", "medium.pptx"): 100
+        }
+        for name, size in self.files.items():
+            with open(os.path.join(self.root, name), "wb") as file:
+                file.write(b"x" * size)
+    
+    def tearDown(self):
+        """Clean up the directory tree"""
+        self.temp_dir.cleanup()
+    
+    def path(self, name):
+        """Return the absolute path of a test file"""
+        return os.path.join(self.root, name)
+    
+    def test_iter_directory_finds_supported_files(self):
+        """Test that directory scans skip unsupported files and honour recursion"""
+        self.assertEqual(list(iter_directory(self.root)), [
+            self.path("small.pdf"),
+            self.path(os.path.join("nested", "large.docx")),
+            self.path(os.path.join("nested", "medium.pptx"))
+        ])
+        self.assertEqual(list(iter_directory(self.root, recursive=False)), [self.path("small.pdf")])
+    
+    def test_iter_glob_matches_nested_files(self):
+        """Test that ** patterns match files in subdirectories"""
+        self.assertEqual(sorted(iter_glob(os.path.join(self.root, "**", "*.pptx"))),
+                         [self.path(os.path.join("nested", "medium.pptx"))])
+    
+    def test_iter_manifest_skips_blank_and_comment_lines(self):
+        """Test that manifests yield one path per non-empty line"""
+        manifest = self.path("manifest.lst")
+        with open(manifest, "w", encoding="utf-8") as manifest_file:
+            manifest_file.write("a.pdf\n\n# skipped\n  b.docx  \n")
+        
+        self.assertEqual(list(iter_manifest(manifest)), ["a.pdf", "b.docx"])
+    
+    def test_largest_first_orders_within_window(self):
+        """Test that files are handed out largest first, looking at most window files ahead"""
+        paths = [self.path("small.pdf"), self.path(os.path.join("nested", "medium.pptx")),
+                 self.path(os.path.join("nested", "large.docx"))]
+        
+        self.assertEqual(list(largest_first(paths)), [paths[2], paths[1], paths[0]])
+        self.assertEqual(list(largest_first(paths, window=1)), [paths[1], paths[2], paths[0]])
+        self.assertEqual(list(largest_first(paths, window=0)), paths)
+    
+    @patch('main.process_file')
+    def test_process_files_consumes_discovery_lazily(self, mock_process_file):
+        """Test that discovered files are processed as they are found"""
+        consumed = []
+        
+        def discovered():
+            for path in discover_files(["a.pdf", "b.pdf", "a.pdf"]):
+                consumed.append(path)
+                yield path
+        
+        def process(file_path, **options):
+            # Only the file being processed has been read from discovery
+            self.assertEqual(consumed[-1], file_path)
+            return True
+        
+        mock_process_file.side_effect = process
+        results = main.process_files(discovered(), workers=1)
+        
+        self.assertEqual(results, {"a.pdf": True, "b.pdf": True})
+        self.assertEqual(mock_process_file.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
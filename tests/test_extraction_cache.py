@@ -0,0 +1,93 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Import the module to test
+from extraction_cache import ExtractionCache, _directory_size
+
+
+class TestExtractionCache(unittest.TestCase):
+    """Simple unit tests for the extraction result cache"""
+    
+    def setUp(self):
+        """Set up a cache directory, a sample file and a mock extractor"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ExtractionCache(os.path.join(self.temp_dir.name, "cache"))
+        self.images_dir = os.path.join(self.temp_dir.name, "images")
+        os.makedirs(self.images_dir)
+        
+        self.file_path = os.path.join(self.temp_dir.name, "test.pdf")
+        with open(self.file_path, "wb") as file:
+            file.write(b"%PDF-1.4 sample")
+        
+        image_path = os.path.join(self.images_dir, "pdf_test_1_1.png")
+        with open(image_path, "wb") as image_file:
+            image_file.write(b"image bytes")
+        
+        self.pages = [
+            {
+                "text": [{"page_number": 1, "text": "Sample text", "file_type": "pdf", "file_name": "test.pdf"}],
+                "images": [{"page_number": 1, "file_path": image_path, "file_type": "pdf", "file_name": "test.pdf"}]
+            }
+        ]
+        self.mock_extractor = MagicMock()
+        self.mock_extractor.iter_pages.return_value = iter(self.pages)
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        self.temp_dir.cleanup()
+    
+    def test_key_depends_on_content_and_options(self):
+        """Test that cache keys change with file content and options"""
+        key = self.cache.make_key(self.file_path, {"skip_tables": False})
+        
+        self.assertEqual(key, self.cache.make_key(self.file_path, {"skip_tables": False}))
+        self.assertNotEqual(key, self.cache.make_key(self.file_path, {"skip_tables": True}))
+        
+        with open(self.file_path, "ab") as file:
+            file.write(b" changed")
+        self.assertNotEqual(key, self.cache.make_key(self.file_path, {"skip_tables": False}))
+    
+    def test_record_and_replay(self):
+        """Test that a recorded extraction pass is replayed on the next lookup"""
+        key = self.cache.make_key(self.file_path)
+        self.assertIsNone(self.cache.get(key, "test.pdf"))
+        
+        recorded = list(self.cache.record(key, self.mock_extractor).iter_pages(self.images_dir))
+        self.assertEqual(recorded, self.pages)
+        
+        # Images are restored into a different output directory on replay
+        cached = self.cache.get(key, "test.pdf")
+        new_images_dir = os.path.join(self.temp_dir.name, "other_images")
+        result = cached.extract_all(new_images_dir)
+        
+        self.assertEqual(cached.file_type, "pdf")
+        self.assertEqual(result["text"], self.pages[0]["text"])
+        self.assertEqual(result["images"][0]["file_path"], os.path.join(new_images_dir, "pdf_test_1_1.png"))
+        self.assertTrue(os.path.exists(result["images"][0]["file_path"]))
+    
+    def test_eviction(self):
+        """Test that entries are evicted once the cache exceeds its size limit"""
+        self.cache.max_bytes = 1
+        key = self.cache.make_key(self.file_path)
+        
+        list(self.cache.record(key, self.mock_extractor).iter_pages(self.images_dir))
+        
+        self.assertIsNone(self.cache.get(key, "test.pdf"))
+    
+    @patch('extraction_cache._directory_size', wraps=_directory_size)
+    def test_commit_keeps_running_size(self, mock_directory_size):
+        """Test that committing entries updates the recorded size without walking the cache"""
+        for index in range(3):
+            self.mock_extractor.iter_pages.return_value = iter(self.pages)
+            list(self.cache.record(f"key{index}", self.mock_extractor).iter_pages(self.images_dir))
+        
+        # The first commit walks the cache to learn its size, later ones only measure their entry
+        entry_size = _directory_size(os.path.join(self.cache.cache_dir, "key0"))
+        self.assertEqual(self.cache._read_total_size(), 3 * entry_size)
+        self.assertEqual(mock_directory_size.call_count, 3 + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -62,14 +62,34 @@ class TestFileLoader(unittest.TestCase):
         loader = PDFLoader(self.pdf_path)
         result = loader.load_file()
         
-        # Check that the PDF libraries were called
-        mock_fitz_open.assert_called_once_with(self.pdf_path)
-        mock_plumber_open.assert_called_once_with(self.pdf_path)
+        # Check that neither PDF library is opened until it is needed
+        mock_fitz_open.assert_not_called()
+        mock_plumber_open.assert_not_called()
         
         # Check returned data structure
         self.assertEqual(result["fitz_doc"], mock_fitz_doc)
-        self.assertEqual(result["plumber_doc"], mock_plumber_doc)
         self.assertEqual(result["file_name"], "test.pdf")
+        mock_fitz_open.assert_called_once_with(self.pdf_path)
+        mock_plumber_open.assert_not_called()
+        
+        self.assertEqual(result.get("plumber_doc"), mock_plumber_doc)
+        self.assertEqual(result["plumber_doc"], mock_plumber_doc)
+        mock_plumber_open.assert_called_once_with(self.pdf_path)
+    
+    @patch('fitz.open')
+    @patch('pdfplumber.open')
+    def test_pdf_loader_closes_opened_documents(self, mock_plumber_open, mock_fitz_open):
+        """Test that leaving the loader context closes only the documents it opened"""
+        with PDFLoader(self.pdf_path) as loader:
+            result = loader.load_file()
+            fitz_doc = result["fitz_doc"]
+        
+        fitz_doc.close.assert_called_once()
+        mock_plumber_open.assert_not_called()
+        
+        # Closing again does nothing
+        loader.close()
+        fitz_doc.close.assert_called_once()
     
     def test_docx_loader(self):
         """Test DOCXLoader functionality"""
@@ -0,0 +1,35 @@
+import unittest
+import io
+from PIL import Image
+
+# Import the module to test
+from image_probe import probe_image_size
+
+
+class TestImageProbe(unittest.TestCase):
+    """Simple unit tests for header-only image size probing"""
+    
+    def _encode(self, image_format, **options):
+        """Encode a blank 321x123 image in the given format"""
+        buffer = io.BytesIO()
+        Image.new("RGB", (321, 123)).save(buffer, image_format, **options)
+        return buffer.getvalue()
+    
+    def test_common_formats(self):
+        """Test that dimensions are read from the headers of common formats"""
+        for image_format in ["PNG", "GIF", "BMP", "JPEG", "TIFF", "WEBP"]:
+            with self.subTest(image_format=image_format):
+                self.assertEqual(probe_image_size(self._encode(image_format)), (321, 123))
+    
+    def test_progressive_jpeg(self):
+        """Test that progressive JPEG frames are recognized"""
+        self.assertEqual(probe_image_size(self._encode("JPEG", progressive=True)), (321, 123))
+    
+    def test_unknown_or_truncated_data(self):
+        """Test that unknown or truncated data returns None"""
+        self.assertIsNone(probe_image_size(b"fake_image_data"))
+        self.assertIsNone(probe_image_size(self._encode("PNG")[:12]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+import tempfile
+import threading
+
+# Import the module to test
+from image_writer import ImageWriter
+
+
+class TestImageWriter(unittest.TestCase):
+    """Simple unit tests for the background image writer"""
+    
+    def setUp(self):
+        """Set up a temporary output directory"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Clean up the temporary output directory"""
+        self.temp_dir.cleanup()
+    
+    def test_submit_writes_file(self):
+        """Test that submitted images are written and the future reports the size"""
+        writer = ImageWriter(max_workers=2)
+        path = os.path.join(self.temp_dir.name, "image.png")
+        
+        future = writer.submit(path, b"fake_image_data")
+        writer.close()
+        
+        self.assertEqual(future.result(), len(b"fake_image_data"))
+        with open(path, "rb") as image_file:
+            self.assertEqual(image_file.read(), b"fake_image_data")
+    
+    def test_failed_write_is_reported(self):
+        """Test that a failed write raises from the future"""
+        writer = ImageWriter(max_workers=1)
+        path = os.path.join(self.temp_dir.name, "missing", "image.png")
+        
+        future = writer.submit(path, b"fake_image_data")
+        writer.close()
+        
+        with self.assertRaises(OSError):
+            future.result()
+    
+    def test_submit_blocks_when_queue_is_full(self):
+        """Test that submit waits once max_pending writes are outstanding"""
+        writer = ImageWriter(max_workers=1, max_pending=1)
+        
+        # Hold the single writer slot until released
+        writer._slots.acquire()
+        submitted = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (writer.submit(os.path.join(self.temp_dir.name, "image.png"), b"data"), submitted.set())
+        )
+        thread.start()
+        
+        self.assertFalse(submitted.wait(0.2))
+        writer._slots.release()
+        self.assertTrue(submitted.wait(5))
+        
+        thread.join()
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+# Import the modules to test
+import main
+from job_journal import JobJournal, options_fingerprint
+from extraction_cache import content_hash
+
+
+class TestJobJournal(unittest.TestCase):
+    """Simple unit tests for the job journal"""
+    
+    def setUp(self):
+        """Set up a temporary journal and input file"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.temp_dir.name, "journal.db")
+        self.file_path = os.path.join(self.temp_dir.name, "test.pdf")
+        with open(self.file_path, "wb") as file:
+            file.write(b"fake_pdf_data")
+    
+    def tearDown(self):
+        """Clean up the temporary directory"""
+        self.temp_dir.cleanup()
+    
+    def test_finished_file_is_complete_until_changed(self):
+        """Test that a done file is complete, also after a touch, but not once its content changes"""
+        with JobJournal(self.journal_path) as journal:
+            journal.start(self.file_path)
+            self.assertFalse(journal.is_complete(self.file_path))
+            
+            journal.finish(self.file_path, True, outputs={"text": self.file_path})
+            self.assertTrue(journal.is_complete(self.file_path))
+            self.assertEqual(journal.entry(self.file_path)["outputs"], {"text": self.file_path})
+            
+            # Same content with a new modification time is still complete
+            stat = os.stat(self.file_path)
+            os.utime(self.file_path, (stat.st_atime, stat.st_mtime + 10))
+            self.assertTrue(journal.is_complete(self.file_path))
+            
+            with open(self.file_path, "wb") as file:
+                file.write(b"other_pdf_data")
+            self.assertFalse(journal.is_complete(self.file_path))
+    
+    def test_other_options_or_missing_outputs_are_pending(self):
+        """Test that a done file is not complete for other options or once its outputs are gone"""
+        output_path = os.path.join(self.temp_dir.name, "text.csv")
+        with open(output_path, "w") as file:
+            file.write("text\n")
+        fingerprint = options_fingerprint({"output_dir": "out1"})
+        
+        with JobJournal(self.journal_path) as journal:
+            journal.finish(self.file_path, True, outputs={"text": output_path, "tables": [output_path]},
+                           fingerprint=fingerprint)
+            self.assertTrue(journal.is_complete(self.file_path, fingerprint))
+            self.assertFalse(journal.is_complete(self.file_path, options_fingerprint({"output_dir": "out2"})))
+            
+            os.remove(output_path)
+            self.assertFalse(journal.is_complete(self.file_path, fingerprint))
+    
+    def test_sql_outputs_are_not_checked_as_files(self):
+        """Test that output locations without a directory, such as SQL table names, are not looked up on disk"""
+        with JobJournal(self.journal_path) as journal:
+            journal.finish(self.file_path, True, outputs={"text": "text_data", "links": None})
+            self.assertTrue(journal.is_complete(self.file_path))
+    
+    def test_journal_without_fingerprints_is_upgraded(self):
+        """Test that a journal written before fingerprints were recorded gains the column"""
+        connection = sqlite3.connect(self.journal_path)
+        with connection:
+            connection.execute(
+                "CREATE TABLE jobs (file_path TEXT PRIMARY KEY, status TEXT NOT NULL, size INTEGER, mtime REAL, "
+                "content_hash TEXT, outputs TEXT, error TEXT, updated_at REAL NOT NULL)"
+            )
+            connection.execute("INSERT INTO jobs (file_path, status, updated_at) VALUES (?, 'done', 0)",
+                               (os.path.abspath(self.file_path),))
+        connection.close()
+        
+        with JobJournal(self.journal_path) as journal:
+            self.assertIsNone(journal.entry(self.file_path)["fingerprint"])
+            self.assertFalse(journal.is_complete(self.file_path, options_fingerprint({})))
+    
+    def test_failed_file_is_pending(self):
+        """Test that failed and unknown files are yielded for processing again"""
+        other_path = os.path.join(self.temp_dir.name, "other.pdf")
+        with JobJournal(self.journal_path) as journal:
+            journal.finish(self.file_path, False, error="broken")
+            
+            self.assertEqual(list(journal.pending([self.file_path, other_path])), [self.file_path, other_path])
+            self.assertEqual(journal.summary(), {"failed": 1})
+    
+    def test_process_file_records_failure(self):
+        """Test that process_file records a file it cannot process as failed"""
+        missing_path = os.path.join(self.temp_dir.name, "missing.pdf")
+        
+        self.assertFalse(main.process_file(missing_path, journal=self.journal_path))
+        
+        with JobJournal(self.journal_path) as journal:
+            entry = journal.entry(missing_path)
+        self.assertEqual(entry["status"], "failed")
+        self.assertIn("File not found", entry["error"])
+    
+    @patch('job_journal.content_hash')
+    def test_process_file_reuses_cache_hash(self, mock_journal_hash):
+        """Test that the journal records the content hash computed for the cache key instead of hashing again"""
+        sample_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample.docx")
+        
+        self.assertTrue(main.process_file(
+            sample_path,
+            output_dir=os.path.join(self.temp_dir.name, "output"),
+            use_cache=True,
+            cache_dir=os.path.join(self.temp_dir.name, "cache"),
+            journal=self.journal_path
+        ))
+        
+        mock_journal_hash.assert_not_called()
+        with JobJournal(self.journal_path) as journal:
+            self.assertEqual(journal.entry(sample_path)["content_hash"], content_hash(sample_path))
+    
+    @patch('main.process_file')
+    def test_resume_skips_completed_files(self, mock_process_file):
+        """Test that resumed runs only process files that are not complete"""
+        other_path = os.path.join(self.temp_dir.name, "other.pdf")
+        with JobJournal(self.journal_path) as journal:
+            journal.finish(self.file_path, True, fingerprint=main._journal_fingerprint(self.file_path, {}))
+        mock_process_file.return_value = True
+        
+        results = main.process_files([self.file_path, other_path], journal=self.journal_path, resume=True)
+        
+        self.assertEqual(results, {other_path: True})
+        mock_process_file.assert_called_once_with(other_path, journal=self.journal_path)
+    
+    @patch('main.process_file')
+    def test_resume_to_other_output_dir_processes_again(self, mock_process_file):
+        """Test that files completed into one output directory are processed again for another"""
+        with JobJournal(self.journal_path) as journal:
+            journal.finish(self.file_path, True, fingerprint=main._journal_fingerprint(self.file_path, {
+                "output_dir": "out1"
+            }))
+        mock_process_file.return_value = True
+        
+        results = main.process_files([self.file_path], journal=self.journal_path, resume=True, output_dir="out1")
+        self.assertEqual(results, {})
+        
+        results = main.process_files([self.file_path], journal=self.journal_path, resume=True, output_dir="out2")
+        self.assertEqual(results, {self.file_path: True})
+
+
+if __name__ == '__main__':
+    unittest.main()
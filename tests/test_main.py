@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import patch
+
+# Import the module to test
+import main
+from benchmarks.startup import heavy_modules_imported
+
+
+class TestProcessFiles(unittest.TestCase):
+    """Simple unit tests for batch processing in main.py"""
+
+    @patch('main.process_file')
+    def test_sequential_processing(self, mock_process_file):
+        """Test that a single worker processes files in order without a pool"""
+        mock_process_file.side_effect = [True, False]
+
+        results = main.process_files(["a.pdf", "b.docx", "a.pdf"], workers=1, output_dir="out")
+
+        # Duplicates are processed once and results keep input order
+        self.assertEqual(list(results.items()), [("a.pdf", True), ("b.docx", False)])
+        mock_process_file.assert_any_call("a.pdf", output_dir="out")
+
+    @patch('main._run_pool')
+    def test_pool_results_keep_input_order(self, mock_run_pool):
+        """Test that pooled results are reported in input order"""
+        mock_run_pool.return_value = ({"b.pdf": True, "a.pdf": False}, [], [])
+
+        results = main.process_files(["a.pdf", "b.pdf"], workers=4)
+
+        self.assertEqual(list(results.items()), [("a.pdf", False), ("b.pdf", True)])
+        mock_run_pool.assert_called_once_with(["a.pdf", "b.pdf"], 4, {}, {})
+
+    @patch('main._run_pool')
+    def test_worker_crash_only_fails_crashing_file(self, mock_run_pool):
+        """Test that files caught in a crashed pool are retried"""
+        mock_run_pool.side_effect = [
+            # First pool dies while both files are in flight
+            ({}, ["bad.pdf", "good.pdf"], []),
+            # Second pool dies again on the bad file only
+            ({"good.pdf": True}, ["bad.pdf"], []),
+            # The bad file crashes once more when run on its own
+            ({}, ["bad.pdf"], []),
+        ]
+
+        results = main.process_files(["bad.pdf", "good.pdf"], workers=2)
+
+        self.assertEqual(results, {"bad.pdf": False, "good.pdf": True})
+        mock_run_pool.assert_called_with(["bad.pdf"], 1, {}, {})
+
+    @patch('main.process_file')
+    def test_shared_file_names_get_distinct_output_names(self, mock_process_file):
+        """Test that a file sharing its base name with an earlier input is given another output name"""
+        mock_process_file.return_value = True
+
+        main.process_files(iter(["x/a.pdf", "y/a.pdf", "y/b.pdf"]), workers=1)
+
+        mock_process_file.assert_any_call("x/a.pdf")
+        mock_process_file.assert_any_call("y/b.pdf")
+        output_name = mock_process_file.call_args_list[1].kwargs["output_name"]
+        self.assertEqual(output_name, main._output_name("y/a.pdf"))
+        self.assertRegex(output_name, r"^a_[0-9a-f]{8}\.pdf$")
+
+    @patch('main.process_file')
+    def test_output_names_do_not_depend_on_size_order(self, mock_process_file):
+        """Test that files named before reordering keep their names, and a file alone keeps its plain name"""
+        mock_process_file.return_value = True
+
+        main.process_files(["y/a.pdf"], workers=1)
+        mock_process_file.assert_called_once_with("y/a.pdf")
+
+        # Named in discovery order, then processed with the larger, renamed file first
+        output_names = {}
+        list(main._name_outputs(["x/a.pdf", "y/a.pdf"], output_names))
+        mock_process_file.reset_mock()
+
+        main.process_files(["y/a.pdf", "x/a.pdf"], workers=1, output_names=output_names)
+
+        mock_process_file.assert_any_call("y/a.pdf", output_name=main._output_name("y/a.pdf"))
+        mock_process_file.assert_any_call("x/a.pdf")
+
+    def test_import_does_not_load_parsing_libraries(self):
+        """Test that importing main leaves the parsing and database libraries unloaded"""
+        self.assertEqual(heavy_modules_imported("import main"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+# Import the modules to test
+from metrics import MetricsRecorder, NULL_METRICS
+from storage import FileStorage
+
+
+class TestMetrics(unittest.TestCase):
+    """Simple unit tests for the metrics recorder"""
+    
+    def test_stage_records_counts_and_calls_hooks(self):
+        """Test that a stage accumulates its runs and reports each one to the hooks"""
+        events = []
+        metrics = MetricsRecorder("test.pdf", hooks=[events.append])
+        
+        with metrics.stage("store_text") as counts:
+            counts["records"] = 3
+            counts["bytes_written"] = 120
+        with metrics.stage("store_text") as counts:
+            counts["records"] = 2
+        
+        report = metrics.report()
+        self.assertEqual(report["file_name"], "test.pdf")
+        stage = report["stages"][0]
+        self.assertEqual(stage["stage"], "store_text")
+        self.assertEqual(stage["calls"], 2)
+        self.assertEqual(stage["records"], 5)
+        self.assertEqual(stage["bytes_written"], 120)
+        self.assertGreaterEqual(stage["wall_seconds"], 0)
+        self.assertEqual([event["records"] for event in events], [3, 2])
+        self.assertEqual(events[0]["file_name"], "test.pdf")
+    
+    def test_timed_iter_counts_records(self):
+        """Test that a timed iterator passes items through and counts their records"""
+        metrics = MetricsRecorder("test.pdf")
+        pages = [{"text": [1, 2], "links": [3]}, {"text": [4]}]
+        
+        items = list(metrics.timed_iter("extract_pages", iter(pages),
+                                        lambda page: sum(len(records) for records in page.values())))
+        
+        self.assertEqual(items, pages)
+        self.assertEqual(metrics.stages["extract_pages"]["records"], 4)
+        self.assertEqual(metrics.stages["extract_pages"]["calls"], 1)
+    
+    def test_failing_hook_does_not_stop_processing(self):
+        """Test that an exception raised by a hook is logged instead of raised"""
+        metrics = MetricsRecorder("test.pdf", hooks=[MagicMock(side_effect=ValueError("broken hook"))])
+        
+        with self.assertLogs("metrics", level="ERROR"):
+            with metrics.stage("load_file"):
+                pass
+        
+        self.assertEqual(metrics.stages["load_file"]["calls"], 1)
+    
+    def test_merge_adds_worker_stages(self):
+        """Test that stages recorded in another process are added under a prefix"""
+        events = []
+        metrics = MetricsRecorder("test.pdf", hooks=[events.append])
+        worker = MetricsRecorder("test.pdf")
+        for _ in range(2):
+            with worker.stage("extract_pages") as counts:
+                counts["records"] = 4
+        
+        metrics.merge(worker.stages, prefix="shard_")
+        metrics.merge(worker.stages, prefix="shard_")
+        
+        stage = metrics.stages["shard_extract_pages"]
+        self.assertEqual((stage["calls"], stage["records"]), (4, 16))
+        self.assertEqual([event["stage"] for event in events], ["shard_extract_pages"] * 2)
+    
+    def test_null_metrics_passes_items_through(self):
+        """Test that the null recorder returns iterables unchanged"""
+        items = iter([1, 2])
+        self.assertIs(NULL_METRICS.timed_iter("extract_text", items), items)
+        with NULL_METRICS.stage("load_file") as counts:
+            counts["records"] = 1
+    
+    def test_file_storage_reports_bytes_written(self):
+        """Test that storing records reports their count and the size of the written files"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            extractor = MagicMock()
+            extractor.file_type = "pdf"
+            extractor.file_name = "test.pdf"
+            extractor.pages = None
+            extractor.metrics = MetricsRecorder("test.pdf")
+            storage = FileStorage(extractor, output_dir=temp_dir, formats=("jsonl",))
+            
+            storage.store_links([{"page_number": 1, "url": "https://example.com", "linked_text": "Example",
+                                  "file_type": "pdf", "file_name": "test.pdf"}])
+            
+            stage = extractor.metrics.stages["store_links"]
+            path = os.path.join(temp_dir, "links", "pdf_test_links.jsonl")
+            self.assertEqual(stage["records"], 1)
+            self.assertEqual(stage["bytes_written"], os.path.getsize(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
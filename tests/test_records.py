@@ -0,0 +1,58 @@
+import unittest
+import json
+import pickle
+
+# Import the module to test
+from records import PDFTextRecord, DOCXTextRecord, PPTXTextRecord
+from data_extractor import RECORD_FIELDS
+
+
+class TestRecords(unittest.TestCase):
+    """Simple unit tests for compact text records"""
+    
+    def _make_record(self):
+        """Create a PDF text record"""
+        return PDFTextRecord(
+            page_number=1,
+            text="Hello",
+            font="Arial",
+            size=12,
+            color=0,
+            is_bold=False,
+            is_italic=False,
+            file_type="pdf",
+            file_name="test.pdf"
+        )
+    
+    def test_fields_match_record_fields(self):
+        """Test that record fields follow RECORD_FIELDS order"""
+        for file_type, record_class in [("pdf", PDFTextRecord), ("docx", DOCXTextRecord), ("pptx", PPTXTextRecord)]:
+            with self.subTest(file_type=file_type):
+                self.assertEqual(list(record_class.__slots__), RECORD_FIELDS[file_type]["text"])
+    
+    def test_dict_view(self):
+        """Test that records behave like the dicts they replace"""
+        record = self._make_record()
+        
+        self.assertEqual(record["text"], "Hello")
+        self.assertEqual(record.get("missing", "default"), "default")
+        self.assertEqual(list(record.keys()), RECORD_FIELDS["pdf"]["text"])
+        self.assertEqual(json.dumps(dict(record)), json.dumps({
+            "page_number": 1, "text": "Hello", "font": "Arial", "size": 12, "color": 0,
+            "is_bold": False, "is_italic": False, "file_type": "pdf", "file_name": "test.pdf"
+        }))
+        self.assertFalse(hasattr(record, "__dict__"))
+    
+    def test_assignment_and_pickle(self):
+        """Test that existing fields can be updated and records survive pickling"""
+        record = self._make_record()
+        record["text"] = "Hello world"
+        
+        with self.assertRaises(KeyError):
+            record["unknown"] = 1
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+        self.assertEqual(pickle.loads(pickle.dumps(record))["text"], "Hello world")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,19 @@
 import unittest
 import os
+import json
 import tempfile
+import mysql.connector
 from unittest.mock import patch, MagicMock, mock_open
 
 # Import the module to test
-from storage import FileStorage, SQLStorage
+from storage import (FileStorage, ParquetStorage, SQLStorage, SQLConnectionPool, decode_table_content,
+                     encode_table_content, _iter_json_array)
+from data_extractor import DATA_TYPES, PageRanges, extracted_data_types
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
 
 
 class TestFileStorage(unittest.TestCase):
@@ -20,6 +29,7 @@ class TestFileStorage(unittest.TestCase):
         self.mock_extractor = MagicMock()
         self.mock_extractor.file_type = "pdf"
         self.mock_extractor.file_name = "test.pdf"
+        self.mock_extractor.data_types = DATA_TYPES
         
         # Set up sample data for each extraction method
         self.mock_extractor.extract_text.return_value = [
@@ -65,6 +75,12 @@ class TestFileStorage(unittest.TestCase):
             }
         ]
         
+        # The storage backends stream records through the iter_* methods
+        self.mock_extractor.iter_text.return_value = self.mock_extractor.extract_text.return_value
+        self.mock_extractor.iter_links.return_value = self.mock_extractor.extract_links.return_value
+        self.mock_extractor.iter_images.return_value = self.mock_extractor.extract_images.return_value
+        self.mock_extractor.iter_tables.return_value = self.mock_extractor.extract_tables.return_value
+        
         # Create storage instance
         self.storage = FileStorage(self.mock_extractor, output_dir=self.output_dir)
     
@@ -88,7 +104,7 @@ class TestFileStorage(unittest.TestCase):
         self.assertTrue(mock_open.call_count >= 2)
         
         # Verify extractor was called
-        self.mock_extractor.extract_text.assert_called_once()
+        self.mock_extractor.iter_text.assert_called_once()
     
     @patch('builtins.open', new_callable=mock_open)
     def test_store_tables(self, mock_open):
@@ -97,27 +113,195 @@ class TestFileStorage(unittest.TestCase):
         self.storage.store_tables()
         
         # Check that the extractor was called
-        self.mock_extractor.extract_tables.assert_called_once()
+        self.mock_extractor.iter_tables.assert_called_once()
         
         # Verify open was called multiple times (table data + metadata)
         self.assertTrue(mock_open.call_count >= 2)
     
     def test_store_all(self):
         """Test storing all data types at once"""
-        # Replace methods with mocks to verify calls
-        self.storage.store_text = MagicMock()
-        self.storage.store_links = MagicMock()
-        self.storage.store_images = MagicMock()
-        self.storage.store_tables = MagicMock()
+        # Replace the writer factory with a mock to verify calls
+        self.storage.open_writer = MagicMock()
+        self.mock_extractor.iter_pages.return_value = iter([])
         
         # Call store_all
         self.storage.store_all()
         
-        # Verify that all storage methods were called once
-        self.storage.store_text.assert_called_once()
-        self.storage.store_links.assert_called_once()
-        self.storage.store_images.assert_called_once()
-        self.storage.store_tables.assert_called_once()
+        # Verify that a writer was opened once for every data type
+        opened_types = [call.args[0] for call in self.storage.open_writer.call_args_list]
+        self.assertEqual(opened_types, ["text", "links", "images", "tables"])
+        self.assertEqual(self.storage.open_writer.return_value.close.call_count, 4)
+    
+    def test_store_all_uses_single_pass(self):
+        """Test that store_all streams the records of one fused extraction pass"""
+        self.mock_extractor.iter_pages.return_value = iter([
+            {
+                "text": self.mock_extractor.extract_text.return_value,
+                "links": self.mock_extractor.extract_links.return_value,
+                "images": self.mock_extractor.extract_images.return_value,
+                "tables": []
+            }
+        ])
+        
+        result = self.storage.store_all()
+        
+        # The fused pass replaces the four separate extraction calls
+        self.mock_extractor.iter_pages.assert_called_once_with(self.storage.images_dir)
+        self.mock_extractor.extract_text.assert_not_called()
+        self.mock_extractor.iter_text.assert_not_called()
+        self.mock_extractor.iter_tables.assert_not_called()
+        self.assertEqual(result["text"], os.path.join(self.output_dir, "text", "pdf_test_text.csv"))
+        self.assertIsNone(result["tables"])
+    
+    def test_store_text_streams_json(self):
+        """Test that streamed JSON output matches a regular JSON dump"""
+        records = self.mock_extractor.extract_text.return_value * 2
+        
+        self.storage.store_text(iter(records))
+        
+        json_path = os.path.join(self.output_dir, "text", "pdf_test_text.json")
+        with open(json_path, encoding='utf-8') as jsonfile:
+            self.assertEqual(jsonfile.read(), json.dumps(records, indent=2))
+    
+    def test_store_text_jsonl_only(self):
+        """Test that only the selected JSON Lines format is written"""
+        storage = FileStorage(self.mock_extractor, output_dir=self.output_dir, formats=["jsonl"])
+        records = self.mock_extractor.extract_text.return_value * 2
+        
+        path = storage.store_text(iter(records))
+        
+        self.assertEqual(path, os.path.join(self.output_dir, "text", "pdf_test_text.jsonl"))
+        self.assertEqual(os.listdir(os.path.join(self.output_dir, "text")), ["pdf_test_text.jsonl"])
+        with open(path, encoding='utf-8') as jsonl_file:
+            lines = jsonl_file.read().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], records)
+        self.assertNotIn(" ", lines[0].replace("Sample text", ""))
+    
+    def test_store_text_replaces_selected_pages(self):
+        """Test that re-extracted pages replace only their stored records"""
+        old_records = [dict(page_number=number, text=f"Old {number}", file_type="pdf", file_name="test.pdf")
+                       for number in range(1, 5)]
+        self.storage.store_text(iter(old_records))
+        
+        # Pages 2 and 3 are extracted again, page 3 no longer has text
+        self.mock_extractor.pages = PageRanges("2-3")
+        new_record = dict(page_number=2, text="New 2", file_type="pdf", file_name="test.pdf")
+        self.storage.store_text(iter([new_record]))
+        
+        json_path = os.path.join(self.output_dir, "text", "pdf_test_text.json")
+        with open(json_path, encoding='utf-8') as jsonfile:
+            stored = json.load(jsonfile)
+        self.assertEqual([record["text"] for record in stored], ["Old 1", "New 2", "Old 4"])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.output_dir, "text"))),
+                         ["pdf_test_text.csv", "pdf_test_text.json"])
+    
+    def test_skipped_tables_keep_selected_pages(self):
+        """Test that a partial run without table extraction keeps the stored tables of its pages"""
+        table = dict(self.mock_extractor.extract_tables.return_value[0], page_number=9, table_index=1)
+        self.storage.store_tables([table])
+        
+        self.mock_extractor.pages = PageRanges("9")
+        self.mock_extractor.data_types = extracted_data_types(skip_tables=True)
+        self.storage.store_all()
+        
+        tables_dir = os.path.join(self.output_dir, "tables")
+        self.assertIn("pdf_test_page9_table1.csv", os.listdir(tables_dir))
+        with open(os.path.join(tables_dir, "pdf_test_tables_metadata.json"), encoding='utf-8') as jsonfile:
+            self.assertEqual([record["page_number"] for record in json.load(jsonfile)], [9])
+    
+    def test_iter_json_array_across_chunks(self):
+        """Test that stored JSON arrays are read back one record at a time across read boundaries"""
+        records = [{"page_number": number, "text": "x" * number} for number in range(1, 30)]
+        path = os.path.join(self.temp_dir.name, "records.json")
+        with open(path, "w", encoding='utf-8') as jsonfile:
+            json.dump(records, jsonfile, indent=2)
+        
+        with open(path, encoding='utf-8') as jsonfile:
+            self.assertEqual(list(_iter_json_array(jsonfile, chunk_size=7)), records)
+    
+    def test_unknown_format(self):
+        """Test that unknown output formats are rejected"""
+        with self.assertRaises(ValueError):
+            FileStorage(self.mock_extractor, output_dir=self.output_dir, formats=["xml"])
+
+
+@unittest.skipIf(pq is None, "pyarrow is not installed")
+class TestParquetStorage(unittest.TestCase):
+    """Simple unit tests for ParquetStorage class"""
+    
+    def setUp(self):
+        """Set up test environment with mock data extractor"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.temp_dir.name, "output")
+        
+        self.mock_extractor = MagicMock()
+        self.mock_extractor.file_type = "pdf"
+        self.mock_extractor.file_name = "test.pdf"
+        self.mock_extractor.data_types = DATA_TYPES
+        
+        self.text_records = [
+            {
+                "page_number": page_number,
+                "text": f"Text {page_number}",
+                "font": "Arial",
+                "size": 12.0,
+                "color": 0,
+                "is_bold": False,
+                "is_italic": False,
+                "file_type": "pdf",
+                "file_name": "test.pdf"
+            }
+            for page_number in range(1, 6)
+        ]
+        
+        self.storage = ParquetStorage(self.mock_extractor, output_dir=self.output_dir, row_group_size=2)
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        self.temp_dir.cleanup()
+    
+    def test_store_text_row_groups(self):
+        """Test that text records are streamed to Parquet in row groups"""
+        path = self.storage.store_text(iter(self.text_records))
+        
+        self.assertEqual(path, os.path.join(self.output_dir, "text", "pdf_test_text.parquet"))
+        parquet_file = pq.ParquetFile(path)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        self.assertEqual(parquet_file.read().to_pylist(), self.text_records)
+        self.assertEqual(str(parquet_file.schema_arrow.field("page_number").type), "int32")
+    
+    def test_store_tables_keeps_content(self):
+        """Test that table content is stored as a nested list column"""
+        table = {
+            "page_number": 1,
+            "table_index": 1,
+            "rows": 2,
+            "columns": 2,
+            "content": [["Header1", "Header2"], ["Data1", None]],
+            "file_type": "pdf",
+            "file_name": "test.pdf"
+        }
+        
+        path = self.storage.store_tables([table])
+        
+        self.assertEqual(pq.read_table(path).to_pylist(), [table])
+    
+    def test_store_text_replaces_selected_pages(self):
+        """Test that re-extracted pages replace only their records in the Parquet file"""
+        self.storage.store_text(iter(self.text_records))
+        
+        self.mock_extractor.pages = PageRanges("2,4")
+        new_record = dict(self.text_records[1], text="New 2")
+        path = self.storage.store_text(iter([new_record]))
+        
+        self.assertEqual([record["text"] for record in pq.read_table(path).to_pylist()],
+                         ["Text 1", "New 2", "Text 3", "Text 5"])
+        self.assertEqual(os.listdir(os.path.join(self.output_dir, "text")), ["pdf_test_text.parquet"])
+    
+    def test_no_records_writes_no_file(self):
+        """Test that empty data types do not create a file"""
+        self.assertIsNone(self.storage.store_links([]))
+        self.assertEqual(os.listdir(os.path.join(self.output_dir, "links")), [])
 
 
 class TestSQLStorage(unittest.TestCase):
@@ -129,6 +313,7 @@ class TestSQLStorage(unittest.TestCase):
         self.mock_extractor = MagicMock()
         self.mock_extractor.file_type = "pdf"
         self.mock_extractor.file_name = "test.pdf"
+        self.mock_extractor.data_types = DATA_TYPES
         
         # Set up sample data
         self.mock_extractor.extract_text.return_value = [
@@ -173,6 +358,12 @@ class TestSQLStorage(unittest.TestCase):
                 "file_name": "test.pdf"
             }
         ]
+        
+        # The storage backends stream records through the iter_* methods
+        self.mock_extractor.iter_text.return_value = self.mock_extractor.extract_text.return_value
+        self.mock_extractor.iter_links.return_value = self.mock_extractor.extract_links.return_value
+        self.mock_extractor.iter_images.return_value = self.mock_extractor.extract_images.return_value
+        self.mock_extractor.iter_tables.return_value = self.mock_extractor.extract_tables.return_value
     
     @patch('mysql.connector.connect')
     def test_sql_storage_initialization(self, mock_connect):
@@ -220,12 +411,210 @@ class TestSQLStorage(unittest.TestCase):
         storage.store_text()
         
         # Verify that extractor was called
-        self.mock_extractor.extract_text.assert_called_once()
+        self.mock_extractor.iter_text.assert_called_once()
         
         # Verify that SQL execution was performed
         self.assertTrue(mock_cursor.execute.call_count > 0)
         mock_connection.commit.assert_called()
     
+    @patch('mysql.connector.connect')
+    def test_store_text_sql_batches_rows(self, mock_connect):
+        """Test that text rows are inserted in batches with executemany"""
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+        
+        storage = SQLStorage(self.mock_extractor, database="testdb", batch_size=2)
+        records = self.mock_extractor.extract_text.return_value * 3
+        
+        storage.store_text(records)
+        
+        # Three rows with a batch size of two need two round trips
+        self.assertEqual(mock_cursor.executemany.call_count, 2)
+        query, rows = mock_cursor.executemany.call_args_list[0].args
+        self.assertTrue(query.startswith("INSERT INTO text_data (page_number, text, font, file_type, file_name)"))
+        self.assertEqual(len(rows), 2)
+        mock_connection.commit.assert_called()
+    
+    @patch('mysql.connector.connect')
+    def test_store_text_sql_replaces_selected_pages(self, mock_connect):
+        """Test that rows of re-extracted pages are deleted before inserting"""
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+        self.mock_extractor.pages = PageRanges("2-3,9-")
+        
+        storage = SQLStorage(self.mock_extractor, database="testdb")
+        mock_cursor.execute.reset_mock()
+        storage.store_text([])
+        
+        query, params = mock_cursor.execute.call_args.args
+        self.assertEqual(query, "DELETE FROM text_data WHERE file_name = %s AND file_type = %s "
+                                "AND (page_number BETWEEN %s AND %s OR page_number >= %s)")
+        self.assertEqual(params, ["test.pdf", "pdf", 2, 3, 9])
+        mock_connection.commit.assert_called()
+    
+    @patch('mysql.connector.connect')
+    def test_skipped_tables_sql_keep_selected_pages(self, mock_connect):
+        """Test that a partial run without table extraction does not delete stored tables"""
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+        self.mock_extractor.pages = PageRanges("9")
+        self.mock_extractor.data_types = extracted_data_types(skip_tables=True)
+        
+        storage = SQLStorage(self.mock_extractor, database="testdb")
+        mock_cursor.execute.reset_mock()
+        storage.store_tables([])
+        storage.store_text([])
+        
+        deletes = [call.args[0] for call in mock_cursor.execute.call_args_list if call.args[0].startswith("DELETE")]
+        self.assertEqual(len(deletes), 1)
+        self.assertTrue(deletes[0].startswith("DELETE FROM text_data"))
+    
+    @patch('mysql.connector.connect')
+    def test_store_all_sql_rolls_back_failed_insert(self, mock_connect):
+        """Test that a failed insert rolls back the replaced pages' deletes and commits nothing"""
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+        self.mock_extractor.pages = PageRanges("1")
+        self.mock_extractor.iter_pages.return_value = [{
+            "text": self.mock_extractor.extract_text.return_value,
+            "links": self.mock_extractor.extract_links.return_value,
+            "images": [],
+            "tables": []
+        }]
+        
+        storage = SQLStorage(self.mock_extractor, database="testdb")
+        mock_connection.commit.reset_mock()
+        mock_cursor.executemany.side_effect = mysql.connector.Error("insert failed")
+        
+        locations = storage.store_all()
+        
+        self.assertEqual(locations, {data_type: None for data_type in DATA_TYPES})
+        mock_connection.commit.assert_not_called()
+        mock_connection.rollback.assert_called()
+        
+        # A later single data type store runs its own transaction again
+        mock_cursor.executemany.side_effect = None
+        storage.store_links()
+        mock_connection.commit.assert_called_once()
+    
+    @patch('mysql.connector.connect')
+    def test_store_all_sql_commits_once(self, mock_connect):
+        """Test that store_all commits the writes of every data type together"""
+        mock_connection = MagicMock()
+        mock_connection.cursor.return_value = MagicMock()
+        mock_connect.return_value = mock_connection
+        self.mock_extractor.iter_pages.return_value = [{
+            "text": self.mock_extractor.extract_text.return_value,
+            "links": self.mock_extractor.extract_links.return_value,
+            "images": [],
+            "tables": []
+        }]
+        
+        storage = SQLStorage(self.mock_extractor, database="testdb")
+        mock_connection.commit.reset_mock()
+        
+        locations = storage.store_all()
+        
+        self.assertEqual(locations["text"], "text_data")
+        mock_connection.commit.assert_called_once()
+    
+    @patch('mysql.connector.connect')
+    def test_store_tables_sql_batches_cells(self, mock_connect):
+        """Test that table cells are inserted with one executemany call"""
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.lastrowid = 7
+        mock_connection.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+        
+        storage = SQLStorage(self.mock_extractor, database="testdb")
+        storage.store_tables()
+        
+        mock_cursor.executemany.assert_called_once()
+        query, rows = mock_cursor.executemany.call_args.args
+        self.assertIn("INSERT INTO tables_content", query)
+        self.assertEqual(rows[0], (7, 0, 0, "Header1"))
+        self.assertEqual(len(rows), 4)
+    
+    @patch('mysql.connector.connect')
+    def test_store_tables_sql_blob_mode(self, mock_connect):
+        """Test that blob mode stores each table's content as one compressed row"""
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.lastrowid = 7
+        mock_connection.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+        
+        storage = SQLStorage(self.mock_extractor, database="testdb", table_mode="blob")
+        storage.store_tables()
+        
+        mock_cursor.executemany.assert_called_once()
+        query, rows = mock_cursor.executemany.call_args.args
+        self.assertEqual(query, "INSERT INTO tables_blobs (table_id, encoding, content) VALUES (%s, %s, %s)")
+        self.assertEqual(len(rows), 1)
+        table_id, encoding, content = rows[0]
+        self.assertEqual(table_id, 7)
+        self.assertEqual(decode_table_content(content, encoding), [["Header1", "Header2"], ["Data1", "Data2"]])
+    
+    @patch('mysql.connector.connect')
+    def test_invalid_table_mode(self, mock_connect):
+        """Test that an unknown table mode is rejected before connecting"""
+        with self.assertRaises(ValueError):
+            SQLStorage(self.mock_extractor, database="testdb", table_mode="rows")
+        mock_connect.assert_not_called()
+    
+    @patch('mysql.connector.connect')
+    def test_load_table_content(self, mock_connect):
+        """Test that table content is rehydrated from a blob or from cell rows"""
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+        storage = SQLStorage(self.mock_extractor, database="testdb")
+        
+        # A table stored in blob mode is decoded from its single row
+        mock_cursor.fetchone.return_value = ("json+zlib", encode_table_content([["a", None], ["b", "c"]]))
+        self.assertEqual(storage.load_table_content(3), [["a", None], ["b", "c"]])
+        
+        # A table stored in cells mode is reassembled from its ordered cells
+        mock_cursor.fetchone.return_value = None
+        mock_cursor.fetchall.return_value = [(0, 0, "a"), (0, 1, "b"), (1, 0, "c")]
+        self.assertEqual(storage.load_table_content(3), [["a", "b"], ["c"]])
+        query, params = mock_cursor.execute.call_args.args
+        self.assertIn("FROM tables_content WHERE table_id = %s ORDER BY row_index, column_index", query)
+        self.assertEqual(params, (3,))
+    
+    @patch('mysql.connector.pooling.MySQLConnectionPool')
+    @patch('mysql.connector.connect')
+    def test_pooled_storage_skips_setup(self, mock_connect, mock_pool_class):
+        """Test that storages built on a pool reuse its connections and schema"""
+        mock_pooled_connection = MagicMock()
+        mock_pool_class.return_value.get_connection.return_value = mock_pooled_connection
+        
+        pool = SQLConnectionPool(database="testdb")
+        setup_calls = mock_pooled_connection.cursor.return_value.execute.call_count
+        self.assertTrue(setup_calls > 0)
+        
+        # Two files stored through the pool do not reconnect or recreate tables
+        for _ in range(2):
+            storage = SQLStorage(self.mock_extractor, database="testdb", pool=pool)
+            storage.close()
+        
+        self.assertEqual(mock_connect.call_count, 1)  # only the CREATE DATABASE connection
+        self.assertEqual(mock_pooled_connection.cursor.return_value.execute.call_count, setup_calls)
+        self.assertEqual(mock_pool_class.return_value.get_connection.call_count, 3)
+        
+        # One file is stored at a time per process, so a single connection is opened
+        self.assertEqual(mock_pool_class.call_args.kwargs["pool_size"], 1)
+    
     @patch('mysql.connector.connect')
     def test_clean_dict_for_sql(self, mock_connect):
         """Test cleaning dictionaries for SQL insertion"""